@@ -1,18 +1,313 @@
+"""
+AI Co-Pilot: answers questions about a scenario with an OpenAI-compatible chat model.
+
+The model never sees the raw statements. build_context compresses a scenario into a token-budgeted
+summary (yearly roll-ups, inflection points, KPI trends), answers are cached per normalised question
+and scenario, and stream_analyst yields tokens as they arrive. For local testing, point
+OPENAI_BASE_URL at the stub server in this module:
+
+    python ai_analyst.py stub --port 8777 --latency-ms 400 --token-ms 20
+    OPENAI_BASE_URL=http://127.0.0.1:8777/v1 OPENAI_API_KEY=stub python ai_analyst.py ask "Why is my runway short?"
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
 import os
-from dotenv import load_dotenv
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+DEFAULT_ANALYST_MODEL = "gpt-4o-mini"
+CONTEXT_TOKEN_BUDGET = 600
+MAX_ANSWER_TOKENS = 400
+RESPONSE_CACHE_ENTRIES = 256
+OFFLINE_MESSAGE = "AI Analyst is offline. Please configure your API key in a .env file."
+ERROR_MESSAGE = "AI Analyst could not reach the model ({error}). Please try again."
+SYSTEM_PROMPT = ("You are ExitPath's financial co-pilot. Answer the founder's question about their pro forma "
+                 "using only the scenario summary provided. Be specific, cite months and figures, and keep it brief.")
+
+
+_env_loaded = False
+
+
+def _load_env():
+    """Loads .env once, on the first question rather than at import (keeps app start-up light)."""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+
+def analyst_model():
+    _load_env()
+    return os.getenv("EXITPATH_ANALYST_MODEL", DEFAULT_ANALYST_MODEL)
+
+
+# --- Context Builder ---
+def estimate_tokens(text: str):
+    """Rough token count (~4 characters per token), good enough for budgeting."""
+    return math.ceil(len(text) / 4)
+
+
+def _money(value):
+    if value != value:
+        return "n/a"
+    sign = "-" if value < 0 else ""
+    value = abs(value)
+    for threshold, suffix in ((1e9, "B"), (1e6, "M"), (1e3, "K")):
+        if value >= threshold:
+            return f"{sign}${value / threshold:.1f}{suffix}"
+    return f"{sign}${value:.0f}"
+
 
-# It's good practice to load environment variables at the start
-load_dotenv()
+def _context_sections(results):
+    """Summary sections in priority order; build_context keeps as many as fit the budget."""
+    pnl, bs, cfs, kpis, funnel = (results[name] for name in ("pnl", "bs", "cfs", "kpis", "funnel"))
+    months = pnl.index
+    years = len(months) // 12
+    revenue, ebitda, cash = (frame[col].to_numpy(dtype=float) for frame, col in ((pnl, "Revenue"), (pnl, "EBITDA"), (bs, "Cash")))
 
-def query_analyst(query: str, context: dict):
+    profitable = np.flatnonzero(ebitda > 0)
+    negative = np.flatnonzero(cash < 0)
+    trough = int(np.argmin(cash))
+    funding = [(months[i], value) for i, value in enumerate(cfs["Funding"].to_numpy(dtype=float)) if value > 0]
+    inflections = [
+        f"Horizon: {len(months)} months ({months[0]} to {months[-1]}).",
+        f"EBITDA breakeven: {months[profitable[0]] if len(profitable) else 'not within forecast'}.",
+        f"Cash trough: {_money(cash[trough])} in {months[trough]}; ending cash {_money(cash[-1])}.",
+        f"Cash goes negative: {months[negative[0]] if len(negative) else 'never'}.",
+        "Funding: " + (", ".join(f"{_money(value)} in {month}" for month, value in funding) if funding else "none") + ".",
+    ]
+
+    rollup = ["Year | Revenue | Gross margin | EBITDA | Ending cash | Leads | Ready deals"]
+    for year in range(years):
+        window = slice(year * 12, (year + 1) * 12)
+        year_revenue = revenue[window].sum()
+        gross_margin = pnl["Gross Profit"].to_numpy()[window].sum() / year_revenue if year_revenue else float("nan")
+        rollup.append(f"Y{year + 1} | {_money(year_revenue)} | {gross_margin:.0%} | {_money(ebitda[window].sum())} | "
+                      f"{_money(cash[window][-1])} | {funnel['Leads Generated'].to_numpy()[window].sum():,.0f} | "
+                      f"{funnel['Ready Deals'].to_numpy()[window].sum():,.0f}")
+
+    year_ends = [min((year + 1) * 12, len(months)) - 1 for year in range(years)]
+    trends = ["KPI at each year end (Y1..Y{}):".format(years)]
+    for col, fmt in (("LTV/CAC", "{:.1f}x"), ("Payback Period (Months)", "{:.1f}"), ("Net Dollar Retention", "{:.0%}"), ("CAC", None)):
+        values = kpis[col].to_numpy(dtype=float)[year_ends]
+        trends.append(f"{col}: " + ", ".join(_money(v) if fmt is None else fmt.format(v) for v in values))
+
+    # Lowest priority: quarterly detail, only if the budget allows
+    quarters = ["Quarterly revenue / EBITDA:"]
+    for q in range(len(months) // 3):
+        window = slice(q * 3, (q + 1) * 3)
+        quarters.append(f"Q{q + 1} {_money(revenue[window].sum())} / {_money(ebitda[window].sum())}")
+
+    return [("Inflection points", inflections), ("Yearly roll-up", rollup), ("KPI trends", trends), ("Quarterly detail", quarters)]
+
+
+def build_context(results: dict, max_tokens: int = CONTEXT_TOKEN_BUDGET):
     """
-    Sends a query and financial context to the AI Co-Pilot.
+    Compact text summary of a scenario for the model, within roughly max_tokens. Sections are added
+    in priority order; one that would overflow the budget is truncated line by line.
     """
-    print("AI Analyst Queried.")
+    text = "SCENARIO SUMMARY"
+    for title, lines in _context_sections(results):
+        section, kept = f"\n\n{title}:", 0
+        for line in lines:
+            if estimate_tokens(text + section + "\n" + line) > max_tokens:
+                break
+            section, kept = section + "\n" + line, kept + 1
+        if kept:
+            text += section
+        if kept < len(lines):
+            break # out of budget; lower-priority sections are dropped
+    return text
+
+
+# --- Response Cache ---
+_response_cache = OrderedDict()
+_response_cache_lock = threading.Lock()
+
+
+def normalize_query(query: str):
+    """Case, whitespace and trailing punctuation don't change the question."""
+    return re.sub(r"\s+", " ", query).strip().lower().rstrip("?.! ")
+
+
+def response_cache_key(query: str, scenario_hash: str):
+    return hashlib.sha256(f"{analyst_model()}\0{scenario_hash}\0{normalize_query(query)}".encode()).hexdigest()
+
+
+def _cached_response(key):
+    with _response_cache_lock:
+        if key in _response_cache:
+            _response_cache.move_to_end(key)
+            return _response_cache[key]
+    return None
 
+
+def _remember_response(key, text):
+    with _response_cache_lock:
+        _response_cache[key] = text
+        while len(_response_cache) > RESPONSE_CACHE_ENTRIES:
+            _response_cache.popitem(last=False)
+
+
+# --- Query Path ---
+async def stream_analyst(query: str, context: dict, scenario_hash: str = None, max_context_tokens: int = CONTEXT_TOKEN_BUDGET):
+    """
+    Async generator of answer text chunks. scenario_hash (e.g. scenario_cache.scenario_key) lets a
+    repeated question skip building the context; without it the compact context itself is hashed.
+    """
     # Check if the API key is available in the environment
+    _load_env()
     if not os.getenv("OPENAI_API_KEY"):
-        return "AI Analyst is offline. Please configure your API key in a .env file."
+        yield OFFLINE_MESSAGE
+        return
+
+    prompt_context = None
+    if scenario_hash is None:
+        prompt_context = build_context(context, max_context_tokens)
+        scenario_hash = hashlib.sha256(prompt_context.encode()).hexdigest()
+    key = response_cache_key(query, f"{scenario_hash}/{max_context_tokens}")
+    cached = _cached_response(key)
+    if cached is not None:
+        yield cached
+        return
+
+    try:
+        from openai import APIError, AsyncOpenAI
+    except ImportError:
+        yield "AI Analyst is offline. Install the `openai` package to enable it."
+        return
+
+    if prompt_context is None:
+        prompt_context = build_context(context, max_context_tokens)
+    parts = []
+    try:
+        async with AsyncOpenAI() as client: # reads OPENAI_API_KEY and OPENAI_BASE_URL
+            stream = await client.chat.completions.create(
+                model=analyst_model(), stream=True, max_tokens=MAX_ANSWER_TOKENS,
+                messages=[{"role": "system", "content": SYSTEM_PROMPT},
+                          {"role": "user", "content": f"{prompt_context}\n\nQuestion: {query}"}],
+            )
+            async with stream:
+                async for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+    except APIError as error: # includes connection errors and timeouts; a partial answer is not cached
+        yield ("\n\n" if parts else "") + ERROR_MESSAGE.format(error=type(error).__name__)
+        return
+    _remember_response(key, "".join(parts)) # only complete answers are cached
+
+
+def iter_analyst(query: str, context: dict, scenario_hash: str = None):
+    """stream_analyst as a plain generator on a private event loop (for st.write_stream and scripts)."""
+    loop = asyncio.new_event_loop()
+    chunks = stream_analyst(query, context, scenario_hash)
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(chunks.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.run_until_complete(chunks.aclose())
+        loop.run_until_complete(loop.shutdown_asyncgens()) # finalise the HTTP client's own generators
+        loop.close()
+
+
+def query_analyst(query: str, context: dict, scenario_hash: str = None):
+    """
+    Sends a query and financial context to the AI Co-Pilot and returns the whole answer.
+    """
+    return "".join(iter_analyst(query, context, scenario_hash))
+
+
+# --- Local Stub Model Server (testing) ---
+class StubModelHandler(BaseHTTPRequestHandler):
+    """OpenAI-compatible /v1/chat/completions that answers after latency_ms, one word per token_ms."""
+    latency_ms = 300
+    token_ms = 20
+
+    def do_POST(self):
+        if not self.path.endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        prompt = body["messages"][-1]["content"]
+        question = prompt.rsplit("Question:", 1)[-1].strip()
+        answer = f"(stub) You asked: {question} The summary I received was {estimate_tokens(prompt)} tokens long."
+        time.sleep(self.latency_ms / 1000)
+
+        base = {"id": "stub", "created": int(time.time()), "model": body.get("model", "stub")}
+        if not body.get("stream"):
+            self._json({**base, "object": "chat.completion", "choices": [
+                {"index": 0, "message": {"role": "assistant", "content": answer}, "finish_reason": "stop"}]})
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for i, word in enumerate(answer.split(" ")):
+            chunk = {**base, "object": "chat.completion.chunk",
+                     "choices": [{"index": 0, "delta": {"content": word if i == 0 else " " + word}, "finish_reason": None}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+            time.sleep(self.token_ms / 1000)
+        done = {**base, "object": "chat.completion.chunk", "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+        self.wfile.write(f"data: {json.dumps(done)}\n\ndata: [DONE]\n\n".encode())
+
+    def _json(self, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_stub_server(host="127.0.0.1", port=8777, latency_ms=300, token_ms=20):
+    handler = type("BoundStubModelHandler", (StubModelHandler,), {"latency_ms": latency_ms, "token_ms": token_ms})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ExitPath AI analyst tools.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    stub = commands.add_parser("stub", help="Run a local OpenAI-compatible stub model server.")
+    stub.add_argument("--port", type=int, default=8777)
+    stub.add_argument("--latency-ms", type=int, default=300, help="Delay before the first token.")
+    stub.add_argument("--token-ms", type=int, default=20, help="Delay between streamed tokens.")
+    ask = commands.add_parser("ask", help="Stream an answer about the default scenario.")
+    ask.add_argument("query")
+    args = parser.parse_args(argv)
+
+    if args.command == "stub":
+        server = make_stub_server(port=args.port, latency_ms=args.latency_ms, token_ms=args.token_ms)
+        print(f"Stub model server on http://127.0.0.1:{args.port}/v1", flush=True)
+        server.serve_forever()
+        return
+
+    from financial_engine import DEFAULT_SCENARIO, run_financial_model
+
+    for part in iter_analyst(args.query, run_financial_model(DEFAULT_SCENARIO)):
+        sys.stdout.write(part)
+        sys.stdout.flush()
+    print()
+
 
-    # In the future, this will contain the actual API call logic.
-    return f"The AI Analyst is processing your query: '{query}'"
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Benchmark suite for the engine, narrative and bowtie paths, with a JSON baseline and regression gate.
+
+Each case is timed over many repeats (p50/p95 latency), then run once more under tracemalloc for its
+net allocation count (blocks still held afterwards) and peak traced memory. Results are compared against benchmark_baseline.json and
+the run fails if any case's p50 latency or peak memory regresses past the threshold.
+
+    python benchmarks.py                       # compare against the baseline; exit 1 on regression
+    python benchmarks.py --save-baseline       # record a new baseline on this machine
+    python benchmarks.py --only single_run narrative --threshold 0.5
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from financial_engine import DEFAULT_SCENARIO, MONTHS, run_financial_model, run_financial_model_batch
+from incremental_engine import IncrementalModel
+from narrative_engine import generate_narrative, generate_narrative_batch
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+DEFAULT_THRESHOLD = 0.25 # fail when p50 or peak memory is more than 25% above the baseline
+
+# The webapp's slider defaults: a representative single scenario
+BENCHMARK_INPUTS = DEFAULT_SCENARIO
+
+
+def _scenario_table(n, seed=0):
+    """n scenarios scattered around BENCHMARK_INPUTS."""
+    rng = np.random.default_rng(seed)
+    table = {key: np.full(n, float(value)) for key, value in BENCHMARK_INPUTS.items()}
+    for key in ('leads_per_sdr', 'lead_to_marketfit_pct', 'platform_churn_pct', 'price_ready'):
+        table[key] = table[key] * rng.uniform(0.5, 1.5, n)
+    table['series_a_month'] = rng.integers(1, 61, n).astype(float)
+    return table
+
+
+def _incremental_case():
+    model = IncrementalModel()
+    model.run(BENCHMARK_INPUTS, start_month="2026-01")
+    toggle = [0]
+
+    def edit():
+        toggle[0] ^= 1
+        model.run(dict(BENCHMARK_INPUTS, ar_days=45 + toggle[0]), start_month="2026-01")
+    return edit
+
+
+def _bowtie_case():
+    from ui_components import bowtie_html_by_timeframe
+    results = run_financial_model(BENCHMARK_INPUTS, start_month="2026-01")
+    return lambda: bowtie_html_by_timeframe(results['funnel'], results['pnl'], BENCHMARK_INPUTS)
+
+
+def _batch_case(n, months=MONTHS):
+    table = _scenario_table(n)
+    return lambda: run_financial_model_batch(table, months=months, start_month="2026-01")
+
+
+def _narrative_case():
+    results = run_financial_model(BENCHMARK_INPUTS, start_month="2026-01")
+    return lambda: generate_narrative(results)
+
+
+def _narrative_batch_case(n):
+    batch = run_financial_model_batch(_scenario_table(n), start_month="2026-01")
+    return lambda: generate_narrative_batch(batch)
+
+
+def _cohort_case(n, months):
+    from cohort_engine import cohort_matrix
+    table = _scenario_table(n)
+    column = lambda key: table[key][:, None]
+    return lambda: cohort_matrix(column('investor_license_start_mrr'), column('new_investor_licenses_q') * column('investor_license_price'),
+                                 column('platform_churn_pct'), column('platform_expansion_pct'), months=months)
+
+
+# name -> (setup returning a zero-argument callable, repeats); setup time is not measured
+BENCHMARK_CASES = {
+    "single_run": (lambda: lambda: run_financial_model(BENCHMARK_INPUTS, start_month="2026-01"), 300),
+    "incremental_edit": (_incremental_case, 300),
+    "batch_1k": (lambda: _batch_case(1_000), 30),
+    "batch_10k": (lambda: _batch_case(10_000), 10),
+    "long_horizon_600m": (lambda: _batch_case(100, months=600), 20),
+    "narrative": (_narrative_case, 300),
+    "narrative_batch_10k": (lambda: _narrative_batch_case(10_000), 30),
+    "bowtie_html": (_bowtie_case, 300),
+    "cohort_matrix_1k_240m": (lambda: _cohort_case(1_000, 240), 20),
+}
+
+
+def run_case(fn, repeats):
+    """Timings plus one traced call; memory figures are in KiB."""
+    fn() # warm-up (imports, caches)
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    net_allocations = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+
+    timings = np.asarray(timings)
+    return {
+        "repeats": repeats, "p50_ms": float(np.percentile(timings, 50)), "p95_ms": float(np.percentile(timings, 95)),
+        "min_ms": float(timings.min()), "net_allocations": int(net_allocations), "peak_kib": peak / 1024,
+    }
+
+
+def run_benchmarks(only=None, progress=None):
+    results = {}
+    for name, (setup, repeats) in BENCHMARK_CASES.items():
+        if only and name not in only:
+            continue
+        results[name] = run_case(setup(), repeats)
+        if progress:
+            progress(name, results[name])
+    return {
+        "machine": {"python": platform.python_version(), "numpy": np.__version__, "platform": platform.platform(),
+                    "cpus": os.cpu_count()},
+        "max_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "cases": results,
+    }
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """Regressions as (case, metric, baseline value, current value); cases missing from either side are skipped."""
+    regressions = []
+    for name, stats in current["cases"].items():
+        reference = baseline.get("cases", {}).get(name)
+        if reference is None:
+            continue
+        for metric in ("p50_ms", "peak_kib"):
+            if stats[metric] > reference[metric] * (1 + threshold):
+                regressions.append((name, metric, reference[metric], stats[metric]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the pro forma engine and fail on regressions.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file.")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed fractional regression.")
+    parser.add_argument("--only", nargs="*", help="Run only these cases.")
+    args = parser.parse_args(argv)
+
+    def report(name, stats):
+        print(f"{name:<22} p50 {stats['p50_ms']:9.3f} ms  p95 {stats['p95_ms']:9.3f} ms  "
+              f"{stats['net_allocations']:>7,} net allocs  peak {stats['peak_kib']:10,.1f} KiB", flush=True)
+
+    current = run_benchmarks(args.only, progress=report)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline first.")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get("machine") != current["machine"]:
+        print("Note: the baseline was recorded on a different machine or library versions; timings may not compare.")
+    regressions = compare(current, baseline, args.threshold)
+    for name, metric, before, after in regressions:
+        print(f"REGRESSION {name} {metric}: {before:,.3f} -> {after:,.3f} (+{after / before - 1:.0%})")
+    if regressions:
+        return 1
+    print(f"No regressions beyond {args.threshold:.0%}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
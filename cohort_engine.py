@@ -0,0 +1,135 @@
+"""
+Cohort view of the investor-platform MRR.
+
+The engine's platform_mrr is one blended balance. Here each quarterly license cohort is tracked on
+its own: the opening MRR is cohort 0 (month 0) and cohort k joins in month 3k with the quarter's new
+license MRR. Each cohort follows its own retention curves by age, built as cumulative products of
+monthly factors:
+
+    dollar curve  = cumprod(1 - churn + expansion)    MRR relative to the cohort's first month
+    logo curve    = cumprod(1 - churn)                share of the cohort's licenses still active
+
+and the (cohorts x months) MRR matrix is one gather of those curves by cohort age. With uniform
+parameters the column sums equal run_financial_model's platform MRR.
+
+Any leading batch axes broadcast, so thousands of scenarios or cohorts over long horizons are a
+single array operation.
+"""
+import numpy as np
+import pandas as pd
+
+from financial_engine import INPUT_DEFAULTS, MONTHS, month_labels
+
+COHORT_INPUTS = ('investor_license_start_mrr', 'new_investor_licenses_q', 'investor_license_price',
+                 'platform_churn_pct', 'platform_expansion_pct')
+
+
+def cohort_starts(months: int = MONTHS):
+    """Month index each cohort joins: 0 for the opening MRR, then every third month."""
+    return np.arange(0, months, 3)
+
+
+def _age_rates(rate, months, cohorts, name):
+    """A monthly rate as (..., cohorts or 1, months) by age: given per cohort and age, or per cohort / scenario."""
+    rate = np.asarray(rate, dtype=float)
+    shape = rate.shape
+    if rate.ndim < 2 or rate.shape[-1] != months:
+        rate = rate[..., None]
+    # _by_calendar_month strides over the cohort axis, so any other length would read past the curve
+    if rate.ndim >= 2 and rate.shape[-2] not in (1, cohorts):
+        raise ValueError(f"{name} has shape {shape}; expected a scalar, "
+                         f"one value per scenario (..., 1), {cohorts} per cohort or ({cohorts}, {months}) by cohort and age")
+    return np.broadcast_to(rate, np.broadcast_shapes(rate.shape, (1, months)))
+
+
+def _curve(factors):
+    """Cumulative product of monthly factors by age; age 0 is the cohort's first month (1.0)."""
+    return np.cumprod(np.concatenate([np.ones(factors.shape[:-1] + (1,)), factors[..., 1:]], axis=-1), axis=-1)
+
+
+def _by_calendar_month(curve, cohorts, fill):
+    """
+    (..., cohorts, months) read-only view of by-age curves in calendar months: cohort k's row is its
+    curve shifted right by 3k months, preceded by `fill`. A single strided view of one padded array
+    (a curve shared by every cohort is stored once), so nothing is gathered or copied per cohort.
+    """
+    lead = 3 * (cohorts - 1)
+    padded = np.concatenate([np.full(curve.shape[:-1] + (lead,), fill), curve], axis=-1)
+    item = padded.strides[-1]
+    row = padded.strides[-2] if curve.shape[-2] > 1 else 0
+    # view[..., k, t] = padded[..., k, lead - 3k + t]
+    return np.lib.stride_tricks.as_strided(padded[..., :1, lead:], shape=padded.shape[:-2] + (cohorts, curve.shape[-1]),
+                                           strides=padded.strides[:-2] + (row - 3 * item, item), writeable=False)
+
+
+def cohort_matrix(start_mrr, new_mrr, churn_pct, expansion_pct, months: int = MONTHS):
+    """
+    Cohort-level MRR, dollar retention and logo retention, each (..., cohorts, months).
+
+    start_mrr is the opening MRR (cohort 0) and new_mrr each later cohort's starting MRR; churn_pct
+    and expansion_pct are annual percentages. Each is a scalar or an array whose last axis is 1 (one
+    value per scenario, like the engine's (N, 1) batch columns) or one entry per cohort (cohorts - 1
+    for new_mrr); the rates may also vary by age with trailing axes (cohorts, months). Leading batch
+    axes broadcast throughout. Only the MRR matrix is materialised; the retention matrices are
+    read-only views and are NaN before each cohort exists.
+    """
+    starts = cohort_starts(months)
+    cohorts = len(starts)
+    start_mrr = np.asarray(start_mrr, dtype=float).reshape(np.shape(start_mrr)[:-1] + (1,) if np.ndim(start_mrr) else (1,))
+    new_mrr = np.asarray(new_mrr, dtype=float)
+    new_mrr = np.broadcast_to(new_mrr, np.broadcast_shapes(new_mrr.shape, start_mrr.shape[:-1] + (cohorts - 1,)))
+    start_mrr = np.broadcast_to(start_mrr, new_mrr.shape[:-1] + (1,))
+    initial_mrr = np.concatenate([start_mrr, new_mrr], axis=-1)
+
+    churn = _age_rates(np.asarray(churn_pct, dtype=float) / 100 / 12, months, cohorts, "churn_pct")
+    expansion = _age_rates(np.asarray(expansion_pct, dtype=float) / 100 / 12, months, cohorts, "expansion_pct")
+    dollar_curve = _curve(1 - churn + expansion)
+    logo_curve = _curve(1 - churn)
+
+    mrr = initial_mrr[..., None] * _by_calendar_month(dollar_curve, cohorts, 0.0)
+    return {
+        "starts": starts, "mrr": mrr,
+        "dollar_retention": _by_calendar_month(dollar_curve, cohorts, np.nan),
+        "logo_retention": _by_calendar_month(logo_curve, cohorts, np.nan),
+    }
+
+
+def trailing_ndr(mrr, window: int = 12):
+    """
+    Platform net dollar retention over the trailing `window` months: MRR today from the cohorts that
+    already existed `window` months ago, over their MRR then. NaN for the first `window` months.
+    """
+    months = mrr.shape[-1]
+    starts = cohort_starts(months)
+    ndr = np.full(mrr.shape[:-2] + (months,), np.nan)
+    if months > window:
+        existed = starts[:, None] <= np.arange(window, months) - window
+        retained = np.sum(np.where(existed, mrr[..., window:], 0.0), axis=-2)
+        base = np.sum(np.where(existed, mrr[..., :-window], 0.0), axis=-2)
+        ndr[..., window:] = np.divide(retained, base, out=np.full(retained.shape, np.nan), where=base != 0)
+    return ndr
+
+
+def run_cohort_model(inputs: dict, months: int = MONTHS, start_month=None, new_mrr=None, churn_pct=None, expansion_pct=None):
+    """
+    Cohort breakdown for one scenario's inputs, as DataFrames (cohort rows x month columns) labelled
+    by calendar month. new_mrr / churn_pct / expansion_pct override the uniform per-cohort values
+    the inputs imply (see cohort_matrix for their shapes).
+    """
+    p = {key: inputs.get(key, INPUT_DEFAULTS[key]) for key in COHORT_INPUTS}
+    matrix = cohort_matrix(
+        p['investor_license_start_mrr'],
+        p['new_investor_licenses_q'] * p['investor_license_price'] if new_mrr is None else new_mrr,
+        p['platform_churn_pct'] if churn_pct is None else churn_pct,
+        p['platform_expansion_pct'] if expansion_pct is None else expansion_pct,
+        months=months,
+    )
+    labels = month_labels(start_month, months)
+    cohort_labels = ["Opening"] + [f"{labels[start]} cohort" for start in matrix['starts'][1:]]
+    frame = lambda values: pd.DataFrame(values, index=cohort_labels, columns=labels)
+    return {
+        "mrr": frame(matrix['mrr']),
+        "dollar_retention": frame(matrix['dollar_retention']),
+        "logo_retention": frame(matrix['logo_retention']),
+        "platform": pd.DataFrame({"Platform MRR": matrix['mrr'].sum(axis=0), "Trailing 12M NDR": trailing_ndr(matrix['mrr'])}, index=labels),
+    }
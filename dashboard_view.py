@@ -0,0 +1,88 @@
+"""
+Dashboard view model: everything the CEO dashboard displays, derived once per model result.
+
+Monthly lines the dashboard aggregates are held as prefix sums (prefix[k] = sum of the first k
+months), so any year or window total is two lookups. Narrative prose, the scenario grade, the
+formatted statement tables and the bowtie pages are built here too, so widget changes that only
+pick a different slice never touch the model frames again.
+"""
+import numpy as np
+import pandas as pd
+
+from cohort_engine import run_cohort_model
+from narrative_engine import generate_narrative
+from ui_components import bowtie_html_by_timeframe
+
+# statement key -> display formatter for its table
+STATEMENT_FORMATS = {
+    "pnl": lambda x: f"${x:,.0f}",
+    "bs": lambda x: f"${x:,.0f}",
+    "cfs": lambda x: f"${x:,.0f}",
+    "kpis": lambda x: f"{x:,.2f}",
+}
+
+
+def prefix_sums(values):
+    """prefix[k] = sum of the first k values (NaN counted as 0), length len(values) + 1."""
+    return np.concatenate([[0.0], np.nancumsum(np.asarray(values, dtype=float))])
+
+
+def window_sum(view, statement, line, start_idx, end_idx):
+    """Total of one line item over months [start_idx, end_idx), clipped to the forecast."""
+    sums = view["prefix"][statement][line]
+    end_idx = min(end_idx, len(sums) - 1)
+    return float(sums[end_idx] - sums[min(start_idx, end_idx)])
+
+
+def _scenario_grade(kpis):
+    final_ltv_cac, final_payback, final_ndr = (kpis.iloc[-1] if not kpis.empty else [0,0,0])[['LTV/CAC', 'Payback Period (Months)', 'Net Dollar Retention']]
+    grade = "B"
+    if final_ltv_cac >= 3 and 0 < final_payback <= 18 and final_ndr >= 1.0: grade = "A"
+    elif final_ltv_cac < 2 or final_payback > 24 or final_ndr < 0.9: grade = "F"
+    grade_rationale = f"""- **LTV/CAC:** {final_ltv_cac:.1f}x\n- **Payback Period:** {final_payback:.1f} months\n- **Net Dollar Retention:** {final_ndr:.1%}"""
+    return grade, grade_rationale
+
+
+def _format_table(frame, formatter):
+    """Transposed statement with every cell pre-rendered as display text."""
+    table = frame.transpose()
+    return pd.DataFrame([[formatter(x) for x in row] for row in table.to_numpy()], index=table.index, columns=table.columns)
+
+
+def _cohort_tables(inputs, index):
+    """Platform MRR and logo retention by quarterly license cohort, formatted for display."""
+    cohorts = run_cohort_model(inputs, months=len(index))
+    mrr, logos = (cohorts[name].set_axis(index, axis=1) for name in ("mrr", "logo_retention"))
+    return {
+        "mrr": pd.DataFrame([[f"${x:,.0f}" for x in row] for row in mrr.to_numpy()], index=mrr.index, columns=mrr.columns),
+        "logo_retention": pd.DataFrame([["" if x != x else f"{x:.1%}" for x in row] for row in logos.to_numpy()], index=logos.index, columns=logos.columns),
+        "ndr": cohorts["platform"]["Trailing 12M NDR"].set_axis(index),
+    }
+
+
+def build_dashboard_view(results: dict, inputs: dict):
+    """Derives the dashboard's view model from one run_financial_model result."""
+    pnl, bs, kpis = results['pnl'], results['bs'], results['kpis']
+    grade, grade_rationale = _scenario_grade(kpis)
+    return {
+        "months": len(pnl),
+        "prefix": {name: {col: prefix_sums(results[name][col]) for col in results[name].columns} for name in ("pnl", "funnel")},
+        "cash": bs['Cash'].to_numpy(dtype=float),
+        "grade": grade,
+        "grade_rationale": grade_rationale,
+        "narrative": generate_narrative(results),
+        "tables": {name: _format_table(results[name], formatter) for name, formatter in STATEMENT_FORMATS.items()},
+        "cohorts": _cohort_tables(inputs, pnl.index),
+        "bowtie_html": bowtie_html_by_timeframe(results['funnel'], pnl, inputs) if not results['funnel'].empty and not pnl.empty else None,
+    }
+
+
+def projection_metrics(view, year: int):
+    """Revenue, EBITDA and ending cash for one projection year (1-based)."""
+    start_idx, end_idx = (year - 1) * 12, year * 12
+    cash = view["cash"]
+    return {
+        "revenue": window_sum(view, "pnl", "Revenue", start_idx, end_idx),
+        "ebitda": window_sum(view, "pnl", "EBITDA", start_idx, end_idx),
+        "ending_cash": cash[end_idx - 1] if end_idx <= len(cash) else cash[-1],
+    }
@@ -0,0 +1,169 @@
+"""
+Excel export of model results.
+
+Workbooks are written with xlsxwriter's constant_memory mode, which flushes each row to disk as soon
+as the next one starts, so a workbook holding hundreds of scenarios never sits in RAM as a whole.
+Statement roll-ups (Gross Profit, EBITDA, totals, CFO, ...) can be written as live formulas with the
+model's value cached in the cell.
+"""
+import io
+import re
+import threading
+from collections import OrderedDict
+
+# statement key -> (sheet name used for a single scenario, short suffix used per scenario)
+EXPORT_SHEETS = {
+    "pnl": ("Income Statement", "IS"),
+    "bs": ("Balance Sheet", "BS"),
+    "cfs": ("Cash Flow Statement", "CFS"),
+    "kpis": ("KPIs", "KPIs"),
+}
+
+# Roll-up line -> (sign, component line) terms it sums, per statement
+ROLLUP_FORMULAS = {
+    "pnl": {
+        "Gross Profit": [(1, "Revenue"), (-1, "COGS")],
+        "EBITDA": [(1, "Gross Profit"), (-1, "Operating Expenses")],
+        "Net Income": [(1, "EBITDA")],
+    },
+    "bs": {
+        "Total Assets": [(1, "Cash"), (1, "Accounts Receivable")],
+        "Total Liabilities & Equity": [(1, "Accounts Payable"), (1, "Equity")],
+    },
+    "cfs": {
+        "CFO": [(1, "Net Income"), (1, "Change in AR"), (1, "Change in AP")],
+        "CFI": [(1, "CapEx")],
+        "CFF": [(1, "Funding")],
+        "Net Change in Cash": [(1, "CFO"), (1, "CFI"), (1, "CFF")],
+    },
+}
+
+# Excel rejects these in sheet names, and names longer than 31 characters
+_INVALID_SHEET_CHARS = re.compile(r"[\[\]:*?/\\]")
+SHEET_NAME_MAX = 31
+
+COMPARISON_COLUMNS = ["Scenario", "Y1 Revenue", "Y5 Revenue", "Y5 EBITDA", "Ending Cash", "Minimum Cash", "Final LTV/CAC", "Final Payback (Months)"]
+
+
+def _col_letter(idx):
+    letters = ""
+    idx += 1
+    while idx:
+        idx, rem = divmod(idx - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _sheet_name(name, suffix, used):
+    """
+    "<name> <suffix>" as a valid sheet name: invalid characters become "_", the name is cut to fit 31
+    characters, and a " (2)", " (3)", ... tag keeps it unique (case-insensitively) among `used`.
+    """
+    base = _INVALID_SHEET_CHARS.sub("_", str(name)).strip(" '") or "Scenario"
+    for attempt in range(1, 10_000):
+        tag = f" ({attempt})" if attempt > 1 else ""
+        tail = f" {suffix}{tag}" if suffix else tag
+        sheet_name = base[:SHEET_NAME_MAX - len(tail)].rstrip().rstrip("'") + tail
+        if sheet_name.lower() not in used:
+            used.add(sheet_name.lower())
+            return sheet_name
+    raise ValueError(f"Too many sheets named like {name!r}")
+
+
+def _write_statement(workbook, sheet_name, frame, statement, formulas, formats):
+    """One statement sheet laid out like DataFrame.to_excel: months down column A, line items across."""
+    sheet = workbook.add_worksheet(sheet_name)
+    sheet.set_column(0, 0, 10)
+    sheet.set_column(1, len(frame.columns), 16)
+    sheet.write(0, 0, "", formats["header"])
+    for j, col in enumerate(frame.columns):
+        sheet.write(0, j + 1, col, formats["header"])
+
+    columns = list(frame.columns)
+    rollups = ROLLUP_FORMULAS.get(statement, {}) if formulas else {}
+    values = frame.to_numpy()
+    number_format = formats["ratio"] if statement == "kpis" else formats["money"]
+    for i, month in enumerate(frame.index):
+        row = i + 1
+        sheet.write_string(row, 0, str(month), formats["header"])
+        for j, col in enumerate(columns):
+            value = float(values[i, j])
+            terms = rollups.get(col)
+            if terms and all(term in columns for _, term in terms):
+                # Only live where the formula reproduces the model (the opening month's totals are zero by design)
+                implied = sum(sign * values[i, columns.index(term)] for sign, term in terms)
+                if abs(implied - value) <= 1:
+                    cells = "".join(f"{'+' if sign > 0 else '-'}{_col_letter(columns.index(term) + 1)}{row + 1}" for sign, term in terms)
+                    sheet.write_formula(row, j + 1, "=" + cells.lstrip("+"), number_format, value)
+                    continue
+            sheet.write_number(row, j + 1, value, number_format)
+
+
+def _comparison_row(name, results):
+    pnl, bs, kpis = results["pnl"], results["bs"], results["kpis"]
+    final_year = slice(max(len(pnl) - 12, 0), len(pnl))
+    return [
+        name, pnl["Revenue"].iloc[:12].sum(), pnl["Revenue"].iloc[final_year].sum(), pnl["EBITDA"].iloc[final_year].sum(),
+        bs["Cash"].iloc[-1], bs["Cash"].min(), kpis["LTV/CAC"].iloc[-1], kpis["Payback Period (Months)"].iloc[-1],
+    ]
+
+
+def write_workbook(scenarios: dict, output, formulas: bool = False):
+    """
+    Writes {scenario name: results} to `output` (a path or binary file object). A single scenario uses
+    the classic four sheet names; several scenarios get one sheet per statement per scenario plus a
+    leading "Comparison" sheet of headline metrics.
+    """
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(output, {"constant_memory": True})
+    formats = {
+        "header": workbook.add_format({"bold": True}),
+        "money": workbook.add_format({"num_format": "#,##0"}),
+        "ratio": workbook.add_format({"num_format": "#,##0.00"}),
+    }
+    multi = len(scenarios) > 1
+    used = set()
+    if multi:
+        sheet = workbook.add_worksheet(_sheet_name("Comparison", "", used))
+        sheet.set_column(0, 0, 28)
+        sheet.set_column(1, len(COMPARISON_COLUMNS) - 1, 16)
+        for j, col in enumerate(COMPARISON_COLUMNS):
+            sheet.write(0, j, col, formats["header"])
+        for i, (name, results) in enumerate(scenarios.items()):
+            row = _comparison_row(str(name), results)
+            sheet.write_string(i + 1, 0, row[0])
+            for j, value in enumerate(row[1:]):
+                sheet.write_number(i + 1, j + 1, float(value), formats["ratio"] if j >= 5 else formats["money"])
+
+    for name, results in scenarios.items():
+        for statement, (full_name, suffix) in EXPORT_SHEETS.items():
+            sheet_name = _sheet_name(name, suffix, used) if multi else _sheet_name(full_name, "", used)
+            _write_statement(workbook, sheet_name, results[statement], statement, formulas, formats)
+    workbook.close()
+
+
+def workbook_bytes(scenarios: dict, formulas: bool = False):
+    buffer = io.BytesIO()
+    write_workbook(scenarios, buffer, formulas)
+    return buffer.getvalue()
+
+
+_export_cache = OrderedDict()
+_export_cache_lock = threading.Lock()
+EXPORT_CACHE_ENTRIES = 16
+
+
+def cached_workbook_bytes(result_key: str, results: dict, formulas: bool = False):
+    """workbook_bytes for one scenario, memoised per result hash (see scenario_cache.scenario_key)."""
+    key = (result_key, formulas)
+    with _export_cache_lock:
+        if key in _export_cache:
+            _export_cache.move_to_end(key)
+            return _export_cache[key]
+    data = workbook_bytes({"Scenario": results}, formulas)
+    with _export_cache_lock:
+        _export_cache[key] = data
+        while len(_export_cache) > EXPORT_CACHE_ENTRIES:
+            _export_cache.popitem(last=False)
+    return data
@@ -1,137 +1,441 @@
+import os
+import threading
+import time
 import numpy as np
 import pandas as pd
 from datetime import datetime
+from functools import lru_cache
 from dateutil.relativedelta import relativedelta
 
-def run_financial_model(inputs: dict):
-    MONTHS = 60
-    start_date = datetime.now()
-    months = [d.strftime('%b-%y') for d in (start_date + relativedelta(months=i) for i in range(MONTHS))]
-    
-    # --- FUNNEL & GTM ENGINE ---
-    sdr_headcount = np.zeros(MONTHS); ae_headcount = np.zeros(MONTHS)
-    ae_hires = np.zeros(MONTHS); ae_headcount[0] = 1 # Start with 1 AE
-    sdr_headcount.fill(ae_headcount[0] * inputs.get('sdr_per_ae', 0)) # simplified for now
-    
-    leads = sdr_headcount * inputs.get('leads_per_sdr', 0)
-    market_fit_sales = leads * (inputs.get('lead_to_marketfit_pct', 0) / 100)
-    company_fit_sales = np.roll(market_fit_sales, 1) * (inputs.get('marketfit_to_companyfit_pct', 0) / 100)
-    ready_sales = np.roll(company_fit_sales, 1) * (inputs.get('companyfit_to_ready_pct', 0) / 100)
-    go_transactions = np.roll(ready_sales, 1) * (inputs.get('ready_to_go_pct', 0) / 100)
-    
-    funnel_df = pd.DataFrame({
-        "Leads Generated": leads, "Market Fit Deals": market_fit_sales,
-        "Company Fit Deals": company_fit_sales, "Ready Deals": ready_sales,
-        "Go Transactions": go_transactions
-    }, index=months)
-
-    # --- REVENUE & COSTS ---
-    rev_market_fit = market_fit_sales * inputs.get('price_market_fit', 0)
-    rev_company_fit = company_fit_sales * inputs.get('price_company_fit', 0)
-    rev_ready = ready_sales * inputs.get('price_ready', 0)
-    rev_go = go_transactions * inputs.get('avg_deal_size_go', 0) * (inputs.get('fee_pct_go', 0) / 100)
-    
-    platform_mrr = np.zeros(MONTHS)
-    platform_mrr[0] = inputs.get('investor_license_start_mrr', 1000)
-    for t in range(1, MONTHS):
-        new_licenses_mrr = (inputs.get('new_investor_licenses_q', 0) * inputs.get('investor_license_price', 0)) if (t % 3 == 0) else 0
-        churn_mrr_val = platform_mrr[t-1] * (inputs.get('platform_churn_pct', 0) / 100 / 12)
-        expansion_mrr_val = platform_mrr[t-1] * (inputs.get('platform_expansion_pct', 0) / 100 / 12)
-        platform_mrr[t] = platform_mrr[t-1] + new_licenses_mrr - churn_mrr_val + expansion_mrr_val
-        
-    total_revenue = rev_market_fit + rev_company_fit + rev_ready + rev_go + platform_mrr
-
-    quarters = np.floor(np.arange(MONTHS) / 3)
-    efficiency_multiplier = (1 - (inputs.get('analyst_efficiency_gain_pct', 0) / 100)) ** quarters
-    hours_per_report = inputs.get('analyst_hours_start', 0) * efficiency_multiplier
-    cogs_delivery = (market_fit_sales + company_fit_sales + ready_sales) * hours_per_report * inputs.get('analyst_hourly_cost', 0)
-    cogs_go = go_transactions * inputs.get('additional_hours_go', 0) * inputs.get('analyst_hourly_cost', 0)
-    total_cogs = cogs_delivery + cogs_go
-
-    cs_headcount = np.zeros(MONTHS); cs_headcount.fill(ae_headcount[0] * inputs.get('cs_per_ae', 0))
-    sdr_salary = inputs.get('ae_ote', 0) * 0.5 / 12
-    ae_salary = inputs.get('ae_ote', 0) / 12
-    cs_salary = inputs.get('cs_salary', 0) / 12
-    base_payroll = (sdr_headcount * sdr_salary) + (ae_headcount * ae_salary) + (cs_headcount * cs_salary)
-    tax_burden = base_payroll * (inputs.get('benefits_tax_pct', 0) / 100)
+from scenario_result import ScenarioResult
+
+MONTHS = 60
+
+# Bump whenever a change to the engine alters its output, so cached results are not reused across versions
+MODEL_VERSION = "2.2"
+
+# Every input the engine reads, with the value it falls back to when the key is missing
+INPUT_DEFAULTS = {
+    'sdr_per_ae': 0, 'leads_per_sdr': 0, 'lead_to_marketfit_pct': 0, 'marketfit_to_companyfit_pct': 0,
+    'companyfit_to_ready_pct': 0, 'ready_to_go_pct': 0,
+    'price_market_fit': 0, 'price_company_fit': 0, 'price_ready': 0, 'avg_deal_size_go': 0, 'fee_pct_go': 0,
+    'investor_license_start_mrr': 1000, 'new_investor_licenses_q': 0, 'investor_license_price': 0,
+    'platform_churn_pct': 0, 'platform_expansion_pct': 0,
+    'analyst_efficiency_gain_pct': 0, 'analyst_hours_start': 0, 'additional_hours_go': 0, 'analyst_hourly_cost': 0,
+    'cs_per_ae': 0, 'ae_ote': 0, 'cs_salary': 0, 'benefits_tax_pct': 0, 'sales_commission_pct': 0,
+    'ga_overhead_pct': 0, 'capex_per_new_hire': 0, 'ar_days': 45, 'ap_days': 30,
+    'starting_cash': 50000, 'seed_amount': 0, 'seed_month': 1, 'series_a_amount': 0, 'series_a_month': 1,
+}
+
+# The webapp's sidebar defaults: the scenario every new session opens on (prewarmed once per server)
+DEFAULT_SCENARIO = {
+    'sdr_per_ae': 2, 'leads_per_sdr': 40, 'lead_to_marketfit_pct': 50, 'marketfit_to_companyfit_pct': 30,
+    'companyfit_to_ready_pct': 20, 'ready_to_go_pct': 10, 'price_market_fit': 500, 'price_company_fit': 15000,
+    'price_ready': 50000, 'fee_pct_go': 1.5, 'avg_deal_size_go': 75000000, 'analyst_hours_start': 20,
+    'analyst_efficiency_gain_pct': 10, 'additional_hours_go': 10, 'analyst_hourly_cost': 75,
+    'investor_license_start_mrr': 1000, 'new_investor_licenses_q': 5, 'investor_license_price': 2500,
+    'platform_churn_pct': 10.0, 'platform_expansion_pct': 15.0, 'ae_ote': 150000, 'cs_salary': 80000,
+    'benefits_tax_pct': 25, 'sales_commission_pct': 10, 'ga_overhead_pct': 15, 'capex_per_new_hire': 3000,
+    'ar_days': 45, 'ap_days': 30, 'tax_rate_pct': 21, 'starting_cash': 50000, 'seed_amount': 750000,
+    'seed_month': 1, 'series_a_amount': 1250000, 'series_a_month': 18,
+}
+
+# Inputs that index a forecast month (1-based) and only make sense as whole numbers
+MONTH_INPUTS = ('seed_month', 'series_a_month')
+
+BS_COLUMNS = ['Cash', 'Accounts Receivable', 'Total Assets', 'Accounts Payable', 'Equity', 'Total Liabilities & Equity']
+CFS_COLUMNS = ['Net Income', 'Change in AR', 'Change in AP', 'CFO', 'CapEx', 'CFI', 'Funding', 'CFF', 'Net Change in Cash']
+
+# Output statements: line item -> engine array, plus the decimals each statement is rounded to
+STATEMENTS = {
+    "pnl": ({
+        "Revenue": "total_revenue", "COGS": "total_cogs", "Gross Profit": "gross_profit",
+        "Operating Expenses": "total_opex", "EBITDA": "ebitda", "Net Income": "net_income",
+    }, 0),
+    "bs": ({col: col for col in BS_COLUMNS}, 0),
+    "cfs": ({col: col for col in CFS_COLUMNS}, 0),
+    "kpis": ({
+        "Net Dollar Retention": "net_dollar_retention", "CAC": "cac", "LTV": "ltv",
+        "LTV/CAC": "ltv_cac", "Payback Period (Months)": "payback",
+    }, 2),
+    "funnel": ({
+        "Leads Generated": "leads", "Market Fit Deals": "market_fit_sales",
+        "Company Fit Deals": "company_fit_sales", "Ready Deals": "ready_sales",
+        "Go Transactions": "go_transactions",
+    }, 0),
+}
+# Column order of a ScenarioResult's values array: statements in STATEMENTS order, line items within each
+RESULT_LAYOUT = tuple((name, tuple(lines)) for name, (lines, _) in STATEMENTS.items())
+
+
+@lru_cache(maxsize=32)
+def _month_labels(year, month, count):
+    """'Mon-yy' labels for `count` months starting at the given calendar month."""
+    start_date = datetime(year, month, 1)
+    return pd.Index([d.strftime('%b-%y') for d in (start_date + relativedelta(months=i) for i in range(count))])
+
+
+def resolve_start_month(start_month=None):
+    """
+    The forecast's first month as 'YYYY-MM'. Accepts 'YYYY-MM', a date/datetime, or None for the
+    current month. Pin this when results must be reproducible (e.g. cached) rather than follow the clock.
+    """
+    if start_month is None:
+        start_month = datetime.now()
+    if isinstance(start_month, str):
+        start_month = datetime.strptime(start_month[:7], '%Y-%m')
+    return f"{start_month.year:04d}-{start_month.month:02d}"
+
+
+def month_labels(start_month=None, count=MONTHS):
+    year, month = map(int, resolve_start_month(start_month).split('-'))
+    return _month_labels(year, month, count)
+
+
+def _write_statements(values, arrays, statements=None):
+    """Fills (and rounds) the column slices of a ScenarioResult values array for the given statements."""
+    start = 0
+    for name, (lines, decimals) in STATEMENTS.items():
+        block = values[:, start:start + len(lines)]
+        start += len(lines)
+        if statements is not None and name not in statements:
+            continue
+        for j, key in enumerate(lines.values()):
+            block[:, j] = arrays[key]
+        np.round(block, decimals, out=block)
+
+
+def _result(arrays, index, dtype=np.float64):
+    """One run's arrays as a ScenarioResult over a single contiguous block."""
+    values = np.empty((len(index), sum(len(columns) for _, columns in RESULT_LAYOUT)))
+    _write_statements(values, arrays)
+    return ScenarioResult(values if np.dtype(dtype) == np.float64 else values.astype(dtype), index, RESULT_LAYOUT)
+
+
+# --- MODEL STAGES ---
+# Each stage reads parameters from `p` (scalars for one scenario, (N, 1) columns for a batch) and
+# arrays produced by earlier stages from `ctx`, and returns its own arrays with months on the last axis.
+
+def _funnel_stage(p, ctx, months):
+    shape = np.broadcast_shapes(*(np.shape(v) for v in p.values()))[:-1] + (months,)
+    ae_headcount = np.zeros(months); ae_headcount[0] = 1 # Start with 1 AE
+    ae_hires = np.zeros(months)
+    sdr_headcount = np.ones(shape) * (ae_headcount[0] * p['sdr_per_ae']) # simplified for now
+
+    leads = sdr_headcount * p['leads_per_sdr']
+    market_fit_sales = leads * (p['lead_to_marketfit_pct'] / 100)
+    company_fit_sales = np.roll(market_fit_sales, 1, axis=-1) * (p['marketfit_to_companyfit_pct'] / 100)
+    ready_sales = np.roll(company_fit_sales, 1, axis=-1) * (p['companyfit_to_ready_pct'] / 100)
+    go_transactions = np.roll(ready_sales, 1, axis=-1) * (p['ready_to_go_pct'] / 100)
+    return {
+        "sdr_headcount": sdr_headcount, "ae_headcount": ae_headcount, "ae_hires": ae_hires,
+        "leads": leads, "market_fit_sales": market_fit_sales, "company_fit_sales": company_fit_sales,
+        "ready_sales": ready_sales, "go_transactions": go_transactions,
+    }
+
+
+def _platform_mrr(p, shape):
+    """
+    Investor-platform MRR: quarterly license adds, monthly churn and expansion on the prior balance.
+    Closed form of the month-by-month roll-forward: with g = 1 - churn + expansion, the opening MRR
+    decays as g**t and the k-th quarterly cohort (added in month 3k) as g**(t - 3k), so month t holds
+    start * g**t + new * g**(t % 3) * (1 + g**3 + ... + g**(3(n-1))) for its n = t // 3 cohorts.
+    cohort_engine breaks the same balance out per cohort.
+    """
+    t = np.arange(shape[-1])
+    start_mrr = np.reshape(p['investor_license_start_mrr'], shape[:-1] + (1,))
+    new_licenses_mrr = np.reshape(p['new_investor_licenses_q'] * p['investor_license_price'], shape[:-1] + (1,))
+    growth = np.reshape(1 - p['platform_churn_pct'] / 100 / 12 + p['platform_expansion_pct'] / 100 / 12, shape[:-1] + (1,))
+    cohorts = t // 3
+    # geometric[..., n] = sum of the first n powers of g**3, one prefix sum over the quarters
+    quarter_powers = growth ** (3 * np.arange(cohorts[-1]))
+    geometric = np.concatenate([np.zeros(shape[:-1] + (1,)), np.cumsum(quarter_powers, axis=-1)], axis=-1)
+    return start_mrr * growth ** t + new_licenses_mrr * growth ** (t % 3) * geometric[..., cohorts]
+
+
+def _platform_mrr_stage(p, ctx, months):
+    shape = np.broadcast_shapes(*(np.shape(v) for v in p.values()))[:-1] + (months,)
+    return {"platform_mrr": _platform_mrr(p, shape)}
+
+
+def _revenue_stage(p, ctx, months):
+    rev_market_fit = ctx['market_fit_sales'] * p['price_market_fit']
+    rev_company_fit = ctx['company_fit_sales'] * p['price_company_fit']
+    rev_ready = ctx['ready_sales'] * p['price_ready']
+    rev_go = ctx['go_transactions'] * p['avg_deal_size_go'] * (p['fee_pct_go'] / 100)
+    platform_mrr = ctx['platform_mrr']
+    return {
+        "rev_market_fit": rev_market_fit, "rev_company_fit": rev_company_fit, "rev_ready": rev_ready,
+        "rev_go": rev_go,
+        "total_revenue": rev_market_fit + rev_company_fit + rev_ready + rev_go + platform_mrr,
+    }
+
+
+def _cogs_stage(p, ctx, months):
+    quarters = np.floor(np.arange(months) / 3)
+    efficiency_multiplier = (1 - (p['analyst_efficiency_gain_pct'] / 100)) ** quarters
+    hours_per_report = p['analyst_hours_start'] * efficiency_multiplier
+    cogs_delivery = (ctx['market_fit_sales'] + ctx['company_fit_sales'] + ctx['ready_sales']) * hours_per_report * p['analyst_hourly_cost']
+    cogs_go = ctx['go_transactions'] * p['additional_hours_go'] * p['analyst_hourly_cost']
+    return {"total_cogs": cogs_delivery + cogs_go}
+
+
+def _opex_stage(p, ctx, months):
+    cs_headcount = np.ones(months) * (ctx['ae_headcount'][0] * p['cs_per_ae'])
+    sdr_salary = p['ae_ote'] * 0.5 / 12
+    ae_salary = p['ae_ote'] / 12
+    cs_salary = p['cs_salary'] / 12
+    base_payroll = (ctx['sdr_headcount'] * sdr_salary) + (ctx['ae_headcount'] * ae_salary) + (cs_headcount * cs_salary)
+    tax_burden = base_payroll * (p['benefits_tax_pct'] / 100)
     total_payroll = base_payroll + tax_burden
-    commissions = (rev_market_fit + rev_company_fit + rev_ready + rev_go) * (inputs.get('sales_commission_pct', 0) / 100)
-    g_and_a = total_revenue * (inputs.get('ga_overhead_pct', 0) / 100)
-    total_opex = total_payroll + commissions + g_and_a
-
-    # --- 3-STATEMENT MODEL ---
-    pnl = pd.DataFrame(index=months)
-    pnl["Revenue"] = total_revenue
-    pnl["COGS"] = total_cogs
-    pnl["Gross Profit"] = pnl["Revenue"] - pnl["COGS"]
-    pnl["Operating Expenses"] = total_opex
-    pnl["EBITDA"] = pnl["Gross Profit"] - pnl["Operating Expenses"]
-    pnl["Net Income"] = pnl["EBITDA"] # Simplified
-
-    bs = pd.DataFrame(0, index=months, columns=['Cash', 'Accounts Receivable', 'Total Assets', 'Accounts Payable', 'Equity', 'Total Liabilities & Equity'])
-    cfs = pd.DataFrame(0, index=months, columns=['Net Income', 'Change in AR', 'Change in AP', 'CFO', 'CapEx', 'CFI', 'Funding', 'CFF', 'Net Change in Cash'])
-
-    funding = np.zeros(MONTHS)
-    seed_month = inputs.get('seed_month', 1) - 1
-    series_a_month = inputs.get('series_a_month', 1) - 1
-    if 0 <= seed_month < MONTHS: funding[seed_month] = inputs.get('seed_amount', 0)
-    if 0 <= series_a_month < MONTHS: funding[series_a_month] = inputs.get('series_a_amount', 0)
-    
-    bs.loc[months[0], 'Cash'] = funding[0] + inputs.get('starting_cash', 50000)
-    bs.loc[months[0], 'Equity'] = funding[0] + inputs.get('starting_cash', 50000)
-    
-    for t in range(1, MONTHS):
-        ar_t = total_revenue[t] * (inputs.get('ar_days', 45) / 30.4)
-        ar_t_minus_1 = bs.loc[months[t-1], 'Accounts Receivable']
-        change_in_ar = -(ar_t - ar_t_minus_1)
-        
-        ap_t = total_opex[t] * (inputs.get('ap_days', 30) / 30.4)
-        ap_t_minus_1 = bs.loc[months[t-1], 'Accounts Payable']
-        change_in_ap = ap_t - ap_t_minus_1
-        
-        cfs.loc[months[t], 'Net Income'] = pnl.loc[months[t], 'Net Income']
-        cfs.loc[months[t], 'Change in AR'] = change_in_ar
-        cfs.loc[months[t], 'Change in AP'] = change_in_ap
-        cfs.loc[months[t], 'CFO'] = cfs.loc[months[t], 'Net Income'] + change_in_ar + change_in_ap
-        
-        capex = -inputs.get('capex_per_new_hire', 0) * (ae_hires[t])
-        cfs.loc[months[t], 'CFI'] = capex
-        cfs.loc[months[t], 'CFF'] = funding[t]
-        
-        net_cash_change = cfs.loc[months[t], 'CFO'] + cfs.loc[months[t], 'CFI'] + cfs.loc[months[t], 'CFF']
-        cfs.loc[months[t], 'Net Change in Cash'] = net_cash_change
-        
-        bs.loc[months[t], 'Cash'] = bs.loc[months[t-1], 'Cash'] + net_cash_change
-        bs.loc[months[t], 'Accounts Receivable'] = ar_t
-        bs.loc[months[t], 'Accounts Payable'] = ap_t
-        bs.loc[months[t], 'Equity'] = bs.loc[months[t-1], 'Equity'] + pnl.loc[months[t], 'Net Income'] + funding[t]
-        bs.loc[months[t], 'Total Assets'] = bs.loc[months[t], 'Cash'] + bs.loc[months[t], 'Accounts Receivable']
-        bs.loc[months[t], 'Total Liabilities & Equity'] = bs.loc[months[t], 'Accounts Payable'] + bs.loc[months[t], 'Equity']
-
-    # --- KPI CALCULATIONS ---
-    kpis = pd.DataFrame(index=months)
-    
-    monthly_churn = inputs.get('platform_churn_pct', 0) / 100 / 12
-    monthly_expansion = inputs.get('platform_expansion_pct', 0) / 100 / 12
-    kpis['Net Dollar Retention'] = 1 - monthly_churn + monthly_expansion
-    
+    commissions = (ctx['rev_market_fit'] + ctx['rev_company_fit'] + ctx['rev_ready'] + ctx['rev_go']) * (p['sales_commission_pct'] / 100)
+    g_and_a = ctx['total_revenue'] * (p['ga_overhead_pct'] / 100)
+    return {"cs_headcount": cs_headcount, "total_payroll": total_payroll, "commissions": commissions, "total_opex": total_payroll + commissions + g_and_a}
+
+
+def _pnl_stage(p, ctx, months):
+    gross_profit = ctx['total_revenue'] - ctx['total_cogs']
+    ebitda = gross_profit - ctx['total_opex']
+    return {"gross_profit": gross_profit, "ebitda": ebitda, "net_income": ebitda} # Net Income simplified to EBITDA
+
+
+def _statement_stage(p, ctx, months):
+    month_idx = np.arange(months)
+    # A Series A closing in the same month as the seed replaces it, as it always has
+    funding = np.where(month_idx == p['series_a_month'] - 1, p['series_a_amount'],
+                       np.where(month_idx == p['seed_month'] - 1, p['seed_amount'], 0.0))
+    capex = -p['capex_per_new_hire'] * ctx['ae_hires']
+    return _three_statement_arrays(
+        net_income=ctx['net_income'], total_revenue=ctx['total_revenue'], total_opex=ctx['total_opex'],
+        funding=funding, capex=capex, starting_cash=p['starting_cash'],
+        ar_days=p['ar_days'], ap_days=p['ap_days']
+    )
+
+
+def _kpi_stage(p, ctx, months):
+    shape = ctx['total_revenue'].shape
+    monthly_churn = p['platform_churn_pct'] / 100 / 12
+    monthly_expansion = p['platform_expansion_pct'] / 100 / 12
+    net_dollar_retention = np.ones(shape) * (1 - monthly_churn + monthly_expansion)
+
     # CAC: Simplified as total payroll + commissions / number of new deals
-    new_deals_count = market_fit_sales # Use this as the proxy for 'new customers'
-    kpis['CAC'] = np.divide(total_payroll + commissions, new_deals_count, out=np.zeros_like(total_payroll), where=new_deals_count!=0)
+    new_deals_count = ctx['market_fit_sales'] # Use this as the proxy for 'new customers'
+    cac = np.divide(ctx['total_payroll'] + ctx['commissions'], new_deals_count, out=np.zeros(shape), where=new_deals_count!=0)
 
     # LTV: Avg Monthly Rev per new deal * Gross Margin % * Customer Lifetime
-    avg_monthly_rev_per_deal = np.divide(rev_market_fit, new_deals_count, out=np.zeros_like(rev_market_fit), where=new_deals_count!=0)
-    gross_margin_pct = np.divide(pnl['Gross Profit'], pnl['Revenue'], out=np.zeros_like(pnl['Gross Profit']), where=pnl['Revenue']!=0)
-    customer_lifetime_months = 1 / max(monthly_churn, 0.001) # Avoid division by zero
-    kpis['LTV'] = avg_monthly_rev_per_deal * gross_margin_pct * customer_lifetime_months
-    
-    kpis['LTV/CAC'] = np.divide(kpis['LTV'], kpis['CAC'], out=np.zeros_like(kpis['LTV']), where=kpis['CAC']!=0)
-    
+    avg_monthly_rev_per_deal = np.divide(ctx['rev_market_fit'], new_deals_count, out=np.zeros(shape), where=new_deals_count!=0)
+    gross_margin_pct = np.divide(ctx['gross_profit'], ctx['total_revenue'], out=np.zeros(shape), where=ctx['total_revenue']!=0)
+    customer_lifetime_months = 1 / np.maximum(monthly_churn, 0.001) # Avoid division by zero
+    ltv = avg_monthly_rev_per_deal * gross_margin_pct * customer_lifetime_months
+
+    ltv_cac = np.divide(ltv, cac, out=np.zeros(shape), where=cac!=0)
+
     # Payback Period (Months) = CAC / (Avg Monthly Rev per Deal * Gross Margin %)
     monthly_profit_per_deal = avg_monthly_rev_per_deal * gross_margin_pct
-    kpis['Payback Period (Months)'] = np.divide(kpis['CAC'], monthly_profit_per_deal, out=np.zeros_like(kpis['CAC']), where=monthly_profit_per_deal!=0)
+    payback = np.divide(cac, monthly_profit_per_deal, out=np.zeros(shape), where=monthly_profit_per_deal!=0)
+    return {"net_dollar_retention": net_dollar_retention, "cac": cac, "ltv": ltv, "ltv_cac": ltv_cac, "payback": payback}
+
+
+def _three_statement_arrays(net_income, total_revenue, total_opex, funding, capex, starting_cash, ar_days, ap_days):
+    """
+    Balance sheet and cash flow lines as plain arrays, computed along the last (month) axis.
+    Month 0 is the opening position: only Cash and Equity are populated, every flow is zero.
+    """
+    month0 = np.zeros(net_income.shape, dtype=bool)
+    month0[..., 0] = True
+    opening_cash = funding[..., :1] + starting_cash
+
+    # Working capital balances are closed-form in the current month's revenue / opex
+    ar = np.where(month0, 0.0, total_revenue * (ar_days / 30.4))
+    ap = np.where(month0, 0.0, total_opex * (ap_days / 30.4))
+    change_in_ar = -np.diff(ar, axis=-1, prepend=0.0)
+    change_in_ap = np.diff(ap, axis=-1, prepend=0.0)
+
+    cfs_net_income = np.where(month0, 0.0, net_income)
+    cfo = cfs_net_income + change_in_ar + change_in_ap
+    cfi = np.where(month0, 0.0, capex)
+    cff = np.where(month0, 0.0, funding)
+    net_change_in_cash = cfo + cfi + cff
+
+    # Cash and equity roll forward from the opening position as running sums
+    cash = np.cumsum(np.where(month0, opening_cash, net_change_in_cash), axis=-1)
+    equity = np.cumsum(np.where(month0, opening_cash, cfs_net_income + cff), axis=-1)
 
     return {
-        "pnl": pnl.round(0), "bs": bs.round(0), "cfs": cfs.round(0),
-        "kpis": kpis.round(2), "funnel": funnel_df.round(0)
+        'Cash': cash, 'Accounts Receivable': ar,
+        'Total Assets': np.where(month0, 0.0, cash + ar),
+        'Accounts Payable': ap, 'Equity': equity,
+        'Total Liabilities & Equity': np.where(month0, 0.0, ap + equity),
+        'Net Income': cfs_net_income, 'Change in AR': change_in_ar, 'Change in AP': change_in_ap,
+        'CFO': cfo, 'CapEx': np.zeros(net_income.shape), 'CFI': cfi, 'Funding': np.zeros(net_income.shape),
+        'CFF': cff, 'Net Change in Cash': net_change_in_cash,
+    }
+
+
+# Stage name -> (function, input keys it reads, upstream stages whose arrays it reads), in run order
+STAGE_GRAPH = {
+    "funnel": (_funnel_stage, ('sdr_per_ae', 'leads_per_sdr', 'lead_to_marketfit_pct', 'marketfit_to_companyfit_pct',
+                               'companyfit_to_ready_pct', 'ready_to_go_pct'), ()),
+    "platform_mrr": (_platform_mrr_stage, ('investor_license_start_mrr', 'new_investor_licenses_q', 'investor_license_price',
+                                           'platform_churn_pct', 'platform_expansion_pct'), ()),
+    "revenue": (_revenue_stage, ('price_market_fit', 'price_company_fit', 'price_ready', 'avg_deal_size_go', 'fee_pct_go'),
+                ("funnel", "platform_mrr")),
+    "cogs": (_cogs_stage, ('analyst_efficiency_gain_pct', 'analyst_hours_start', 'analyst_hourly_cost', 'additional_hours_go'), ("funnel",)),
+    "opex": (_opex_stage, ('cs_per_ae', 'ae_ote', 'cs_salary', 'benefits_tax_pct', 'sales_commission_pct', 'ga_overhead_pct'), ("funnel", "revenue")),
+    "pnl": (_pnl_stage, (), ("revenue", "cogs", "opex")),
+    "statements": (_statement_stage, ('series_a_month', 'series_a_amount', 'seed_month', 'seed_amount', 'capex_per_new_hire',
+                                      'starting_cash', 'ar_days', 'ap_days'), ("funnel", "revenue", "opex", "pnl")),
+    "kpis": (_kpi_stage, ('platform_churn_pct', 'platform_expansion_pct'), ("funnel", "revenue", "opex", "pnl")),
+}
+MODEL_STAGES = [stage for stage, _, _ in STAGE_GRAPH.values()]
+
+
+# --- OPTIONAL STAGE PROFILING ---
+# Off by default (one None check per run). EXITPATH_PROFILE_STAGES=1 or enable_stage_profiling()
+# turns it on for the whole process; stage_profile() reports cumulative per-stage timings.
+_stage_profile = {} if os.getenv("EXITPATH_PROFILE_STAGES") == "1" else None
+_stage_profile_lock = threading.Lock()
+
+
+def enable_stage_profiling(enabled: bool = True):
+    global _stage_profile
+    if not enabled:
+        _stage_profile = None
+    elif _stage_profile is None:
+        _stage_profile = {}
+
+
+def stage_profiling_enabled():
+    return _stage_profile is not None
+
+
+def record_stage_time(stage: str, seconds: float):
+    """Adds one timed call of `stage` to the profile; a no-op while profiling is off."""
+    profile = _stage_profile
+    if profile is None:
+        return
+    with _stage_profile_lock:
+        stats = profile.setdefault(stage, {"calls": 0, "total_s": 0.0, "last_s": 0.0, "max_s": 0.0})
+        stats["calls"] += 1
+        stats["total_s"] += seconds
+        stats["last_s"] = seconds
+        stats["max_s"] = max(stats["max_s"], seconds)
+
+
+def stage_profile():
+    """{stage: {"calls", "total_ms", "mean_ms", "last_ms", "max_ms"}} since profiling was enabled or reset."""
+    with _stage_profile_lock:
+        return {
+            stage: {"calls": stats["calls"], "total_ms": stats["total_s"] * 1000, "mean_ms": stats["total_s"] * 1000 / stats["calls"],
+                    "last_ms": stats["last_s"] * 1000, "max_ms": stats["max_s"] * 1000}
+            for stage, stats in (_stage_profile or {}).items()
+        }
+
+
+def reset_stage_profile():
+    with _stage_profile_lock:
+        if _stage_profile is not None:
+            _stage_profile.clear()
+
+
+def _model_arrays(p, months=MONTHS):
+    """Runs every stage in order and returns the combined namespace of engine arrays."""
+    ctx = {}
+    if _stage_profile is None:
+        for stage in MODEL_STAGES:
+            ctx.update(stage(p, ctx, months))
+        return ctx
+    for name, (stage, _, _) in STAGE_GRAPH.items():
+        started = time.perf_counter()
+        ctx.update(stage(p, ctx, months))
+        record_stage_time(name, time.perf_counter() - started)
+    return ctx
+
+
+def _batch_params(scenarios):
+    """Input table (DataFrame or dict of equal-length arrays) -> engine parameters as (N, 1) float columns."""
+    table = pd.DataFrame(scenarios)
+    p = {}
+    for key, default in INPUT_DEFAULTS.items():
+        values = table[key].to_numpy(dtype=float) if key in table.columns else np.full(len(table), np.nan)
+        p[key] = np.where(np.isnan(values), float(default), values)[:, None] # blanks fall back like inputs.get
+    return p, table.index
+
+
+def run_financial_model(inputs: dict, start_month=None, dtype=np.float64):
+    """
+    One scenario as a ScenarioResult: results['pnl'], ['bs'], ['cfs'], ['kpis'] and ['funnel'] are
+    DataFrames indexed by month. dtype=np.float32 halves the footprint of results kept around.
+    """
+    months = month_labels(start_month, MONTHS)
+    p = {key: inputs.get(key, default) for key, default in INPUT_DEFAULTS.items()}
+    arrays = _model_arrays(p, MONTHS)
+
+    # --- OUTPUT (one contiguous block, built once from the finished arrays) ---
+    started = time.perf_counter()
+    results = _result(arrays, months, dtype)
+    record_stage_time("frames", time.perf_counter() - started)
+    return results
+
+
+def run_financial_model_batch(scenarios, months=MONTHS, start_month=None):
+    """
+    Runs many input sets at once as (scenarios x months) arrays.
+    `scenarios` is a DataFrame (one row per scenario) or a dict of equal-length arrays; missing keys
+    and blank cells fall back to INPUT_DEFAULTS. Returns {"scenarios", "months", <statement>: {line item: (N, months) array}},
+    rounded exactly like run_financial_model.
+    """
+    p, scenario_index = _batch_params(scenarios)
+    arrays = _model_arrays(p, months)
+    batch = {"scenarios": scenario_index, "months": month_labels(start_month, months)}
+    for name, (lines, decimals) in STATEMENTS.items():
+        batch[name] = {col: np.round(arrays[key], decimals) for col, key in lines.items()}
+    return batch
+
+
+def batch_scenario(batch, i):
+    """The i-th scenario of a batch as the same ScenarioResult run_financial_model returns."""
+    values = np.column_stack([batch[name][col][i] for name, columns in RESULT_LAYOUT for col in columns])
+    return ScenarioResult(values, batch["months"], RESULT_LAYOUT)
+
+
+def batch_to_long(batch):
+    """Flattens a batch into a long frame: scenario, month, statement, line_item, value."""
+    n_scenarios, n_months = len(batch["scenarios"]), len(batch["months"])
+    scenario_col = np.repeat(batch["scenarios"].to_numpy(), n_months)
+    month_col = np.tile(batch["months"].to_numpy(), n_scenarios)
+    frames = [
+        pd.DataFrame({"scenario": scenario_col, "month": month_col, "statement": name, "line_item": col, "value": values.ravel()})
+        for name in STATEMENTS for col, values in batch[name].items()
+    ]
+    return pd.concat(frames, ignore_index=True)
+
+
+def summarize_batch(batch):
+    """
+    Headline metrics per scenario of a batch, as a DataFrame indexed like batch["scenarios"].
+    Month-valued metrics are 1-based forecast months (NaN when the event never happens).
+    """
+    cash = batch["bs"]["Cash"]
+    revenue, ebitda = batch["pnl"]["Revenue"], batch["pnl"]["EBITDA"]
+    n_scenarios, n_months = cash.shape
+
+    def first_month(mask):
+        return np.where(mask.any(axis=1), mask.argmax(axis=1) + 1.0, np.nan)
+
+    summary = {
+        "ending_cash": cash[:, -1],
+        "min_cash": cash.min(axis=1),
+        "min_cash_month": cash.argmin(axis=1) + 1.0,
+        "cash_out_month": first_month(cash < 0),
+        "breakeven_month": first_month(ebitda > 0),
+        "final_ltv_cac": batch["kpis"]["LTV/CAC"][:, -1],
+        "final_payback": batch["kpis"]["Payback Period (Months)"][:, -1],
     }
+    years = n_months // 12
+    yearly_revenue = revenue[:, :years * 12].reshape(n_scenarios, years, 12).sum(axis=2)
+    yearly_ebitda = ebitda[:, :years * 12].reshape(n_scenarios, years, 12).sum(axis=2)
+    for y in range(years):
+        summary[f"y{y + 1}_revenue"] = yearly_revenue[:, y]
+        summary[f"y{y + 1}_ebitda"] = yearly_ebitda[:, y]
+    return pd.DataFrame(summary, index=batch["scenarios"])
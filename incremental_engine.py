@@ -0,0 +1,71 @@
+"""
+Incremental recomputation of run_financial_model.
+
+IncrementalModel keeps every stage's arrays and the previous ScenarioResult. On the next run it
+diffs the inputs, marks the stages that read a changed key (plus everything downstream of them, per
+STAGE_GRAPH) as dirty, reruns only those, and rewrites only the statement columns fed by a dirty
+stage. Moving `ar_days` therefore reruns the statements stage and rewrites the BS/CFS columns only.
+"""
+import time
+
+from financial_engine import (INPUT_DEFAULTS, MONTHS, RESULT_LAYOUT, STAGE_GRAPH, STATEMENTS, _result, _write_statements,
+                              month_labels, record_stage_time, resolve_start_month)
+from scenario_result import ScenarioResult
+
+
+def dirty_stages(changed_keys):
+    """Stages that must rerun when `changed_keys` change, in run order."""
+    dirty = []
+    for name, (_, input_keys, upstream) in STAGE_GRAPH.items():
+        if set(input_keys) & set(changed_keys) or any(up in dirty for up in upstream):
+            dirty.append(name)
+    return dirty
+
+
+class IncrementalModel:
+    """Memoizing executor over STAGE_GRAPH; one instance per user session (it is not thread-safe)."""
+
+    def __init__(self):
+        self._params = None
+        self._start_month = None
+        self._outputs = {} # stage -> its arrays
+        self._producer = {} # array name -> stage that produced it
+        self._result = None
+        self.last_run = {"changed_inputs": [], "stages": [], "timings": {}}
+
+    def run(self, inputs: dict, start_month=None):
+        """Same result as run_financial_model(inputs, start_month), recomputing only what the input diff dirties."""
+        params = {key: inputs.get(key, default) for key, default in INPUT_DEFAULTS.items()}
+        start_month = resolve_start_month(start_month)
+        if self._params is None:
+            changed = list(params)
+        else:
+            changed = [key for key, value in params.items() if value != self._params[key]]
+        to_run = dirty_stages(changed)
+
+        ctx, timings = {}, {}
+        for name, (stage, _, _) in STAGE_GRAPH.items():
+            if name in to_run:
+                started = time.perf_counter()
+                self._outputs[name] = stage(params, ctx, MONTHS)
+                timings[name] = time.perf_counter() - started
+                record_stage_time(name, timings[name])
+                for key in self._outputs[name]:
+                    self._producer[key] = name
+            ctx.update(self._outputs[name])
+
+        started = time.perf_counter()
+        months = month_labels(start_month, MONTHS)
+        if self._result is None or start_month != self._start_month:
+            self._result = _result(ctx, months)
+        else:
+            # Previous results may be shared through caches, so dirty columns go into a copy
+            stale = [statement for statement, (lines, _) in STATEMENTS.items() if any(self._producer[key] in to_run for key in lines.values())]
+            if stale:
+                values = self._result.values.copy()
+                _write_statements(values, ctx, stale)
+                self._result = ScenarioResult(values, months, RESULT_LAYOUT)
+        record_stage_time("frames", time.perf_counter() - started)
+        self._params, self._start_month = params, start_month
+        self.last_run = {"changed_inputs": changed if len(changed) < len(params) else ["<all>"], "stages": to_run, "timings": timings}
+        return self._result
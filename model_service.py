@@ -0,0 +1,341 @@
+"""
+Local HTTP/JSON service around run_financial_model and generate_narrative, using only the standard library.
+
+Requests are handled on threads and the model runs on a process pool that is forked and warmed at
+startup. Identical requests that arrive while one is already computing (same scenario_key) wait on
+that computation instead of starting another. Throughput scales with --workers.
+
+    python model_service.py serve --port 8765 --workers 4
+    python model_service.py load-test --url http://127.0.0.1:8765 --requests 2000 --concurrency 32
+
+Endpoints:
+    POST /run      {"inputs": {...}, "start_month": "2026-01", "narrative": true}
+    POST /batch    {"scenarios": [{...}, ...] or {name: {...}}, "start_month": ..., "narrative": true, "statements": true}
+                   each scenario gets its summarize_batch metrics; "statements": false skips the monthly frames
+    GET  /metrics  latency histograms per endpoint, queue depth, coalescing counters
+    GET  /health
+"""
+import argparse
+import json
+import math
+import os
+import threading
+import time
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from financial_engine import INPUT_DEFAULTS, STATEMENTS, batch_scenario, resolve_start_month, run_financial_model, run_financial_model_batch, summarize_batch
+from narrative_engine import generate_narrative_batch, generate_narrative, render_narrative
+from scenario_cache import scenario_key
+
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, math.inf)
+BATCH_CHUNK_SIZE = 256 # scenarios per worker task for /batch
+REQUEST_TIMEOUT_S = 60
+
+
+# --- Worker side (runs in the pool processes) ---
+def _json_frame(frame):
+    """{"months": [...], "lines": {line item: [values]}} with NaN as null."""
+    return {
+        "months": [str(month) for month in frame.index],
+        "lines": {col: [None if value != value else value for value in frame[col].tolist()] for col in frame.columns},
+    }
+
+
+def _json_results(results, narrative):
+    payload = {name: _json_frame(results[name]) for name in STATEMENTS}
+    if narrative:
+        payload["narrative"] = narrative
+    return payload
+
+
+def _warm_worker():
+    run_financial_model({}) # imports the engine and fills the month-label cache before the first request
+    return os.getpid()
+
+
+def _run_one(inputs, start_month, narrative):
+    results = run_financial_model(inputs, start_month=start_month)
+    return _json_results(results, generate_narrative(results) if narrative else None)
+
+
+def _run_chunk(scenarios, start_month, narrative, statements):
+    """Several scenarios in one run_financial_model_batch pass."""
+    batch = run_financial_model_batch(scenarios, start_month=start_month)
+    narratives = generate_narrative_batch(batch) if narrative else None
+    summary = summarize_batch(batch).astype(float)
+    rows = []
+    for i in range(len(batch["scenarios"])):
+        row = _json_results(batch_scenario(batch, i), None) if statements else {}
+        row["summary"] = {col: None if value != value else value for col, value in summary.iloc[i].items()}
+        if narrative:
+            row["narrative"] = render_narrative(narratives, i)
+        rows.append(row)
+    return rows
+
+
+# --- Service state ---
+class LatencyHistogram:
+    """Fixed-bucket latency histogram in milliseconds."""
+
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS_MS)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms):
+        self.counts[next(i for i, bound in enumerate(LATENCY_BUCKETS_MS) if ms <= bound)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile."""
+        target, seen = q * self.count, 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, self.counts):
+            seen += count
+            if count and seen >= target:
+                return bound if bound != math.inf else self.max_ms
+        return 0.0
+
+    def snapshot(self):
+        return {
+            "count": self.count, "mean_ms": self.total_ms / self.count if self.count else 0.0, "max_ms": self.max_ms,
+            "p50_ms": self.quantile(0.5), "p95_ms": self.quantile(0.95), "p99_ms": self.quantile(0.99),
+            "buckets": {("+Inf" if bound == math.inf else str(bound)): count for bound, count in zip(LATENCY_BUCKETS_MS, self.counts)},
+        }
+
+
+class ModelService:
+    """Process pool, in-flight request coalescing and metrics shared by all handler threads."""
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        self._lock = threading.RLock() # done callbacks may fire inside a locked submit
+        self._in_flight = {} # scenario key -> Future of the computation serving it
+        self._queued = 0 # tasks submitted to the pool and not yet finished
+        self._latency = {}
+        self._counters = {"requests": 0, "errors": 0, "computations": 0, "coalesced": 0, "scenarios": 0}
+        self.started = time.time()
+        # Pre-fork: start and warm every worker now rather than on the first requests
+        for future in [self.pool.submit(_warm_worker) for _ in range(self.workers)]:
+            future.result()
+
+    def _submit(self, fn, *args):
+        with self._lock:
+            self._queued += 1
+            self._counters["computations"] += 1
+        future = self.pool.submit(fn, *args)
+        future.add_done_callback(self._task_done)
+        return future
+
+    def _task_done(self, _future):
+        with self._lock:
+            self._queued -= 1
+
+    def run(self, inputs, start_month=None, narrative=True):
+        start_month = resolve_start_month(start_month)
+        key = (scenario_key(inputs, start_month), bool(narrative))
+        with self._lock:
+            self._counters["scenarios"] += 1
+            future = self._in_flight.get(key)
+            if future is not None:
+                self._counters["coalesced"] += 1 # an identical request is already computing; share its result
+            else:
+                self._queued += 1
+                self._counters["computations"] += 1
+                future = self.pool.submit(_run_one, inputs, start_month, narrative)
+                self._in_flight[key] = future
+                future.add_done_callback(lambda done: self._finish(key, done))
+        return {"key": key[0], **future.result(timeout=REQUEST_TIMEOUT_S)}
+
+    def _finish(self, key, future):
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+            self._queued -= 1
+
+    def run_batch(self, scenarios, start_month=None, narrative=True, statements=True):
+        """Runs a list or {name: inputs} of scenarios, BATCH_CHUNK_SIZE per worker task."""
+        names = list(scenarios) if isinstance(scenarios, dict) else list(range(len(scenarios)))
+        rows = list(scenarios.values()) if isinstance(scenarios, dict) else list(scenarios)
+        start_month = resolve_start_month(start_month)
+        futures = [self._submit(_run_chunk, rows[start:start + BATCH_CHUNK_SIZE], start_month, narrative, statements)
+                   for start in range(0, len(rows), BATCH_CHUNK_SIZE)]
+        results = [result for future in futures for result in future.result(timeout=REQUEST_TIMEOUT_S)]
+        with self._lock:
+            self._counters["scenarios"] += len(rows)
+        return {"scenarios": [{"scenario": name, "key": scenario_key(row, start_month), **result}
+                              for name, row, result in zip(names, rows, results)]}
+
+    def observe(self, endpoint, ms, error=False):
+        with self._lock:
+            self._latency.setdefault(endpoint, LatencyHistogram()).observe(ms)
+            self._counters["requests"] += 1
+            self._counters["errors"] += error
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "uptime_s": time.time() - self.started, "workers": self.workers,
+                "queue_depth": self._queued, "in_flight_keys": len(self._in_flight), **self._counters,
+                "latency": {endpoint: histogram.snapshot() for endpoint, histogram in self._latency.items()},
+            }
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+# --- HTTP layer ---
+class ModelRequestHandler(BaseHTTPRequestHandler):
+    service = None # set by make_server
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self, handler):
+        started = time.perf_counter()
+        status = 200
+        try:
+            payload = handler()
+        except (ValueError, TypeError, KeyError) as e:
+            status, payload = 400, {"error": f"Bad request: {e}"}
+        except Exception as e:
+            status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+        self._send(status, payload)
+        self.service.observe(self.path, (time.perf_counter() - started) * 1000, error=status != 200)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if not isinstance(body, dict):
+            raise ValueError("expected a JSON object")
+        return body
+
+    @staticmethod
+    def _inputs(value, name):
+        if not isinstance(value, dict):
+            raise ValueError(f"{name} must be a JSON object of model inputs")
+        return value
+
+    def _scenarios(self, scenarios):
+        if isinstance(scenarios, dict):
+            return {key: self._inputs(inputs, f"scenario {key!r}") for key, inputs in scenarios.items()}
+        if isinstance(scenarios, list):
+            return [self._inputs(inputs, f"scenario {i}") for i, inputs in enumerate(scenarios)]
+        raise ValueError("scenarios must be a list or an object of input objects")
+
+    def do_GET(self):
+        if self.path == "/metrics":
+            self._send(200, self.service.metrics())
+        elif self.path == "/health":
+            self._send(200, {"status": "ok", "workers": self.service.workers})
+        else:
+            self._send(404, {"error": f"Unknown endpoint {self.path}"})
+
+    def do_POST(self):
+        if self.path == "/run":
+            def handler():
+                body = self._body()
+                return self.service.run(self._inputs(body.get("inputs", {}), "inputs"), body.get("start_month"), body.get("narrative", True))
+        elif self.path == "/batch":
+            def handler():
+                body = self._body()
+                return self.service.run_batch(self._scenarios(body["scenarios"]), body.get("start_month"), body.get("narrative", True), body.get("statements", True))
+        else:
+            self.rfile.read(int(self.headers.get("Content-Length", 0))) # drain it, or a keep-alive connection reads it as the next request
+            self._send(404, {"error": f"Unknown endpoint {self.path}"})
+            return
+        self._handle(handler)
+
+    def log_message(self, format, *args):
+        pass # request logs would dominate under load; see /metrics
+
+
+def make_server(host="127.0.0.1", port=8765, workers=None):
+    service = ModelService(workers)
+    handler = type("BoundModelRequestHandler", (ModelRequestHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server, service
+
+
+# --- Load-test client ---
+def load_test(url, requests=1000, concurrency=16, distinct=100, batch_size=0):
+    """
+    Fires `requests` POSTs from `concurrency` threads. Inputs cycle through `distinct` variants of the
+    defaults, so repeats exercise coalescing; batch_size > 0 sends /batch payloads of that many scenarios.
+    Returns client-side throughput and latency figures.
+    """
+    def payload(i):
+        inputs = dict(INPUT_DEFAULTS, leads_per_sdr=INPUT_DEFAULTS["leads_per_sdr"] + i % distinct)
+        if batch_size:
+            return "/batch", {"scenarios": [dict(inputs, seed_amount=inputs["seed_amount"] + j) for j in range(batch_size)], "statements": False}
+        return "/run", {"inputs": inputs}
+
+    def send(i):
+        path, body = payload(i)
+        request = urllib.request.Request(url + path, json.dumps(body).encode(), {"Content-Type": "application/json"})
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT_S) as response:
+                response.read()
+            ok = True
+        except OSError: # refused, reset or HTTP error status
+            ok = False
+        return (time.perf_counter() - started) * 1000, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        outcomes = list(pool.map(send, range(requests)))
+    elapsed = time.perf_counter() - started
+    latencies = sorted(ms for ms, _ in outcomes)
+    return {
+        "requests": requests, "errors": sum(not ok for _, ok in outcomes), "elapsed_s": elapsed,
+        "requests_per_s": requests / elapsed, "scenarios_per_s": requests * max(batch_size, 1) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2], "p95_ms": latencies[int(len(latencies) * 0.95)], "max_ms": latencies[-1],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local HTTP service for the ExitPath pro forma model.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="Run the service.")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--workers", type=int, default=None, help="Model worker processes (default: CPU count).")
+    bench = commands.add_parser("load-test", help="Load-test a running service.")
+    bench.add_argument("--url", default="http://127.0.0.1:8765")
+    bench.add_argument("--requests", type=int, default=1000)
+    bench.add_argument("--concurrency", type=int, default=16)
+    bench.add_argument("--distinct", type=int, default=100, help="Distinct scenarios cycled through.")
+    bench.add_argument("--batch-size", type=int, default=0, help="Send /batch requests of this many scenarios.")
+    args = parser.parse_args(argv)
+
+    if args.command == "load-test":
+        print(json.dumps(load_test(args.url, args.requests, args.concurrency, args.distinct, args.batch_size), indent=2))
+        print(json.dumps(json.loads(urllib.request.urlopen(args.url + "/metrics").read()), indent=2))
+        return
+
+    server, service = make_server(args.host, args.port, args.workers)
+    print(f"Serving the pro forma model on http://{args.host}:{args.port} with {service.workers} workers", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+
+from financial_engine import MONTH_INPUTS, MONTHS, run_financial_model_batch
+
+# Monte Carlo output metric -> (statement, line item) in the batch results
+MC_METRICS = {"Cash": ("bs", "Cash"), "Revenue": ("pnl", "Revenue"), "EBITDA": ("pnl", "EBITDA")}
+
+
+def _sample(spec, n, rng):
+    """
+    Draws n values for one input. Supported specs:
+      {"dist": "normal", "mean", "sd"}            {"dist": "triangular", "low", "mode", "high"}
+      {"dist": "beta", "a", "b", "low", "high"}    {"dist": "discrete", "values", "probs" (optional)}
+    Any spec may add "min" / "max" to clip the draws.
+    """
+    dist = spec["dist"]
+    if dist == "normal":
+        values = rng.normal(spec["mean"], spec["sd"], n)
+    elif dist == "triangular":
+        values = rng.triangular(spec["low"], spec["mode"], spec["high"], n)
+    elif dist == "beta":
+        values = spec.get("low", 0) + (spec.get("high", 1) - spec.get("low", 0)) * rng.beta(spec["a"], spec["b"], n)
+    elif dist == "discrete":
+        values = rng.choice(np.asarray(spec["values"], dtype=float), size=n, p=spec.get("probs"))
+    else:
+        raise ValueError(f"Unknown distribution '{dist}' (expected normal, triangular, beta or discrete)")
+    return np.clip(values, spec.get("min", -np.inf), spec.get("max", np.inf))
+
+
+def sample_inputs(base_inputs: dict, distributions: dict, n: int, rng):
+    """n input sets: every key of base_inputs held fixed except those given a distribution."""
+    table = {key: np.full(n, value, dtype=float) for key, value in base_inputs.items()}
+    for key, spec in distributions.items():
+        values = _sample(spec, n, rng)
+        if key in MONTH_INPUTS:
+            values = np.clip(np.round(values), 1, MONTHS)
+        table[key] = values
+    return table
+
+
+class QuantileSketch:
+    """
+    Streaming quantile sketch for many columns at once (one per forecast month).
+    A KLL-style compactor stack: level h holds items of weight 2**h, and a full level is sorted and
+    every other item (random offset) promoted. Level capacities shrink geometrically below the top,
+    so memory stays at roughly 3 * k rows regardless of how many rows are fed in.
+    """
+
+    def __init__(self, width: int, k: int = 2048, seed: int = 0):
+        self.width = width
+        self.k = k
+        self.count = 0
+        self.levels = [np.empty((0, width))]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - 1 - level
+        return max(int(self.k * (2 / 3) ** depth), 8)
+
+    def update(self, values):
+        """Adds a (rows, width) block of observations."""
+        values = np.asarray(values, dtype=float).reshape(-1, self.width)
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        level = 0
+        while level < len(self.levels):
+            if len(self.levels[level]) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty((0, self.width)))
+                buf = np.sort(self.levels[level], axis=0)
+                n_even = len(buf) - len(buf) % 2
+                offset = self._rng.integers(2)
+                self.levels[level] = buf[n_even:]
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], buf[offset:n_even:2]])
+            level += 1
+
+    def quantiles(self, qs):
+        """(len(qs), width) array of approximate quantiles."""
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** h) for h, items in enumerate(self.levels)])
+        order = np.argsort(values, axis=0)
+        sorted_values = np.take_along_axis(values, order, axis=0)
+        cum_weights = np.cumsum(weights[order], axis=0)
+        total = cum_weights[-1]
+        result = np.empty((len(qs), self.width))
+        for i, q in enumerate(qs):
+            idx = np.minimum((cum_weights < q * total).sum(axis=0), len(values) - 1)
+            result[i] = sorted_values[idx, np.arange(self.width)]
+        return result
+
+    @property
+    def nbytes(self):
+        return sum(items.nbytes for items in self.levels)
+
+
+def run_monte_carlo(base_inputs: dict, distributions: dict, n_draws: int = 100_000, chunk_size: int = 10_000,
+                    seed: int = 42, quantiles=(0.1, 0.5, 0.9), sketch_k: int = 2048, start_month=None):
+    """
+    Simulates n_draws scenarios around base_inputs, drawing the keys in `distributions` from their
+    specs (see _sample). Draws are run through the batch engine chunk_size at a time and folded into
+    streaming sketches, so memory does not grow with n_draws. The same seed and chunk_size always
+    reproduce the same result.
+
+    Returns {"draws", "months", "bands": {metric: DataFrame of P-columns by month}, "prob_cash_out": Series},
+    where prob_cash_out is the share of draws whose cash has gone below zero by each month.
+    """
+    if n_draws < 1 or chunk_size < 1:
+        raise ValueError(f"n_draws and chunk_size must be at least 1 (got n_draws={n_draws}, chunk_size={chunk_size})")
+    rng = np.random.default_rng(seed)
+    sketches = {metric: QuantileSketch(MONTHS, k=sketch_k, seed=seed + i) for i, metric in enumerate(MC_METRICS)}
+    cash_out_counts = np.zeros(MONTHS)
+    months = None
+
+    for start in range(0, n_draws, chunk_size):
+        n = min(chunk_size, n_draws - start)
+        batch = run_financial_model_batch(sample_inputs(base_inputs, distributions, n, rng), start_month=start_month)
+        months = batch["months"]
+        for metric, (statement, line) in MC_METRICS.items():
+            sketches[metric].update(batch[statement][line])
+        cash_out_counts += (np.minimum.accumulate(batch["bs"]["Cash"], axis=1) < 0).sum(axis=0)
+
+    labels = [f"P{round(q * 100)}" for q in quantiles]
+    return {
+        "draws": n_draws,
+        "months": months,
+        "bands": {
+            metric: pd.DataFrame(sketch.quantiles(quantiles).T, index=months, columns=labels)
+            for metric, sketch in sketches.items()
+        },
+        "prob_cash_out": pd.Series(cash_out_counts / n_draws, index=months, name="P(Cash < 0)"),
+    }
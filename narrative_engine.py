@@ -1,64 +1,123 @@
 import pandas as pd
 import numpy as np
 
-def generate_narrative(results: dict):
+# --- Narrative Rules ---
+# Each rule is (id, section, condition, text). Conditions are written with array operators so the same
+# rule evaluates one scenario (scalars) or thousands at once (arrays) into a mask; text is only
+# formatted for the scenarios someone actually reads.
+NARRATIVE_RULES = [
+    ("strong_capital_efficiency", "flywheel",
+     lambda m: m['final_ltv_cac'] > 3,
+     "**Strong Capital Efficiency:** The model projects a final LTV/CAC ratio of **{final_ltv_cac:.1f}x**, which is above the 3.0x benchmark for a healthy, scalable GTM motion."),
+    ("fast_sales_velocity", "flywheel",
+     lambda m: (m['final_payback'] > 0) & (m['final_payback'] < 18),
+     "**Fast Sales Velocity:** With a payback period of **{final_payback:.1f} months**, new customers become profitable quickly, allowing for rapid reinvestment in growth."),
+    ("path_to_profitability", "flywheel",
+     lambda m: m['breakeven_idx'] >= 0,
+     "**Path to Profitability:** The business is projected to reach EBITDA breakeven in **{breakeven_month}**, demonstrating a clear path to self-sustainability."),
+    ("limited_cash_runway", "brutal_facts",
+     lambda m: m['cash_runway_months'] <= 12,
+     "**Limited Cash Runway:** The current burn rate results in a cash runway of only **{cash_runway_months:.0f} months**, creating significant near-term financing risk."),
+    ("inefficient_growth_engine", "brutal_facts",
+     lambda m: m['final_ltv_cac'] < 2,
+     "**Inefficient Growth Engine:** The LTV/CAC ratio of **{final_ltv_cac:.1f}x** is below the 2.0x survival benchmark. The business is spending too much to acquire customers relative to their lifetime value."),
+    ("slow_capital_recovery", "brutal_facts",
+     lambda m: m['final_payback'] > 24,
+     "**Slow Capital Recovery:** A payback period of **{final_payback:.1f} months** means capital is tied up for over two years for each new customer, severely constraining growth without external funding."),
+]
+
+# Shown when no rule in the section fires
+NARRATIVE_FALLBACKS = {
+    "flywheel": "The model does not currently indicate a strong, self-sustaining growth flywheel. Key metrics for efficiency and profitability are below standard benchmarks.",
+    "brutal_facts": "The model does not indicate any immediate critical risks based on standard financial benchmarks. The primary focus should be on scaling the existing strengths.",
+}
+
+# Crossroads Synthesis: the first matching rule wins, else the default
+CROSSROADS_RULES = [
+    ("secure_funding", lambda m: (m['cash_runway_months'] < 12) & (m['final_ltv_cac'] > 3),
+     "The primary strategic decision is clear: **Secure funding immediately** to fuel your highly efficient growth engine before you run out of capital."),
+    ("pause_growth", lambda m: m['final_ltv_cac'] < 2,
+     "The primary strategic decision is to **pause aggressive growth** and fundamentally re-evaluate the GTM strategy to fix the underlying issues with capital efficiency."),
+]
+CROSSROADS_DEFAULT = "Based on this forecast, the primary strategic decision is whether to **optimize the current model** for efficiency or to **aggressively fund the existing GTM motion** to capture market share."
+
+
+def narrative_metrics(ebitda, cash, ltv_cac, payback):
     """
-    Analyzes the financial results to produce a Collins/Dalio-style strategic narrative.
+    Runway, breakeven and capital-efficiency metrics from (scenarios x months) arrays.
+    breakeven_idx is the 0-based first month with positive EBITDA, or -1 if never.
     """
-    pnl = results['pnl']
-    bs = results['bs']
-    kpis = results['kpis']
-
-    # --- Analysis ---
     # 1. Cash Runway
-    last_12m_cfo = pnl['EBITDA'].iloc[-12:].mean() if 'EBITDA' in pnl.columns else 0 # Simplified burn
-    ending_cash = bs['Cash'].iloc[-1] if not bs.empty else 0
-    cash_runway_months = (ending_cash / abs(last_12m_cfo)) if last_12m_cfo < 0 else 999
+    last_12m_cfo = ebitda[:, -12:].mean(axis=1) # Simplified burn
+    ending_cash = cash[:, -1]
+    burning = last_12m_cfo < 0
+    cash_runway_months = np.where(burning, ending_cash / np.where(burning, np.abs(last_12m_cfo), 1), 999)
 
     # 2. Profitability
-    try:
-        breakeven_month = pnl[pnl['EBITDA'] > 0].index[0]
-    except IndexError:
-        breakeven_month = "Not within forecast"
+    profitable = ebitda > 0
+    breakeven_idx = np.where(profitable.any(axis=1), profitable.argmax(axis=1), -1)
 
     # 3. Capital Efficiency
-    final_ltv_cac = kpis['LTV/CAC'].iloc[-1] if not kpis.empty else 0
-    final_payback = kpis['Payback Period (Months)'].iloc[-1] if not kpis.empty else 0
-
-    # --- Narrative Generation ---
-    flywheel_points = []
-    brutal_facts_points = []
-
-    # Flywheel Analysis
-    if final_ltv_cac > 3:
-        flywheel_points.append(f"**Strong Capital Efficiency:** The model projects a final LTV/CAC ratio of **{final_ltv_cac:.1f}x**, which is above the 3.0x benchmark for a healthy, scalable GTM motion.")
-    if final_payback > 0 and final_payback < 18:
-        flywheel_points.append(f"**Fast Sales Velocity:** With a payback period of **{final_payback:.1f} months**, new customers become profitable quickly, allowing for rapid reinvestment in growth.")
-    if breakeven_month != "Not within forecast":
-        flywheel_points.append(f"**Path to Profitability:** The business is projected to reach EBITDA breakeven in **{breakeven_month}**, demonstrating a clear path to self-sustainability.")
-
-    # Brutal Facts Analysis
-    if cash_runway_months <= 12:
-        brutal_facts_points.append(f"**Limited Cash Runway:** The current burn rate results in a cash runway of only **{cash_runway_months:.0f} months**, creating significant near-term financing risk.")
-    if final_ltv_cac < 2:
-        brutal_facts_points.append(f"**Inefficient Growth Engine:** The LTV/CAC ratio of **{final_ltv_cac:.1f}x** is below the 2.0x survival benchmark. The business is spending too much to acquire customers relative to their lifetime value.")
-    if final_payback > 24:
-        brutal_facts_points.append(f"**Slow Capital Recovery:** A payback period of **{final_payback:.1f} months** means capital is tied up for over two years for each new customer, severely constraining growth without external funding.")
-    if not flywheel_points:
-         flywheel_points.append("The model does not currently indicate a strong, self-sustaining growth flywheel. Key metrics for efficiency and profitability are below standard benchmarks.")
-    if not brutal_facts_points:
-        brutal_facts_points.append("The model does not indicate any immediate critical risks based on standard financial benchmarks. The primary focus should be on scaling the existing strengths.")
-
-    # Crossroads Synthesis
-    crossroads = "Based on this forecast, the primary strategic decision is whether to **optimize the current model** for efficiency or to **aggressively fund the existing GTM motion** to capture market share."
-    if cash_runway_months < 12 and final_ltv_cac > 3:
-        crossroads = "The primary strategic decision is clear: **Secure funding immediately** to fuel your highly efficient growth engine before you run out of capital."
-    elif final_ltv_cac < 2:
-        crossroads = "The primary strategic decision is to **pause aggressive growth** and fundamentally re-evaluate the GTM strategy to fix the underlying issues with capital efficiency."
+    return {
+        "cash_runway_months": cash_runway_months, "breakeven_idx": breakeven_idx,
+        "final_ltv_cac": ltv_cac[:, -1], "final_payback": payback[:, -1],
+    }
 
 
+def evaluate_narrative_rules(metrics):
+    """Rule masks for every scenario: {rule id: bool array}, plus 'crossroads' as an index into CROSSROADS_RULES (-1 = default)."""
+    masks = {rule_id: np.asarray(condition(metrics), dtype=bool) for rule_id, _, condition, _ in NARRATIVE_RULES}
+    crossroads = np.full(len(metrics['final_ltv_cac']), -1)
+    for i, (_, condition, _) in reversed(list(enumerate(CROSSROADS_RULES))):
+        crossroads = np.where(np.asarray(condition(metrics), dtype=bool), i, crossroads)
+    masks['crossroads'] = crossroads
+    return masks
+
+
+def generate_narrative_batch(batch):
+    """
+    Narrative metrics and rule masks for every scenario of a run_financial_model_batch result in one
+    array pass. Prose is not built here; call render_narrative(narratives, i) for the scenarios viewed.
+    """
+    metrics = narrative_metrics(batch["pnl"]["EBITDA"], batch["bs"]["Cash"], batch["kpis"]["LTV/CAC"], batch["kpis"]["Payback Period (Months)"])
+    return {"months": batch["months"], "metrics": metrics, "masks": evaluate_narrative_rules(metrics)}
+
+
+def render_narrative(narratives, i):
+    """The prose narrative of scenario i, in the same shape generate_narrative returns."""
+    values = {key: array[i] for key, array in narratives["metrics"].items()}
+    breakeven_idx = values['breakeven_idx']
+    values['breakeven_month'] = narratives["months"][breakeven_idx] if breakeven_idx >= 0 else "Not within forecast"
+
+    sections = {"flywheel": [], "brutal_facts": []}
+    for rule_id, section, _, text in NARRATIVE_RULES:
+        if narratives["masks"][rule_id][i]:
+            sections[section].append(text.format(**values))
+    for section, points in sections.items():
+        if not points:
+            points.append(NARRATIVE_FALLBACKS[section])
+
+    crossroads_idx = narratives["masks"]["crossroads"][i]
     return {
-        "flywheel": "\n".join(f"- {point}" for point in flywheel_points),
-        "brutal_facts": "\n".join(f"- {point}" for point in brutal_facts_points),
-        "crossroads": crossroads
+        "flywheel": "\n".join(f"- {point}" for point in sections["flywheel"]),
+        "brutal_facts": "\n".join(f"- {point}" for point in sections["brutal_facts"]),
+        "crossroads": CROSSROADS_RULES[crossroads_idx][2] if crossroads_idx >= 0 else CROSSROADS_DEFAULT
     }
+
+
+def generate_narrative(results: dict):
+    """
+    Analyzes the financial results to produce a Collins/Dalio-style strategic narrative.
+    """
+    pnl = results['pnl']
+    bs = results['bs']
+    kpis = results['kpis']
+
+    months = len(pnl)
+    ebitda = pnl['EBITDA'].to_numpy() if 'EBITDA' in pnl.columns else np.zeros(months)
+    cash = bs['Cash'].to_numpy() if not bs.empty else np.zeros(1)
+    ltv_cac = kpis['LTV/CAC'].to_numpy() if not kpis.empty else np.zeros(1)
+    payback = kpis['Payback Period (Months)'].to_numpy() if not kpis.empty else np.zeros(1)
+
+    metrics = narrative_metrics(ebitda[None, :], cash[None, :], ltv_cac[None, :], payback[None, :])
+    return render_narrative({"months": pnl.index, "metrics": metrics, "masks": evaluate_narrative_rules(metrics)}, 0)
@@ -0,0 +1,148 @@
+"""
+Headless portfolio runs: the pro forma for every company in a CSV/JSONL file, without Streamlit.
+
+Input rows are read chunk_size at a time, run through the batch engine, and appended to a long-format
+output (company, month, statement, line_item, value) as Parquet, Arrow IPC or CSV, so memory is bounded
+by the chunk rather than the portfolio. Narratives go to an optional JSONL file, and a consolidated
+roll-up sums the statements across companies as the chunks stream past.
+
+    python portfolio_cli.py companies.csv --out portfolio.parquet --narratives narratives.jsonl --consolidated rollup.csv
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from financial_engine import INPUT_DEFAULTS, batch_to_long, month_labels, run_financial_model_batch
+from narrative_engine import generate_narrative_batch, render_narrative
+
+# Statements that can be summed across companies (KPIs are ratios and are not consolidated)
+CONSOLIDATED_STATEMENTS = ("pnl", "bs", "cfs", "funnel")
+OUTPUT_FORMATS = ("parquet", "arrow", "csv")
+
+
+def read_input_chunks(path: str, chunk_size: int):
+    """Yields DataFrames of up to chunk_size input rows from a .csv or .jsonl/.ndjson file."""
+    if path.endswith((".jsonl", ".ndjson")):
+        yield from pd.read_json(path, lines=True, chunksize=chunk_size)
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+class LongFormatWriter:
+    """Appends long-format frames to one output file; Parquet and Arrow need pyarrow."""
+
+    def __init__(self, path: str, fmt: str):
+        self.path, self.fmt = path, fmt
+        self.rows = 0
+        self._writer = None
+        if fmt in ("parquet", "arrow"):
+            try:
+                import pyarrow as pa
+            except ImportError:
+                raise SystemExit(f"Writing {fmt} output needs pyarrow (pip install pyarrow), or use --format csv.")
+            self._pa = pa
+            self._schema = pa.schema([("company", pa.string()), ("month", pa.string()), ("statement", pa.string()),
+                                      ("line_item", pa.string()), ("value", pa.float64())])
+        elif os.path.exists(path):
+            os.remove(path)
+
+    def write(self, frame: pd.DataFrame):
+        if self.fmt == "csv":
+            frame.to_csv(self.path, mode="a", header=self.rows == 0, index=False)
+        else:
+            table = self._pa.Table.from_pandas(frame, schema=self._schema, preserve_index=False)
+            if self._writer is None:
+                if self.fmt == "parquet":
+                    import pyarrow.parquet as pq
+                    self._writer = pq.ParquetWriter(self.path, self._schema)
+                else:
+                    self._writer = self._pa.ipc.new_file(self.path, self._schema)
+            self._writer.write_table(table)
+        self.rows += len(frame)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def run_portfolio(input_path: str, out_path: str, fmt: str = "parquet", chunk_size: int = 500, id_column: str = "company",
+                  start_month=None, narratives_path=None, consolidated_path=None, progress=None):
+    """
+    Runs every company in input_path and streams results to out_path. `progress(companies, rows,
+    elapsed_s)` is called after each chunk. Returns {"companies", "rows", "elapsed", "consolidated"}.
+    """
+    started = time.perf_counter()
+    writer = LongFormatWriter(out_path, fmt)
+    narratives = open(narratives_path, "w") if narratives_path else None
+    consolidated = None
+    companies = 0
+
+    try:
+        for chunk in read_input_chunks(input_path, chunk_size):
+            ids = chunk[id_column].astype(str) if id_column in chunk.columns else pd.Series(np.arange(companies, companies + len(chunk)).astype(str))
+            inputs = chunk[[col for col in chunk.columns if col in INPUT_DEFAULTS]]
+            inputs.index = pd.Index(ids.to_numpy(), name="company")
+            batch = run_financial_model_batch(inputs, start_month=start_month)
+
+            writer.write(batch_to_long(batch).rename(columns={"scenario": "company"}))
+
+            # Roll-up: only the running (months,) totals per line item are kept across chunks
+            chunk_totals = {name: {col: values.sum(axis=0) for col, values in batch[name].items()} for name in CONSOLIDATED_STATEMENTS}
+            if consolidated is None:
+                consolidated = chunk_totals
+            else:
+                for name, lines in chunk_totals.items():
+                    for col, total in lines.items():
+                        consolidated[name][col] += total
+
+            if narratives:
+                chunk_narratives = generate_narrative_batch(batch)
+                for i, company in enumerate(batch["scenarios"]):
+                    narratives.write(json.dumps({"company": company, **render_narrative(chunk_narratives, i)}) + "\n")
+
+            companies += len(chunk)
+            if progress:
+                progress(companies, writer.rows, time.perf_counter() - started)
+    finally:
+        writer.close()
+        if narratives:
+            narratives.close()
+
+    rollup = None
+    if consolidated is not None:
+        months = month_labels(start_month, len(next(iter(consolidated["pnl"].values()))))
+        rollup = {name: pd.DataFrame(lines, index=months) for name, lines in consolidated.items()}
+        if consolidated_path:
+            pd.concat(rollup, axis=1).to_csv(consolidated_path)
+    return {"companies": companies, "rows": writer.rows, "elapsed": time.perf_counter() - started, "consolidated": rollup}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the ExitPath pro forma for a portfolio of companies.")
+    parser.add_argument("input", help="CSV or JSONL file, one company per row; columns are model input keys.")
+    parser.add_argument("--out", required=True, help="Long-format output file.")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, help="Output format (default: from the --out extension, else parquet).")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Companies per batch (bounds memory).")
+    parser.add_argument("--id-column", default="company", help="Column holding the company identifier.")
+    parser.add_argument("--start-month", help="First forecast month as YYYY-MM (default: current month).")
+    parser.add_argument("--narratives", help="Optional JSONL file for each company's narrative.")
+    parser.add_argument("--consolidated", help="Optional CSV for the portfolio roll-up of summed statements.")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or next((f for f in OUTPUT_FORMATS if args.out.endswith(f".{f}")), "parquet")
+
+    def report(companies, rows, elapsed):
+        print(f"{companies:,} companies, {rows:,} rows - {companies / max(elapsed, 1e-9):,.0f} companies/s", file=sys.stderr, flush=True)
+
+    summary = run_portfolio(args.input, args.out, fmt, args.chunk_size, args.id_column, args.start_month,
+                            args.narratives, args.consolidated, progress=report)
+    print(f"Done: {summary['companies']:,} companies, {summary['rows']:,} rows in {summary['elapsed']:.1f}s -> {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""
+Rolling re-forecast: folds monthly actuals into a plan and re-forecasts only the open months.
+
+The plan is the engine's run for a company's inputs. Each month-end close supplies actuals (revenue,
+cash, AR, AP and optionally headcount) for the months that have closed:
+
+  closed months  Revenue, Cash, AR and AP are the actuals; gross profit, EBITDA and net income follow
+                 from actual revenue and planned costs; equity balances the sheet and CFO is the plug
+                 that ties the cash flow to the actual change in cash
+  open months    operating lines stay on plan; the balance sheet and cash flow roll forward from the
+                 last closed month's actual balances instead of the plan's
+
+A re-forecast carries a checkpoint of the closing state. Passing it back as `previous` with the next
+month's actuals reuses the plan and every already-closed month, so a close rewrites only the new rows
+and the open-month balance sheet, without rerunning any model stage.
+
+    python reforecast.py companies.csv actuals.csv --state checkpoints.pkl --variance variance.csv --out reforecast.csv
+"""
+import argparse
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from financial_engine import INPUT_DEFAULTS, MONTHS, RESULT_LAYOUT, STATEMENTS, _model_arrays, _result, month_labels, resolve_start_month
+from scenario_cache import scenario_key
+from scenario_result import ScenarioResult
+
+ACTUALS_COLUMNS = ("month", "revenue", "cash", "accounts_receivable", "accounts_payable")
+OPTIONAL_ACTUALS_COLUMNS = ("headcount",)
+
+# (statement, line item) -> column of a ScenarioResult's values array
+_COLUMN = {(name, line): i for i, (name, line) in enumerate((name, line) for name, lines in RESULT_LAYOUT for line in lines)}
+# actuals column -> the statement line it fixes
+_ACTUAL_LINES = {
+    "revenue": ("pnl", "Revenue"), "cash": ("bs", "Cash"),
+    "accounts_receivable": ("bs", "Accounts Receivable"), "accounts_payable": ("bs", "Accounts Payable"),
+}
+
+
+def read_actuals(source, start_month):
+    """
+    Actuals from a CSV path or DataFrame, as a DataFrame indexed by forecast month position (0 = the
+    plan's first month) with a 'month' column in 'YYYY-MM'; other columns (e.g. a company id) are
+    kept after the actuals. Raises ValueError on missing columns, blank or non-numeric values in them
+    (headcount may be blank) and months outside the plan.
+    """
+    frame = pd.read_csv(source) if isinstance(source, str) else pd.DataFrame(source).copy()
+    missing = [col for col in ACTUALS_COLUMNS if col not in frame.columns]
+    if missing:
+        raise ValueError(f"Actuals are missing columns: {', '.join(missing)}")
+    for col in OPTIONAL_ACTUALS_COLUMNS:
+        if col not in frame.columns:
+            frame[col] = np.nan
+    start_year, start = map(int, resolve_start_month(start_month).split('-'))
+    months = pd.to_datetime(frame["month"].astype(str), format="ISO8601")
+    frame["month"] = months.dt.strftime('%Y-%m')
+    for col in ACTUALS_COLUMNS[1:] + OPTIONAL_ACTUALS_COLUMNS:
+        values = pd.to_numeric(frame[col], errors="coerce")
+        invalid = values.isna() & frame[col].notna()
+        if invalid.any():
+            raise ValueError(f"Actuals column '{col}' must be numeric: {frame[col][invalid].iloc[0]!r} in {frame['month'][invalid].iloc[0]}")
+        if col in ACTUALS_COLUMNS and values.isna().any():
+            raise ValueError(f"Actuals are missing {col} for {frame['month'][values.isna()].iloc[0]}")
+        frame[col] = values.astype(float)
+    frame.index = pd.Index((months.dt.year.to_numpy() - start_year) * 12 + months.dt.month.to_numpy() - start, name="position")
+    if frame.index.min() < 0 or frame.index.max() >= MONTHS:
+        raise ValueError(f"Actuals fall outside the plan's {MONTHS} months from {resolve_start_month(start_month)}")
+    columns = list(ACTUALS_COLUMNS + OPTIONAL_ACTUALS_COLUMNS)
+    frame = frame[columns + [col for col in frame.columns if col not in columns]].sort_index(kind="stable")
+    frame.attrs["start_month"] = resolve_start_month(start_month) # lets reforecast() skip parsing it again
+    return frame
+
+
+def _plan(inputs, start_month):
+    p = {key: inputs.get(key, default) for key, default in INPUT_DEFAULTS.items()}
+    arrays = _model_arrays(p, MONTHS)
+    headcount = arrays['sdr_headcount'] + arrays['ae_headcount'] + arrays['cs_headcount']
+    return _result(arrays, month_labels(start_month, MONTHS)), np.asarray(headcount, dtype=float)
+
+
+def _close_months(values, actuals, first):
+    """Writes closed months [first, first + len(actuals)) from actuals, continuing from row first - 1."""
+    rows = slice(first, first + len(actuals))
+    col = lambda statement, line: _COLUMN[(statement, line)]
+    for name, (statement, line) in _ACTUAL_LINES.items():
+        values[rows, col(statement, line)] = np.round(actuals[name].to_numpy(dtype=float)) # statements are whole dollars
+
+    revenue = values[rows, col("pnl", "Revenue")]
+    gross_profit = revenue - values[rows, col("pnl", "COGS")]
+    ebitda = gross_profit - values[rows, col("pnl", "Operating Expenses")]
+    values[rows, col("pnl", "Gross Profit")] = gross_profit
+    values[rows, col("pnl", "EBITDA")] = ebitda
+    values[rows, col("pnl", "Net Income")] = ebitda # Net Income simplified to EBITDA, as in the engine
+
+    cash, ar, ap = (values[rows, col("bs", line)] for line in ("Cash", "Accounts Receivable", "Accounts Payable"))
+    values[rows, col("bs", "Equity")] = cash + ar - ap
+    values[rows, col("bs", "Total Assets")] = cash + ar
+    values[rows, col("bs", "Total Liabilities & Equity")] = ap + values[rows, col("bs", "Equity")]
+    # Flows against the prior month's balances (the opening month keeps its zero flows)
+    start = max(first, 1)
+    if start >= first + len(actuals):
+        return
+    flows = slice(start, first + len(actuals))
+    prior = slice(start - 1, first + len(actuals) - 1)
+    net_income = values[flows, col("pnl", "Net Income")]
+    change_in_ar = -(values[flows, col("bs", "Accounts Receivable")] - values[prior, col("bs", "Accounts Receivable")])
+    change_in_ap = values[flows, col("bs", "Accounts Payable")] - values[prior, col("bs", "Accounts Payable")]
+    net_change = values[flows, col("bs", "Cash")] - values[prior, col("bs", "Cash")]
+    values[flows, col("cfs", "Net Income")] = net_income
+    values[flows, col("cfs", "Change in AR")] = change_in_ar
+    values[flows, col("cfs", "Change in AP")] = change_in_ap
+    values[flows, col("cfs", "Net Change in Cash")] = net_change
+    values[flows, col("cfs", "CFO")] = net_change - values[flows, col("cfs", "CFI")] - values[flows, col("cfs", "CFF")]
+
+
+def _roll_forward(values, closed):
+    """Re-forecasts the balance sheet and cash flow of open months [closed, end) from row closed - 1."""
+    if closed == 0 or closed >= len(values):
+        return
+    rows = slice(closed, None)
+    col = lambda statement, line: _COLUMN[(statement, line)]
+    prior_ar, prior_ap = values[closed - 1, col("bs", "Accounts Receivable")], values[closed - 1, col("bs", "Accounts Payable")]
+    ar, ap = values[rows, col("bs", "Accounts Receivable")], values[rows, col("bs", "Accounts Payable")] # closed-form in the month's revenue / opex
+    net_income = values[rows, col("pnl", "Net Income")]
+    change_in_ar = -np.diff(ar, prepend=prior_ar)
+    change_in_ap = np.diff(ap, prepend=prior_ap)
+    cfo = net_income + change_in_ar + change_in_ap
+    cff = values[rows, col("cfs", "CFF")]
+    net_change = cfo + values[rows, col("cfs", "CFI")] + cff
+    cash = values[closed - 1, col("bs", "Cash")] + np.cumsum(net_change)
+    equity = values[closed - 1, col("bs", "Equity")] + np.cumsum(net_income + cff)
+
+    values[rows, col("cfs", "Net Income")] = net_income
+    values[rows, col("cfs", "Change in AR")] = change_in_ar
+    values[rows, col("cfs", "Change in AP")] = change_in_ap
+    values[rows, col("cfs", "CFO")] = cfo
+    values[rows, col("cfs", "Net Change in Cash")] = net_change
+    values[rows, col("bs", "Cash")] = cash
+    values[rows, col("bs", "Equity")] = equity
+    values[rows, col("bs", "Total Assets")] = cash + ar
+    values[rows, col("bs", "Total Liabilities & Equity")] = ap + equity
+
+
+def reforecast(inputs: dict, actuals, start_month=None, previous=None):
+    """
+    Folds actuals (CSV path or DataFrame, see read_actuals) into the plan for `inputs` and
+    re-forecasts the open months. Returns {"plan", "plan_headcount", "results", "actuals", "checkpoint"}.
+
+    previous is an earlier reforecast() of the same plan. Its plan and closed months are reused;
+    actuals for months it already closed are ignored, and the new ones must follow on directly.
+    """
+    start_month = resolve_start_month(start_month if previous is None else previous["checkpoint"]["start_month"])
+    plan_key = scenario_key(inputs, start_month)
+    if not (isinstance(actuals, pd.DataFrame) and actuals.attrs.get("start_month") == start_month):
+        actuals = read_actuals(actuals, start_month)
+    if previous is None:
+        plan, plan_headcount = _plan(inputs, start_month)
+        values, closed, history = plan.values.copy(), 0, actuals.iloc[:0]
+    else:
+        if previous["checkpoint"]["plan_key"] != plan_key:
+            raise ValueError("previous re-forecast was made for different inputs; re-forecast from the plan instead")
+        plan, plan_headcount = previous["plan"], previous["plan_headcount"]
+        values, closed, history = previous["results"].values.copy(), previous["checkpoint"]["closed_months"], previous["actuals"]
+    new = actuals[actuals.index >= closed]
+    if len(new) and not np.array_equal(new.index, np.arange(closed, closed + len(new))):
+        raise ValueError(f"Actuals must cover consecutive months from {month_labels(start_month, MONTHS)[closed]} with no gaps")
+
+    _close_months(values, new, closed)
+    closed += len(new)
+    _roll_forward(values, closed)
+    for name, (lines, decimals) in STATEMENTS.items():
+        columns = [_COLUMN[(name, line)] for line in lines]
+        values[:, columns] = np.round(values[:, columns], decimals)
+
+    history = pd.concat([history, new]) if len(history) and len(new) else history if len(history) else new
+    last = values[closed - 1] if closed else None
+    checkpoint = {
+        "plan_key": plan_key, "start_month": start_month, "closed_months": closed,
+        "month": history["month"].iloc[-1] if closed else None,
+        **{name: (float(last[_COLUMN[line]]) if closed else None) for name, line in
+           (("cash", ("bs", "Cash")), ("accounts_receivable", ("bs", "Accounts Receivable")),
+            ("accounts_payable", ("bs", "Accounts Payable")), ("equity", ("bs", "Equity")))},
+        "headcount": float(history["headcount"].iloc[-1]) if closed else None,
+    }
+    return {"plan": plan, "plan_headcount": plan_headcount, "results": ScenarioResult(values, plan.index, plan.layout),
+            "actuals": history, "checkpoint": checkpoint}
+
+
+def variance_report(forecast):
+    """Closed months, actual vs plan: one row per (month, metric) with actual, plan, variance and variance_pct."""
+    actuals, plan = forecast["actuals"], forecast["plan"]
+    frames = []
+    for name in tuple(_ACTUAL_LINES) + ("headcount",):
+        planned = forecast["plan_headcount"][actuals.index] if name == "headcount" else plan.values[actuals.index, _COLUMN[_ACTUAL_LINES[name]]]
+        actual = actuals[name].to_numpy(dtype=float)
+        variance = actual - planned
+        frames.append(pd.DataFrame({
+            "month": actuals["month"].to_numpy(), "metric": name, "actual": actual, "plan": planned, "variance": variance,
+            "variance_pct": np.divide(variance, np.abs(planned), out=np.full(len(actual), np.nan), where=planned != 0),
+        }))
+    return pd.concat(frames, ignore_index=True).sort_values("month", kind="stable", ignore_index=True)
+
+
+def outlook_variance(forecast):
+    """Per forecast year: plan vs re-forecast revenue, EBITDA and ending cash, with the variance of each."""
+    rows = {}
+    for label, result in (("plan", forecast["plan"]), ("reforecast", forecast["results"])):
+        pnl, cash = result["pnl"], result["bs"]["Cash"].to_numpy()
+        years = len(pnl) // 12
+        rows[label] = {
+            "revenue": pnl["Revenue"].to_numpy()[:years * 12].reshape(years, 12).sum(axis=1),
+            "ebitda": pnl["EBITDA"].to_numpy()[:years * 12].reshape(years, 12).sum(axis=1),
+            "ending_cash": cash[11:years * 12:12],
+        }
+    report = pd.DataFrame(index=pd.RangeIndex(1, len(rows["plan"]["revenue"]) + 1, name="year"))
+    for metric in ("revenue", "ebitda", "ending_cash"):
+        report[f"{metric}_plan"] = rows["plan"][metric]
+        report[f"{metric}_reforecast"] = rows["reforecast"][metric]
+        report[f"{metric}_variance"] = rows["reforecast"][metric] - rows["plan"][metric]
+    return report
+
+
+# --- MONTHLY CLOSE FOR A PORTFOLIO ---
+def _company_actuals(actuals, start_month, id_column):
+    """
+    {company: its parsed actuals} and {company: error message}. The whole file is parsed at once; only
+    if that fails is each company parsed on its own, so one company's bad rows don't block the rest.
+    """
+    try:
+        parsed = read_actuals(actuals, start_month)
+        return dict(tuple(parsed.groupby(id_column, sort=False))), {}
+    except ValueError:
+        frame = pd.read_csv(actuals) if isinstance(actuals, str) else pd.DataFrame(actuals)
+        if id_column not in frame.columns:
+            raise
+    grouped, errors = {}, {}
+    for company, rows in frame.groupby(id_column, sort=False):
+        try:
+            grouped[company] = read_actuals(rows, start_month)
+        except ValueError as e:
+            errors[company] = str(e)
+    return grouped, errors
+
+
+def reforecast_portfolio(companies: pd.DataFrame, actuals: pd.DataFrame, start_month=None, state=None, id_column: str = "company"):
+    """
+    Re-forecasts every company in `companies` (one row of inputs each) with its rows of `actuals`.
+    `state` maps company -> its previous reforecast(); companies found there only process their new
+    months, and start_month defaults to theirs. A company whose inputs changed since its last close is
+    re-closed from the new plan with every month it has closed so far. Returns {"state", "errors"}:
+    the updated state and, for companies whose actuals were rejected, the ValueError message (their
+    previous state is kept).
+    """
+    state, errors = dict(state or {}), {}
+    if start_month is None and state:
+        start_month = next(iter(state.values()))["checkpoint"]["start_month"] # continue the plans being closed
+    start_month = resolve_start_month(start_month)
+    grouped, errors = _company_actuals(actuals, start_month, id_column)
+    empty = read_actuals(pd.DataFrame(columns=list(ACTUALS_COLUMNS)), start_month)
+    for _, row in companies.iterrows():
+        company = row[id_column]
+        if company in errors:
+            continue
+        inputs = {key: value for key, value in row.items() if key in INPUT_DEFAULTS and value == value}
+        company_actuals = grouped.get(company, empty)
+        company_actuals.attrs["start_month"] = start_month
+        previous = state.get(company)
+        company_start = start_month if previous is None else previous["checkpoint"]["start_month"]
+        try:
+            if company_start != start_month:
+                company_actuals = read_actuals(company_actuals, company_start) # positions are relative to the plan's first month
+            if previous is not None and previous["checkpoint"]["plan_key"] != scenario_key(inputs, company_start):
+                # Inputs changed since the last close: close the months already closed again on the new plan
+                closed = previous["checkpoint"]["closed_months"]
+                company_actuals = pd.concat([previous["actuals"], company_actuals[company_actuals.index >= closed]])
+                company_actuals.attrs["start_month"] = company_start
+                previous = None
+            state[company] = reforecast(inputs, company_actuals, start_month=company_start, previous=previous)
+        except ValueError as e:
+            errors[company] = str(e)
+    return {"state": state, "errors": errors}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fold month-end actuals into each company's plan and re-forecast the open months.")
+    parser.add_argument("companies", help="CSV of company inputs, one row per company.")
+    parser.add_argument("actuals", help="CSV of actuals: company, month, revenue, cash, accounts_receivable, accounts_payable[, headcount].")
+    parser.add_argument("--start-month", help="The plans' first month, YYYY-MM (default: the --state checkpoints' month, else the current month).")
+    parser.add_argument("--id-column", default="company", help="Column naming each company.")
+    parser.add_argument("--state", help="Checkpoint file; read if present and rewritten, so the next close is incremental.")
+    parser.add_argument("--variance", help="Write the closed-month variance-vs-plan report (CSV).")
+    parser.add_argument("--out", help="Write the re-forecast statements in long format (CSV).")
+    args = parser.parse_args(argv)
+
+    state = None
+    if args.state and os.path.exists(args.state):
+        with open(args.state, "rb") as f:
+            state = pickle.load(f)
+    started = time.perf_counter()
+    portfolio = reforecast_portfolio(pd.read_csv(args.companies), pd.read_csv(args.actuals), args.start_month, state, args.id_column)
+    elapsed = time.perf_counter() - started
+    state = portfolio["state"]
+    for company, message in portfolio["errors"].items():
+        print(f"{company}: {message}", file=sys.stderr)
+    if args.state:
+        with open(args.state, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    if args.variance:
+        pd.concat([variance_report(forecast).assign(company=company) for company, forecast in state.items()],
+                  ignore_index=True).to_csv(args.variance, index=False)
+    if args.out:
+        frames = []
+        for company, forecast in state.items():
+            for name, frame in forecast["results"].items():
+                long = frame.rename_axis("month").reset_index().melt(id_vars="month", var_name="line_item", value_name="value")
+                frames.append(long.assign(company=company, statement=name)[["company", "month", "statement", "line_item", "value"]])
+        pd.concat(frames, ignore_index=True).to_csv(args.out, index=False)
+    closed = [forecast["checkpoint"]["closed_months"] for forecast in state.values()]
+    print(f"Re-forecast {len(state):,} companies in {elapsed:.2f} s; closed months {min(closed, default=0)}-{max(closed, default=0)}")
+    return 1 if portfolio["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+"""
+Content-addressed cache for run_financial_model results.
+
+Results are keyed on a hash of the canonical model inputs, the pinned start month and
+MODEL_VERSION. Two tiers sit behind one lookup: an in-process LRU bounded by a byte budget,
+shared by every Streamlit session in the server process, and a directory of Arrow IPC files that any
+session or worker process on the machine memory-maps instead of unpickling (pickles when pyarrow is
+not installed).
+"""
+import hashlib
+import importlib.util
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from financial_engine import INPUT_DEFAULTS, MODEL_VERSION, resolve_start_month, run_financial_model
+from scenario_result import ScenarioResult
+
+DEFAULT_CACHE_DIR = os.getenv("EXITPATH_CACHE_DIR", ".exitpath_cache")
+DISK_SUFFIX = ".arrow" if importlib.util.find_spec("pyarrow") else ".pkl"
+# Pruning trims the disk tier to this share of its budget, so it runs once per many puts, not on each
+DISK_PRUNE_TO = 0.9
+
+
+def _canonical_value(value):
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        return int(value) # 50000 and 50000.0 are the same input
+    return value
+
+
+def scenario_key(inputs: dict, start_month=None):
+    """
+    Stable hash of everything that determines a run's output. Only keys the engine reads are
+    included (missing ones resolved to their defaults), so cosmetic extra keys don't split the cache.
+    """
+    canonical = {key: _canonical_value(inputs.get(key, default)) for key, default in INPUT_DEFAULTS.items()}
+    payload = json.dumps({"model_version": MODEL_VERSION, "start_month": resolve_start_month(start_month), "inputs": canonical},
+                         sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def results_nbytes(results):
+    if hasattr(results, "nbytes"): # ScenarioResult
+        return results.nbytes
+    return int(sum(frame.memory_usage(index=True, deep=True).sum() for frame in results.values()))
+
+
+class ScenarioCache:
+    """Two-tier (memory LRU + shared disk) cache of model results keyed by scenario_key."""
+
+    def __init__(self, max_bytes: int = 64 * 1024 ** 2, disk_dir=DEFAULT_CACHE_DIR, disk_max_bytes: int = 1024 ** 3):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._entries = OrderedDict() # key -> (results, nbytes), least recently used first
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "disk_evictions": 0}
+        self._disk_bytes = None # running size of the disk tier, from one listing plus this process's writes
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    # --- memory tier ---
+    def _remember(self, key, results):
+        nbytes = results_nbytes(results)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (results, nbytes)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self._bytes -= evicted_bytes
+                self._counters["evictions"] += 1
+
+    # --- disk tier ---
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}{DISK_SUFFIX}")
+
+    def _disk_get(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            if DISK_SUFFIX == ".arrow":
+                results = ScenarioResult.from_arrow_ipc(path, memory_map=True)
+            else:
+                with open(path, "rb") as f:
+                    results = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError, ValueError, KeyError):
+            return None # missing, partial or from an older format
+        os.utime(path) # mark as recently used for disk pruning
+        return results
+
+    def _disk_put(self, key, results):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        if DISK_SUFFIX == ".arrow" and isinstance(results, ScenarioResult):
+            results.to_arrow_ipc(tmp_path)
+        elif DISK_SUFFIX == ".arrow":
+            return # only ScenarioResults have an Arrow form
+        else:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(results, f, protocol=pickle.HIGHEST_PROTOCOL)
+        size = os.path.getsize(tmp_path)
+        try:
+            size -= os.path.getsize(path) # replacing an existing entry
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_path, path) # atomic, so concurrent readers never see a partial file
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += size
+            over = self._disk_bytes is None or self._disk_bytes > self.disk_max_bytes
+        if over: # first write, or over budget: list the directory once and prune if needed
+            self._prune_disk()
+
+    def _disk_entries(self):
+        """(mtime, size, name) of every cached file; lists the whole directory."""
+        entries = []
+        for name in os.listdir(self.disk_dir):
+            if name.endswith(DISK_SUFFIX):
+                try:
+                    stat = os.stat(os.path.join(self.disk_dir, name))
+                except FileNotFoundError:
+                    continue # removed by another process
+                entries.append((stat.st_mtime, stat.st_size, name))
+        return entries
+
+    def _prune_disk(self):
+        """Once over budget, removes least recently used files until the tier is at DISK_PRUNE_TO of it."""
+        entries = self._disk_entries() # rescanned, so other processes' writes and removals are counted
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries) if total > self.disk_max_bytes else ():
+            if total <= self.disk_max_bytes * DISK_PRUNE_TO:
+                break
+            try:
+                os.remove(os.path.join(self.disk_dir, name))
+            except (FileNotFoundError, PermissionError):
+                pass # already gone, or still mapped on platforms that forbid deleting it
+            total -= size
+            with self._lock:
+                self._counters["disk_evictions"] += 1
+        with self._lock:
+            self._disk_bytes = total
+
+    # --- public API ---
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+                return entry[0]
+        results = self._disk_get(key)
+        with self._lock:
+            self._counters["disk_hits" if results is not None else "misses"] += 1
+        if results is not None:
+            self._remember(key, results)
+        return results
+
+    def put(self, key, results):
+        self._remember(key, results)
+        self._disk_put(key, results)
+
+    def run(self, inputs: dict, start_month=None, compute=run_financial_model):
+        """
+        run_financial_model through the cache; `compute(inputs, start_month=...)` produces misses
+        (e.g. an IncrementalModel's run). Cached results are shared: treat them as read-only.
+        """
+        start_month = resolve_start_month(start_month)
+        key = scenario_key(inputs, start_month)
+        results = self.get(key)
+        if results is None:
+            results = compute(inputs, start_month=start_month)
+            self.put(key, results)
+        return results
+
+    def stats(self):
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["disk_hits"] + self._counters["misses"]
+            return {
+                **self._counters, "entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes,
+                "hit_rate": (self._counters["hits"] + self._counters["disk_hits"]) / lookups if lookups else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def default_cache():
+    """Process-wide cache shared by every caller (and every Streamlit session) in this process."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ScenarioCache()
+        return _default_cache
+
+
+def cached_run_financial_model(inputs: dict, start_month=None):
+    return default_cache().run(inputs, start_month)
@@ -0,0 +1,109 @@
+"""
+Array-backed result of one model run.
+
+Every line item of every statement lives in a single contiguous (months x line items) array with one
+shared month index, instead of five separately allocated DataFrames. results['pnl'] and friends are
+zero-copy DataFrame views over column slices of that array, so existing consumers are unchanged.
+The array is read-only: results are shared through caches and must not be edited in place. One view
+per statement is built on first access and each access returns a shallow copy of it, so adding,
+dropping or renaming columns on one never reaches other readers.
+
+Results serialise to an Arrow IPC file whose values column is the same contiguous buffer, so a
+process that memory-maps the file gets its views without copying or unpickling anything.
+"""
+import json
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+
+class ScenarioResult(Mapping):
+    """
+    Mapping of statement name -> DataFrame view. `layout` is a tuple of (statement, line items) pairs
+    giving the column order of `values`.
+    """
+
+    def __init__(self, values: np.ndarray, index, layout):
+        values = np.asarray(values)
+        values.flags.writeable = False
+        self.values = values
+        self.index = pd.Index(index)
+        self.layout = tuple((name, tuple(columns)) for name, columns in layout)
+        self._slices = {}
+        start = 0
+        for name, columns in self.layout:
+            self._slices[name] = slice(start, start + len(columns))
+            start += len(columns)
+        if values.shape != (len(self.index), start):
+            raise ValueError(f"values shape {values.shape} does not match {len(self.index)} months x {start} line items")
+        self._views = {}
+
+    # --- Mapping interface ---
+    def __getitem__(self, statement):
+        view = self._views.get(statement)
+        if view is None:
+            columns = dict(self.layout)[statement]
+            view = pd.DataFrame(self.values[:, self._slices[statement]], index=self.index, columns=list(columns), copy=False)
+            self._views[statement] = view
+        return view.copy(deep=False)
+
+    def __iter__(self):
+        return iter(self._slices)
+
+    def __len__(self):
+        return len(self._slices)
+
+    def __repr__(self):
+        return f"ScenarioResult({len(self.index)} months x {self.values.shape[1]} line items, {self.values.dtype}, statements={list(self)})"
+
+    def __reduce__(self):
+        return (ScenarioResult, (self.values, self.index, self.layout)) # views are rebuilt on access
+
+    @property
+    def nbytes(self):
+        return int(self.values.nbytes + self.index.memory_usage(deep=True))
+
+    def statement_values(self, statement):
+        """The (months x line items) array slice behind one statement."""
+        return self.values[:, self._slices[statement]]
+
+    def astype(self, dtype):
+        """A copy stored as `dtype` (e.g. np.float32 to halve the footprint of stored scenarios)."""
+        return ScenarioResult(self.values.astype(dtype), self.index, self.layout)
+
+    # --- Arrow IPC ---
+    def to_arrow_ipc(self, sink):
+        """
+        Writes an Arrow IPC file to `sink` (path or writable file): a month column plus one
+        fixed-size-list column holding the contiguous values, with the layout in the schema metadata.
+        """
+        import pyarrow as pa
+
+        width = self.values.shape[1]
+        flat = pa.array(np.ascontiguousarray(self.values).reshape(-1))
+        schema = pa.schema([("month", pa.string()), ("values", pa.list_(flat.type, width))],
+                           metadata={"layout": json.dumps([[name, list(columns)] for name, columns in self.layout])})
+        batch = pa.record_batch([pa.array([str(month) for month in self.index], pa.string()),
+                                 pa.FixedSizeListArray.from_arrays(flat, width)], schema=schema)
+        with pa.ipc.new_file(sink, schema) as writer:
+            writer.write_batch(batch)
+
+    @classmethod
+    def from_arrow_ipc(cls, source, memory_map: bool = True):
+        """
+        Reads a file written by to_arrow_ipc. With a path and memory_map=True the values array is a
+        zero-copy view of the memory-mapped file, shared with every other process mapping it.
+        """
+        import pyarrow as pa
+
+        if isinstance(source, str):
+            source = pa.memory_map(source, "r") if memory_map else pa.OSFile(source, "rb")
+        reader = pa.ipc.open_file(source)
+        table = reader.read_all()
+        layout = json.loads(table.schema.metadata[b"layout"])
+        column = table.column("values")
+        chunk = column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+        width = chunk.type.list_size
+        values = chunk.flatten().to_numpy(zero_copy_only=True).reshape(len(table), width)
+        return cls(values, table.column("month").to_pylist(), layout)
@@ -0,0 +1,198 @@
+"""
+Persistent scenario library on embedded SQLite.
+
+Each saved scenario is one row of `scenarios`: its name, inputs (JSON), start month and headline
+metrics in indexed REAL columns, so filters and sorts over tens of thousands of runs stay on the
+indexes. The full monthly statements are a raw float64 block in a separate `series` table and are
+only read when a scenario is opened.
+
+    store = ScenarioStore()
+    store.save("Base case", inputs)
+    store.query([("runway_months", ">", 18), ("final_ltv_cac", ">", 3)], order_by="y5_ebitda")
+    store.open(scenario_id)["results"]["pnl"]
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from financial_engine import MODEL_VERSION, RESULT_LAYOUT, month_labels, resolve_start_month, run_financial_model, run_financial_model_batch, summarize_batch
+from narrative_engine import narrative_metrics
+from scenario_cache import scenario_key
+from scenario_result import ScenarioResult
+
+DEFAULT_STORE_PATH = os.getenv("EXITPATH_STORE_PATH", "exitpath_scenarios.db")
+
+# Indexed metric columns: summarize_batch's metrics plus the narrative's cash runway
+METRIC_COLUMNS = (
+    "ending_cash", "min_cash", "min_cash_month", "cash_out_month", "breakeven_month", "runway_months",
+    "final_ltv_cac", "final_payback",
+    "y1_revenue", "y2_revenue", "y3_revenue", "y4_revenue", "y5_revenue",
+    "y1_ebitda", "y2_ebitda", "y3_ebitda", "y4_ebitda", "y5_ebitda",
+)
+QUERY_OPERATORS = (">", ">=", "<", "<=", "=", "!=")
+LISTING_COLUMNS = ("id", "name", "created", "start_month") + METRIC_COLUMNS
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS scenarios (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    key TEXT NOT NULL,
+    created REAL NOT NULL,
+    start_month TEXT NOT NULL,
+    model_version TEXT NOT NULL,
+    inputs TEXT NOT NULL,
+    {", ".join(f"{col} REAL" for col in METRIC_COLUMNS)}
+);
+CREATE INDEX IF NOT EXISTS idx_scenarios_key ON scenarios(key);
+CREATE INDEX IF NOT EXISTS idx_scenarios_name ON scenarios(name);
+{"".join(f"CREATE INDEX IF NOT EXISTS idx_scenarios_{col} ON scenarios({col});" for col in METRIC_COLUMNS)}
+CREATE TABLE IF NOT EXISTS series (
+    scenario_id INTEGER PRIMARY KEY REFERENCES scenarios(id) ON DELETE CASCADE,
+    months INTEGER NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS layouts (
+    model_version TEXT PRIMARY KEY,
+    layout TEXT NOT NULL
+);
+"""
+
+
+def _json_inputs(inputs):
+    return json.dumps({key: value.item() if isinstance(value, np.generic) else value for key, value in inputs.items()}, sort_keys=True)
+
+
+def _metric_rows(batch):
+    """(N, len(METRIC_COLUMNS)) metrics for a batch; NaN (event never happens) is stored as NULL."""
+    summary = summarize_batch(batch)
+    summary["runway_months"] = narrative_metrics(batch["pnl"]["EBITDA"], batch["bs"]["Cash"],
+                                                 batch["kpis"]["LTV/CAC"], batch["kpis"]["Payback Period (Months)"])["cash_runway_months"]
+    values = summary.reindex(columns=list(METRIC_COLUMNS)).to_numpy(dtype=float)
+    return [[None if v != v else v for v in row] for row in values.tolist()]
+
+
+class ScenarioStore:
+    """SQLite-backed scenario library; one instance can be shared across threads."""
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(SCHEMA)
+            self._conn.execute("INSERT OR IGNORE INTO layouts VALUES (?, ?)",
+                               (MODEL_VERSION, json.dumps([[name, list(columns)] for name, columns in RESULT_LAYOUT])))
+            self._conn.commit()
+
+    # --- writes ---
+    def _insert(self, names, rows_inputs, start_month, metrics, blocks):
+        """One transaction for the whole set of scenarios."""
+        created = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.cursor()
+            placeholders = ", ".join("?" * (6 + len(METRIC_COLUMNS)))
+            ids = []
+            for name, inputs, metric_row in zip(names, rows_inputs, metrics):
+                cursor.execute(
+                    f"INSERT INTO scenarios (name, key, created, start_month, model_version, inputs, {', '.join(METRIC_COLUMNS)}) "
+                    f"VALUES ({placeholders})",
+                    [name, scenario_key(inputs, start_month), created, start_month, MODEL_VERSION, _json_inputs(inputs), *metric_row])
+                ids.append(cursor.lastrowid)
+            if blocks is not None:
+                cursor.executemany("INSERT INTO series VALUES (?, ?, ?)",
+                                   ((scenario_id, block.shape[0], block.tobytes()) for scenario_id, block in zip(ids, blocks)))
+        return ids
+
+    def save(self, name: str, inputs: dict, results=None, start_month=None):
+        """Saves one scenario (running it if results aren't given); returns its id."""
+        start_month = resolve_start_month(start_month)
+        if results is None:
+            results = run_financial_model(inputs, start_month=start_month)
+        batch = {"scenarios": [name], "months": results.index,
+                 **{statement: {col: frame[col].to_numpy()[None, :] for col in frame.columns} for statement, frame in results.items()}}
+        block = np.ascontiguousarray(results.values, dtype=np.float64)
+        return self._insert([name], [dict(inputs)], start_month, _metric_rows(batch), [block])[0]
+
+    def save_batch(self, scenarios, names=None, start_month=None, with_series: bool = True, chunk_size: int = 5_000):
+        """
+        Runs and saves many scenarios (a DataFrame, dict of columns or list of input dicts) through
+        the batch engine, chunk_size per transaction. with_series=False stores only inputs and
+        metrics; such scenarios are recomputed when opened. Returns the new ids.
+        """
+        table = pd.DataFrame(scenarios)
+        names = list(names) if names is not None else [str(name) for name in table.index]
+        start_month = resolve_start_month(start_month)
+        ids = []
+        for start in range(0, len(table), chunk_size):
+            chunk = table.iloc[start:start + chunk_size]
+            batch = run_financial_model_batch(chunk, start_month=start_month)
+            blocks = None
+            if with_series:
+                # (N, months, line items) in ScenarioResult column order; each scenario's block is one row
+                blocks = np.stack([batch[name][col] for name, columns in RESULT_LAYOUT for col in columns], axis=-1)
+            rows_inputs = [{key: value for key, value in row.items() if value == value} for row in chunk.to_dict("records")]
+            ids += self._insert(names[start:start + chunk_size], rows_inputs, start_month, _metric_rows(batch), blocks)
+        return ids
+
+    def delete(self, ids):
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM scenarios WHERE id = ?", ((int(i),) for i in ids))
+
+    # --- reads ---
+    def query(self, filters=(), order_by: str = "y5_ebitda", descending: bool = True, limit: int = 100, name_like: str = None):
+        """
+        Saved scenarios matching every (metric, op, value) filter, as a DataFrame of LISTING_COLUMNS
+        indexed by id. Metrics that never occur (e.g. no breakeven) are NULL and fail every filter.
+        """
+        clauses, params = [], []
+        for metric, op, value in filters:
+            if metric not in METRIC_COLUMNS or op not in QUERY_OPERATORS:
+                raise ValueError(f"Unsupported filter: {metric} {op} {value}")
+            clauses.append(f"{metric} {op} ?")
+            params.append(float(value))
+        if name_like:
+            clauses.append("name LIKE ?")
+            params.append(f"%{name_like}%")
+        if order_by not in METRIC_COLUMNS + ("id", "created", "name"):
+            raise ValueError(f"Unsupported sort column: {order_by}")
+        sql = (f"SELECT {', '.join(LISTING_COLUMNS)} FROM scenarios"
+               + (f" WHERE {' AND '.join(clauses)}" if clauses else "")
+               + f" ORDER BY {order_by} {'DESC' if descending else 'ASC'} NULLS LAST" + (" LIMIT ?" if limit else ""))
+        with self._lock:
+            rows = self._conn.execute(sql, params + ([int(limit)] if limit else [])).fetchall()
+        return pd.DataFrame(rows, columns=list(LISTING_COLUMNS)).set_index("id")
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM scenarios").fetchone()[0]
+
+    def open(self, scenario_id: int):
+        """
+        One scenario with its full statements: {"id", "name", "inputs", "start_month", "results"}.
+        The series block is read only here, and recomputed if it was saved without one.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT name, inputs, start_month, model_version FROM scenarios WHERE id = ?", (int(scenario_id),)).fetchone()
+            if row is None:
+                raise KeyError(f"No saved scenario {scenario_id}")
+            series = self._conn.execute("SELECT months, data FROM series WHERE scenario_id = ?", (int(scenario_id),)).fetchone()
+            layout = self._conn.execute("SELECT layout FROM layouts WHERE model_version = ?", (row[3],)).fetchone()
+        name, inputs, start_month, model_version = row[0], json.loads(row[1]), row[2], row[3]
+        if series is not None and layout is not None and model_version == MODEL_VERSION:
+            months, data = series
+            results = ScenarioResult(np.frombuffer(data, dtype=np.float64).reshape(months, -1), month_labels(start_month, months), json.loads(layout[0]))
+        else:
+            results = run_financial_model(inputs, start_month=start_month) # saved by an older engine, or without series
+        return {"id": int(scenario_id), "name": name, "inputs": inputs, "start_month": start_month, "results": results}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
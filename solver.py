@@ -0,0 +1,156 @@
+"""
+Goal-seek and optimisation over model inputs.
+
+Every iteration evaluates a whole set of candidate inputs in one run_financial_model_batch call
+instead of one model run per probe. Metrics are the per-scenario columns of
+financial_engine.summarize_batch (min_cash, ending_cash, breakeven_month, final_ltv_cac, y5_ebitda, ...)
+or any callable mapping a batch to one value per scenario. breakeven_month is the first month with
+positive EBITDA, the same month generate_narrative reports.
+
+    goal_seek(inputs, "seed_amount", 0, 5_000_000, constraint=("min_cash", ">=", 0))
+    optimize(inputs, {"series_a_month": range(1, 61)}, objective="min_cash")
+    goal_seek(inputs, "leads_per_sdr", 0, 200, constraint=("breakeven_month", "<=", 24))
+"""
+import itertools
+import operator
+import time
+
+import numpy as np
+
+from financial_engine import MONTH_INPUTS, run_financial_model_batch, summarize_batch
+
+OPERATORS = {">=": operator.ge, ">": operator.gt, "<=": operator.le, "<": operator.lt, "==": operator.eq}
+
+
+def _evaluate(base_inputs, candidates: dict, metrics, start_month=None):
+    """Runs every candidate row in one batch; returns {metric name: (N,) array}."""
+    n = len(next(iter(candidates.values())))
+    table = {key: np.full(n, value, dtype=float) for key, value in base_inputs.items()}
+    table.update({key: np.asarray(values, dtype=float) for key, values in candidates.items()})
+    batch = run_financial_model_batch(table, start_month=start_month)
+    summary = None
+    values = {}
+    for metric in metrics:
+        if callable(metric):
+            values[metric] = np.asarray(metric(batch), dtype=float)
+        else:
+            if summary is None:
+                summary = summarize_batch(batch)
+            values[metric] = summary[metric].to_numpy(dtype=float)
+        # An event that never happens (NaN month) is later than any month in the forecast
+        values[metric] = np.where(np.isnan(values[metric]), np.inf, values[metric])
+    return values
+
+
+def _satisfied(values, constraint):
+    if constraint is None:
+        return np.ones(len(next(iter(values.values()))), dtype=bool)
+    metric, op, threshold = constraint
+    return OPERATORS[op](values[metric], threshold)
+
+
+def goal_seek(base_inputs: dict, key: str, lo: float, hi: float, constraint, find: str = "min",
+              candidates_per_iter: int = 64, tol: float = 1.0, max_iter: int = 20, max_seconds: float = 5.0, start_month=None):
+    """
+    Bracketed search for the smallest (find="min") or largest (find="max") value of `key` in [lo, hi]
+    that satisfies `constraint` = (metric, op, threshold), assuming the constraint flips only once
+    across the bracket. Each iteration evaluates candidates_per_iter evenly spaced values in one batch
+    and narrows the bracket to the pair straddling the flip, so it shrinks ~candidates_per_iter-fold.
+
+    Returns {"solution", "value", "feasible", "converged", "iterations", "evaluations", "elapsed", "trace"}.
+    """
+    metric = constraint[0]
+    integer = key in MONTH_INPUTS
+    started = time.perf_counter()
+    trace, evaluations, best, best_value = [], 0, None, None
+
+    for iteration in range(1, max_iter + 1):
+        candidates = np.linspace(lo, hi, candidates_per_iter)
+        if integer:
+            candidates = np.unique(np.round(candidates))
+        values = _evaluate(base_inputs, {key: candidates}, [metric], start_month)
+        ok = _satisfied(values, constraint)
+        evaluations += len(candidates)
+
+        if not ok.any():
+            trace.append({"iteration": iteration, "lo": float(lo), "hi": float(hi), "best": None, "metric": None,
+                          "elapsed": time.perf_counter() - started})
+            break # nothing in the bracket satisfies the constraint
+        j = ok.argmax() if find == "min" else len(ok) - 1 - ok[::-1].argmax()
+        best, best_value = float(candidates[j]), float(values[metric][j])
+        if find == "min":
+            lo, hi = (candidates[j - 1] if j > 0 else candidates[j]), candidates[j]
+        else:
+            lo, hi = candidates[j], (candidates[j + 1] if j + 1 < len(candidates) else candidates[j])
+
+        elapsed = time.perf_counter() - started
+        trace.append({"iteration": iteration, "lo": float(lo), "hi": float(hi), "best": best, "metric": best_value, "elapsed": elapsed})
+        if hi - lo <= (1 if integer else tol) or elapsed >= max_seconds:
+            break
+
+    return {
+        "solution": {key: best} if best is not None else None,
+        "value": best_value,
+        "feasible": best is not None,
+        "converged": bool(best is not None and hi - lo <= (1 if integer else tol)),
+        "iterations": len(trace), "evaluations": evaluations,
+        "elapsed": time.perf_counter() - started, "trace": trace,
+    }
+
+
+def optimize(base_inputs: dict, space: dict, objective: str, maximize: bool = True, constraint=None,
+             points_per_dim: int = 16, max_evaluations_per_iter: int = 50_000, tol: float = 1e-3,
+             max_iter: int = 10, max_seconds: float = 10.0, start_month=None):
+    """
+    Maximises (or minimises) `objective` over one or more inputs, subject to an optional constraint.
+    `space` maps each input to either a list/range of candidate values (searched exhaustively) or a
+    (lo, hi) tuple (searched on a points_per_dim grid that zooms in around the incumbent each
+    iteration). Every iteration's full cartesian grid is evaluated in batched passes.
+
+    Returns {"solution", "value", "feasible", "converged", "iterations", "evaluations", "elapsed", "trace"}.
+    """
+    discrete = {key: [float(v) for v in values] for key, values in space.items() if not isinstance(values, tuple)}
+    bounds = {key: tuple(map(float, values)) for key, values in space.items() if isinstance(values, tuple)}
+    metrics = [objective] + ([constraint[0]] if constraint and constraint[0] != objective else [])
+    started = time.perf_counter()
+    trace, evaluations, best, best_value = [], 0, None, None
+    converged = False
+
+    for iteration in range(1, max_iter + 1):
+        axes = dict(discrete)
+        for key, (lo, hi) in bounds.items():
+            axis = np.linspace(lo, hi, points_per_dim)
+            axes[key] = list(np.unique(np.round(axis)) if key in MONTH_INPUTS else axis)
+        grid = list(itertools.product(*axes.values()))
+        for start in range(0, len(grid), max_evaluations_per_iter):
+            chunk = np.asarray(grid[start:start + max_evaluations_per_iter], dtype=float)
+            values = _evaluate(base_inputs, {key: chunk[:, i] for i, key in enumerate(axes)}, metrics, start_month)
+            evaluations += len(chunk)
+            score = np.where(_satisfied(values, constraint), values[objective], np.nan)
+            if np.isnan(score).all():
+                continue
+            j = np.nanargmax(score) if maximize else np.nanargmin(score)
+            if best_value is None or (score[j] > best_value if maximize else score[j] < best_value):
+                best, best_value = dict(zip(axes, chunk[j].tolist())), float(score[j])
+
+        elapsed = time.perf_counter() - started
+        trace.append({"iteration": iteration, "best": best, "value": best_value, "evaluations": len(grid), "elapsed": elapsed})
+        if best is None or not bounds:
+            converged = best is not None
+            break
+        # Zoom every continuous range to one grid step either side of the incumbent
+        new_bounds = {}
+        for key, (lo, hi) in bounds.items():
+            step = (hi - lo) / (points_per_dim - 1)
+            new_bounds[key] = (max(lo, best[key] - step), min(hi, best[key] + step))
+        converged = all(hi - lo <= (1 if key in MONTH_INPUTS else tol * max(1.0, abs(best[key])))
+                        for key, (lo, hi) in new_bounds.items())
+        bounds = new_bounds
+        if converged or elapsed >= max_seconds:
+            break
+
+    return {
+        "solution": best, "value": best_value, "feasible": best is not None, "converged": converged,
+        "iterations": len(trace), "evaluations": evaluations,
+        "elapsed": time.perf_counter() - started, "trace": trace,
+    }
@@ -0,0 +1,127 @@
+"""
+Cold-start report for the Streamlit app, with a time budget for autoscaled containers.
+
+Everything is measured in fresh interpreters, as a new container would see it:
+
+  imports         -X importtime of webapp.py's top-level imports, in the order the app imports them
+                  (a module shared by several is charged to the first)
+  first session   the first page render in a new process: prewarming the default scenario (model
+                  stages, dashboard view) plus the script and widgets
+  next session    a later session's first render, served from the prewarmed default scenario
+
+    python startup_report.py                       # report; exit 1 if imports + first session exceed the budget
+    python startup_report.py --budget-ms 2500 --json
+"""
+import argparse
+import ast
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+WEBAPP = os.path.join(APP_DIR, "webapp.py")
+DEFAULT_BUDGET_MS = float(os.getenv("EXITPATH_COLD_START_BUDGET_MS", 3000))
+_IMPORT_TIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def webapp_imports(path=WEBAPP):
+    """Modules webapp.py imports at load time, in order (imports inside functions are lazy and skipped)."""
+    modules = []
+    for node in ast.parse(open(path).read()).body:
+        names = [alias.name for alias in node.names] if isinstance(node, ast.Import) else [node.module] if isinstance(node, ast.ImportFrom) else []
+        modules += [name for name in names if name not in modules]
+    return modules
+
+
+def import_breakdown(modules):
+    """{module: cumulative ms} for importing `modules` in order in a fresh interpreter."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "; ".join(f"import {name}" for name in modules)],
+                          cwd=APP_DIR, capture_output=True, text=True, check=True)
+    wanted, timings = set(modules), {}
+    for line in proc.stderr.splitlines():
+        match = _IMPORT_TIME.match(line)
+        if match and not match[3] and match[4] in wanted:
+            timings[match[4]] = int(match[2]) / 1000
+    return {name: timings.get(name, 0.0) for name in modules}
+
+
+def _render_timings():
+    """Runs in a child process with the app's modules already imported: times first and next session renders."""
+    import warnings
+    warnings.simplefilter("ignore")
+    from streamlit.testing.v1 import AppTest
+    import financial_engine
+    from dashboard_view import build_dashboard_view
+    for name in webapp_imports():
+        __import__(name)
+    financial_engine.enable_stage_profiling()
+
+    def session():
+        app = AppTest.from_file(WEBAPP, default_timeout=120)
+        started = time.perf_counter()
+        app.run()
+        elapsed = (time.perf_counter() - started) * 1000
+        if app.exception:
+            raise RuntimeError(f"webapp raised on first render: {app.exception}")
+        return elapsed
+
+    first = session()
+    stages = {stage: stats["total_ms"] for stage, stats in financial_engine.stage_profile().items()}
+    second = session()
+    # Rebuilding the default view once more gives the view-model share of the first render
+    results = financial_engine.run_financial_model(financial_engine.DEFAULT_SCENARIO)
+    started = time.perf_counter()
+    build_dashboard_view(results, financial_engine.DEFAULT_SCENARIO)
+    view_ms = (time.perf_counter() - started) * 1000
+    return {"first_session_ms": first, "model_stages_ms": stages, "dashboard_view_ms": view_ms, "next_session_ms": second}
+
+
+def startup_report():
+    modules = webapp_imports()
+    imports = import_breakdown(modules)
+    with tempfile.TemporaryDirectory() as scratch:
+        # An empty disk cache and scenario store: the child sees a true cold start and leaves the app's own files alone
+        env = dict(os.environ, EXITPATH_CACHE_DIR=os.path.join(scratch, "cache"), EXITPATH_STORE_PATH=os.path.join(scratch, "scenarios.db"))
+        child = subprocess.run([sys.executable, os.path.abspath(__file__), "--render-child"], cwd=APP_DIR, capture_output=True, text=True, env=env)
+    if child.returncode != 0:
+        raise RuntimeError(f"render measurement failed:\n{child.stderr[-2000:]}")
+    render = json.loads(child.stdout.strip().splitlines()[-1])
+    return {
+        "imports_ms": imports, "import_total_ms": sum(imports.values()), **render,
+        "cold_start_ms": sum(imports.values()) + render["first_session_ms"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Break down the app's cold start and check it against a budget.")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Budget for imports + first session render.")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    parser.add_argument("--render-child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.render_child:
+        print(json.dumps(_render_timings()))
+        return 0
+
+    report = startup_report()
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{'imports':<24}{report['import_total_ms']:10.1f} ms")
+        for name, ms in sorted(report["imports_ms"].items(), key=lambda item: -item[1]):
+            print(f"  {name:<22}{ms:10.1f} ms")
+        print(f"{'first session':<24}{report['first_session_ms']:10.1f} ms")
+        print(f"  {'model stages':<22}{sum(report['model_stages_ms'].values()):10.1f} ms")
+        print(f"  {'dashboard view':<22}{report['dashboard_view_ms']:10.1f} ms")
+        print(f"{'next session':<24}{report['next_session_ms']:10.1f} ms")
+    over = report["cold_start_ms"] > args.budget_ms
+    print(f"Cold start {report['cold_start_ms']:,.0f} ms {'exceeds' if over else 'within'} the {args.budget_ms:,.0f} ms budget.")
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
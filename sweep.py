@@ -0,0 +1,166 @@
+"""
+Parameter-grid sweeps over run_financial_model inputs.
+
+The cartesian grid is never materialised: points are addressed by their flat index, split into
+fixed-size shards and run through the batch engine on a local process pool. Each finished shard's
+summary metrics are written to its own .npz file, so an interrupted sweep picks up at the first missing
+shard when run again with the same arguments.
+
+    python sweep.py --grid grid.json --out sweeps/runway
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from financial_engine import run_financial_model_batch, summarize_batch
+
+MANIFEST = "manifest.json"
+
+
+def grid_size(grid: dict):
+    return int(np.prod([len(values) for values in grid.values()], dtype=np.int64))
+
+
+def grid_points(grid: dict, start: int, stop: int):
+    """Input columns for flat grid indices [start, stop), in row-major order of the grid keys."""
+    shape = [len(values) for values in grid.values()]
+    coords = np.unravel_index(np.arange(start, stop), shape)
+    return {key: np.asarray(values, dtype=float)[idx] for (key, values), idx in zip(grid.items(), coords)}
+
+
+def _shard_path(out_dir, shard_id):
+    return os.path.join(out_dir, f"shard_{shard_id:06d}.npz")
+
+
+def _run_shard(base_inputs, grid, shard_id, shard_size, out_dir):
+    """Runs one shard and writes its summary atomically. Runs in a worker process."""
+    start = shard_id * shard_size
+    stop = min(start + shard_size, grid_size(grid))
+    points = grid_points(grid, start, stop)
+    table = {key: np.full(stop - start, value, dtype=float) for key, value in base_inputs.items()}
+    table.update(points)
+
+    summary = summarize_batch(run_financial_model_batch(table))
+
+    path = _shard_path(out_dir, shard_id)
+    with open(path + ".tmp", "wb") as f:
+        np.savez(f, point=np.arange(start, stop), **points, **{col: summary[col].to_numpy() for col in summary.columns})
+    os.replace(path + ".tmp", path)
+    return shard_id, stop - start
+
+
+def _check_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST)
+    if os.path.exists(path):
+        with open(path) as f:
+            existing = json.load(f)
+        if existing != manifest:
+            raise ValueError(f"{out_dir} holds a different sweep; use a new output directory or delete it to start over.")
+    else:
+        with open(path, "w") as f:
+            json.dump(manifest, f, indent=2)
+
+
+def run_sweep(base_inputs: dict, grid: dict, out_dir: str, shard_size: int = 20_000, workers=None, progress=None):
+    """
+    Sweeps every combination of `grid` ({input key: list of values}) on top of base_inputs.
+    Shards already on disk are skipped. `progress(done_points, total_points, elapsed_s)` is called
+    after every shard. Returns the number of shards computed by this call.
+    """
+    grid = {key: [float(v) for v in values] for key, values in grid.items()}
+    base_inputs = {key: value for key, value in base_inputs.items() if key not in grid}
+    os.makedirs(out_dir, exist_ok=True)
+    _check_manifest(out_dir, {"base_inputs": base_inputs, "grid": grid, "shard_size": shard_size})
+
+    total = grid_size(grid)
+    n_shards = -(-total // shard_size)
+    pending = [s for s in range(n_shards) if not os.path.exists(_shard_path(out_dir, s))]
+    done_points = total - sum(min(shard_size, total - s * shard_size) for s in pending)
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = [pool.submit(_run_shard, base_inputs, grid, s, shard_size, out_dir) for s in pending]
+        for future in as_completed(futures):
+            _, n_points = future.result()
+            done_points += n_points
+            if progress:
+                progress(done_points, total, time.perf_counter() - started)
+    return len(pending)
+
+
+def load_sweep(out_dir: str, columns=None):
+    """Concatenates all completed shard summaries (optionally only some columns)."""
+    frames = []
+    for name in sorted(f for f in os.listdir(out_dir) if f.startswith("shard_") and f.endswith(".npz")):
+        with np.load(os.path.join(out_dir, name)) as shard:
+            keep = [col for col in shard.files if col != "point" and (columns is None or col in columns)]
+            frames.append(pd.DataFrame({col: shard[col] for col in keep}, index=pd.Index(shard["point"], name="point")))
+    return pd.concat(frames) if frames else pd.DataFrame()
+
+
+# --- SENSITIVITY TABLES ---
+
+def _anchor(values, base_value):
+    """The grid value closest to the base input, used to hold a dimension fixed."""
+    values = np.asarray(sorted(set(values)))
+    return values[np.abs(values - base_value).argmin()]
+
+
+def tornado_table(results: pd.DataFrame, grid: dict, base_inputs: dict, metric: str):
+    """
+    One-at-a-time sensitivity: each grid input moves across its range while every other grid input
+    stays at its value nearest the base case. Rows are sorted by swing, largest first.
+    """
+    anchors = {key: _anchor(values, base_inputs.get(key, values[0])) for key, values in grid.items()}
+    rows = []
+    for key, values in grid.items():
+        mask = np.ones(len(results), dtype=bool)
+        for other, anchor in anchors.items():
+            if other != key:
+                mask &= results[other].to_numpy() == anchor
+        line = results.loc[mask].set_index(key)[metric].sort_index()
+        if line.empty:
+            continue
+        rows.append({
+            "input": key, "low_value": line.index[0], "high_value": line.index[-1],
+            "metric_at_low": line.iloc[0], "metric_at_high": line.iloc[-1],
+            "metric_at_base": line.get(anchors[key], np.nan), "swing": abs(line.iloc[-1] - line.iloc[0]),
+        })
+    return pd.DataFrame(rows).sort_values("swing", ascending=False, ignore_index=True)
+
+
+def heatmap_table(results: pd.DataFrame, x: str, y: str, metric: str, fixed=None, aggfunc="mean"):
+    """Two-way sensitivity: `metric` pivoted over inputs y (rows) and x (columns), other inputs optionally fixed."""
+    if fixed:
+        mask = np.ones(len(results), dtype=bool)
+        for key, value in fixed.items():
+            mask &= results[key].to_numpy() == value
+        results = results.loc[mask]
+    return results.pivot_table(index=y, columns=x, values=metric, aggfunc=aggfunc)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sharded, resumable parameter-grid sweep of the pro forma model.")
+    parser.add_argument("--grid", required=True, help='JSON file: {"grid": {key: [values]}, "base_inputs": {key: value}}')
+    parser.add_argument("--out", required=True, help="Output directory for shard summaries (re-run to resume).")
+    parser.add_argument("--shard-size", type=int, default=20_000)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    with open(args.grid) as f:
+        spec = json.load(f)
+
+    def report(done, total, elapsed):
+        print(f"{done:,}/{total:,} points ({done / total:.1%}) - {elapsed:,.1f}s", flush=True)
+
+    computed = run_sweep(spec.get("base_inputs", {}), spec["grid"], args.out, args.shard_size, args.workers, progress=report)
+    print(f"Computed {computed} shard(s); results in {args.out}")
+
+
+if __name__ == "__main__":
+    main()
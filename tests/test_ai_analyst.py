@@ -0,0 +1,113 @@
+"""The AI analyst: token-budgeted context, streaming against the local stub model (complete answers are cached, failed ones are not) and the CLI."""
+import json
+import socket
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip("openai")
+
+import ai_analyst
+from ai_analyst import StubModelHandler, make_stub_server, query_analyst
+from financial_engine import DEFAULT_SCENARIO, run_financial_model
+
+
+class CutOffHandler(StubModelHandler):
+    """Streams one token, then an error event, as a provider does when it fails mid-answer."""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        chunk = {"id": "stub", "created": 0, "model": "stub", "object": "chat.completion.chunk",
+                 "choices": [{"index": 0, "delta": {"content": "Partial"}, "finish_reason": None}]}
+        self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        self.wfile.write(f"data: {json.dumps({'error': {'message': 'upstream failed'}})}\n\n".encode())
+
+
+@pytest.fixture
+def results():
+    return run_financial_model(DEFAULT_SCENARIO)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "stub")
+    ai_analyst._response_cache.clear()
+    yield
+    ai_analyst._response_cache.clear()
+
+
+def _serve(server, monkeypatch):
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{server.server_address[1]}/v1")
+    return server
+
+
+def test_complete_answer_is_cached(results, monkeypatch):
+    server = _serve(make_stub_server(port=0, latency_ms=0, token_ms=0), monkeypatch)
+    try:
+        answer = query_analyst("Why is my runway short?", results, scenario_hash="s")
+    finally:
+        server.shutdown()
+    assert answer.startswith("(stub) You asked: Why is my runway short?")
+    assert list(ai_analyst._response_cache.values()) == [answer]
+    assert query_analyst("why is my runway short", results, scenario_hash="s") == answer
+
+
+def test_connection_error_is_reported_and_not_cached(results, monkeypatch):
+    with socket.socket() as sock: # a port nothing listens on
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{port}/v1")
+    answer = query_analyst("Why is my runway short?", results, scenario_hash="s")
+    assert answer == ai_analyst.ERROR_MESSAGE.format(error="APIConnectionError")
+    assert not ai_analyst._response_cache
+
+
+def test_partial_answer_is_not_cached(results, monkeypatch):
+    server = make_stub_server(port=0)
+    server.RequestHandlerClass = CutOffHandler
+    _serve(server, monkeypatch)
+    try:
+        answer = query_analyst("Why is my runway short?", results, scenario_hash="s")
+    finally:
+        server.shutdown()
+    assert answer.startswith("Partial\n\nAI Analyst could not reach the model")
+    assert not ai_analyst._response_cache
+
+
+@pytest.mark.parametrize("budget", [20, 50, 100, 150, 200, 250, 600, 5000])
+def test_context_fits_budget_and_drops_lowest_priority_first(results, budget):
+    sections = ai_analyst._context_sections(results)
+    text = ai_analyst.build_context(results, budget)
+    assert ai_analyst.estimate_tokens(text) <= max(budget, ai_analyst.estimate_tokens("SCENARIO SUMMARY"))
+    blocks = text.split("\n\n")[1:]
+    assert [block.split(":\n", 1)[0] for block in blocks] == [title for title, _ in sections[:len(blocks)]]
+    for i, block in enumerate(blocks):
+        lines = block.split("\n")[1:]
+        assert lines == sections[i][1][:len(lines)] # a prefix of the section, in order
+        if i < len(blocks) - 1:
+            assert lines == sections[i][1] # only the last kept section may be truncated
+
+
+def test_full_context_keeps_every_line(results):
+    text = ai_analyst.build_context(results, 10_000)
+    for title, lines in ai_analyst._context_sections(results):
+        assert f"{title}:\n" + "\n".join(lines) in text
+    pnl, cash = results["pnl"], results["bs"]["Cash"]
+    breakeven = pnl.index[(pnl["EBITDA"] > 0).to_numpy().argmax()]
+    assert f"EBITDA breakeven: {breakeven}." in text
+    assert f"Horizon: {len(pnl)} months" in text and ai_analyst._money(cash.iloc[-1]) in text
+
+
+def test_ask_uses_default_scenario(monkeypatch, capsys):
+    seen = []
+    monkeypatch.setattr(ai_analyst, "iter_analyst", lambda query, context: seen.append((query, context)) or iter(["answer"]))
+    ai_analyst.main(["ask", "How long is my runway?"])
+    query, context = seen[0]
+    assert query == "How long is my runway?"
+    np.testing.assert_array_equal(context.values, run_financial_model(DEFAULT_SCENARIO).values)
+    assert capsys.readouterr().out == "answer\n"
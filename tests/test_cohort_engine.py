@@ -0,0 +1,107 @@
+"""The cohort engine against brute-force loops and against the engine's closed-form platform MRR."""
+import numpy as np
+import pytest
+
+from cohort_engine import cohort_matrix, cohort_starts, run_cohort_model, trailing_ndr
+from financial_engine import DEFAULT_SCENARIO, INPUT_DEFAULTS, MONTHS, _platform_mrr
+
+COHORT_KEYS = ('investor_license_start_mrr', 'new_investor_licenses_q', 'investor_license_price', 'platform_churn_pct', 'platform_expansion_pct')
+
+
+def reference_platform_mrr(p, months=MONTHS):
+    """The month-by-month roll-forward the closed form replaced, for one scenario."""
+    mrr = np.zeros(months)
+    mrr[0] = p['investor_license_start_mrr']
+    new_licenses_mrr = p['new_investor_licenses_q'] * p['investor_license_price']
+    churn_rate, expansion_rate = p['platform_churn_pct'] / 100 / 12, p['platform_expansion_pct'] / 100 / 12
+    for t in range(1, months):
+        prev = mrr[t - 1]
+        mrr[t] = prev + (new_licenses_mrr if t % 3 == 0 else 0) - prev * churn_rate + prev * expansion_rate
+    return mrr
+
+
+def reference_cohorts(initial_mrr, churn, expansion, months=MONTHS):
+    """Cohort rows one month at a time; churn / expansion are annual % per (cohort, age)."""
+    starts = cohort_starts(months)
+    mrr, dollar, logo = (np.full((len(starts), months), fill) for fill in (0.0, np.nan, np.nan))
+    for k, start in enumerate(starts):
+        balance, active = initial_mrr[k], 1.0
+        for age in range(months - start):
+            if age:
+                balance *= 1 - churn[k, age] / 1200 + expansion[k, age] / 1200
+                active *= 1 - churn[k, age] / 1200
+            mrr[k, start + age] = balance
+            dollar[k, start + age] = balance / initial_mrr[k]
+            logo[k, start + age] = active
+    return mrr, dollar, logo
+
+
+def _random_params(rng, n):
+    return {
+        'investor_license_start_mrr': rng.uniform(0, 50_000, (n, 1)),
+        'new_investor_licenses_q': rng.integers(0, 20, (n, 1)).astype(float),
+        'investor_license_price': rng.uniform(0, 3_000, (n, 1)),
+        'platform_churn_pct': rng.uniform(0, 60, (n, 1)),
+        'platform_expansion_pct': rng.uniform(0, 40, (n, 1)),
+    }
+
+
+def test_closed_form_matches_reference_loop():
+    p = _random_params(np.random.default_rng(0), 50)
+    closed = _platform_mrr(p, (50, MONTHS))
+    for i in range(50):
+        scenario = {key: value[i, 0] for key, value in p.items()}
+        np.testing.assert_allclose(closed[i], reference_platform_mrr(scenario), rtol=1e-10)
+
+
+def test_cohort_sums_equal_engine_platform_mrr():
+    p = _random_params(np.random.default_rng(1), 50)
+    matrix = cohort_matrix(p['investor_license_start_mrr'], p['new_investor_licenses_q'] * p['investor_license_price'],
+                           p['platform_churn_pct'], p['platform_expansion_pct'])
+    assert matrix['mrr'].shape == (50, len(cohort_starts()), MONTHS)
+    np.testing.assert_allclose(matrix['mrr'].sum(axis=-2), _platform_mrr(p, (50, MONTHS)), rtol=1e-10)
+
+
+def test_default_scenario_platform_matches_engine():
+    p = {key: DEFAULT_SCENARIO.get(key, INPUT_DEFAULTS[key]) for key in COHORT_KEYS}
+    platform = run_cohort_model(DEFAULT_SCENARIO)['platform']['Platform MRR'].to_numpy()
+    np.testing.assert_allclose(platform, _platform_mrr(p, (MONTHS,)), rtol=1e-10)
+    np.testing.assert_allclose(platform, reference_platform_mrr(p), rtol=1e-10)
+
+
+def test_per_cohort_and_per_age_rates_match_brute_force():
+    rng = np.random.default_rng(2)
+    cohorts = len(cohort_starts())
+    initial = rng.uniform(100, 10_000, cohorts)
+    churn = rng.uniform(0, 60, (cohorts, MONTHS))
+    expansion = rng.uniform(0, 40, cohorts) # one rate per cohort
+    matrix = cohort_matrix(initial[:1], initial[1:], churn, expansion)
+    mrr, dollar, logo = reference_cohorts(initial, churn, np.broadcast_to(expansion[:, None], churn.shape))
+    np.testing.assert_allclose(matrix['mrr'], mrr, rtol=1e-10)
+    np.testing.assert_allclose(matrix['dollar_retention'], dollar, rtol=1e-10)
+    np.testing.assert_allclose(matrix['logo_retention'], logo, rtol=1e-10)
+
+
+def test_trailing_ndr_matches_brute_force():
+    rng = np.random.default_rng(3)
+    mrr = cohort_matrix(5_000.0, rng.uniform(500, 5_000, len(cohort_starts()) - 1), 20.0, 10.0)['mrr']
+    starts = cohort_starts()
+    ndr = trailing_ndr(mrr)
+    assert np.isnan(ndr[:12]).all()
+    for t in range(12, MONTHS):
+        existed = starts <= t - 12
+        assert ndr[t] == pytest.approx(mrr[existed, t].sum() / mrr[existed, t - 12].sum(), rel=1e-12)
+
+
+def test_retention_views_are_read_only():
+    matrix = cohort_matrix(1_000.0, 500.0, 12.0, 6.0)
+    with pytest.raises(ValueError):
+        matrix['dollar_retention'][0, 0] = 2.0
+
+
+@pytest.mark.parametrize("shape", [(5,), (5, MONTHS), (3, 5, MONTHS), (3, 7)])
+def test_rates_with_the_wrong_cohort_count_raise(shape):
+    with pytest.raises(ValueError, match="churn_pct"):
+        cohort_matrix(1_000.0, 500.0, np.full(shape, 12.0), 6.0)
+    with pytest.raises(ValueError, match="expansion_pct"):
+        cohort_matrix(1_000.0, 500.0, 12.0, np.full(shape, 6.0))
@@ -0,0 +1,82 @@
+"""Prefix-sum dashboard figures against direct .iloc slicing of the result frames, as the app used to do."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import ui_components
+from dashboard_view import build_dashboard_view, projection_metrics, window_sum
+from financial_engine import DEFAULT_SCENARIO, run_financial_model
+from ui_components import BOWTIE_TIMEFRAMES, bowtie_html, bowtie_html_by_timeframe
+
+SCENARIOS = [DEFAULT_SCENARIO, dict(DEFAULT_SCENARIO, platform_churn_pct=35, platform_expansion_pct=12, leads_per_sdr=7, starting_cash=10_000)]
+
+
+def reference_bowtie(funnel_data, pnl_data, inputs, timeframe):
+    """The bowtie figures as render_bowtie computed them before the prefix sums."""
+    if timeframe == "Year 1": start_idx, end_idx = 0, 12
+    elif timeframe == "Year 2": start_idx, end_idx = 12, 24
+    else: start_idx, end_idx = 0, len(funnel_data)
+    period_funnel = funnel_data.iloc[start_idx:end_idx].sum()
+    market_fit, ready = period_funnel.get("Market Fit Deals", 0), period_funnel.get("Ready Deals", 0)
+    platform_mrr_series = pnl_data['Revenue']
+    churn_rate_monthly = inputs.get('platform_churn_pct', 0) / 100 / 12
+    expansion_rate_monthly = inputs.get('platform_expansion_pct', 0) / 100 / 12
+    return (period_funnel.get("Leads Generated", 0), market_fit, ready,
+            market_fit * inputs.get('price_market_fit', 0), ready * inputs.get('price_ready', 0),
+            (platform_mrr_series.shift(1) * expansion_rate_monthly).iloc[start_idx:end_idx].sum(),
+            (platform_mrr_series.shift(1) * churn_rate_monthly).iloc[start_idx:end_idx].sum(),
+            inputs.get('lead_to_marketfit_pct', 0))
+
+
+@pytest.mark.parametrize("inputs", SCENARIOS)
+def test_projection_metrics_match_iloc(inputs):
+    results = run_financial_model(inputs)
+    pnl, bs = results["pnl"], results["bs"]
+    view = build_dashboard_view(results, inputs)
+    for year in range(1, 6):
+        start_idx, end_idx = (year - 1) * 12, year * 12
+        metrics = projection_metrics(view, year)
+        assert metrics["revenue"] == pytest.approx(pnl['Revenue'].iloc[start_idx:end_idx].sum(), rel=1e-12)
+        assert metrics["ebitda"] == pytest.approx(pnl['EBITDA'].iloc[start_idx:end_idx].sum(), rel=1e-12, abs=1e-6)
+        assert metrics["ending_cash"] == bs['Cash'].iloc[end_idx - 1]
+
+
+def test_window_sum_clips_to_forecast():
+    results = run_financial_model(DEFAULT_SCENARIO)
+    view = build_dashboard_view(results, DEFAULT_SCENARIO)
+    revenue = results["pnl"]["Revenue"]
+    assert window_sum(view, "pnl", "Revenue", 50, 80) == pytest.approx(revenue.iloc[50:80].sum())
+    assert window_sum(view, "pnl", "Revenue", 70, 80) == 0.0
+    assert window_sum(view, "funnel", "Leads Generated", 0, 60) == pytest.approx(results["funnel"]["Leads Generated"].sum())
+
+
+@pytest.mark.parametrize("inputs", SCENARIOS)
+def test_bowtie_figures_match_iloc(inputs, monkeypatch):
+    results = run_financial_model(inputs)
+    funnel, pnl = results["funnel"], results["pnl"]
+    captured = []
+    monkeypatch.setattr(ui_components, "bowtie_html", lambda *args: captured.append(args) or "")
+    bowtie_html_by_timeframe(funnel, pnl, inputs)
+    assert len(captured) == len(BOWTIE_TIMEFRAMES)
+    for timeframe, args in zip(BOWTIE_TIMEFRAMES, captured):
+        expected = reference_bowtie(funnel, pnl, inputs, timeframe)
+        np.testing.assert_allclose(np.asarray(args, dtype=float), np.asarray(expected, dtype=float), rtol=1e-12, err_msg=timeframe)
+
+
+def test_bowtie_pages_match_reference_html():
+    results = run_financial_model(SCENARIOS[1])
+    pages = bowtie_html_by_timeframe(results["funnel"], results["pnl"], SCENARIOS[1])
+    for timeframe in BOWTIE_TIMEFRAMES:
+        assert pages[timeframe] == bowtie_html(*reference_bowtie(results["funnel"], results["pnl"], SCENARIOS[1], timeframe))
+
+
+def test_bowtie_lagged_window_on_short_frames(monkeypatch):
+    """With fewer months than the window, the lag still starts at the window's first month."""
+    funnel = pd.DataFrame({"Leads Generated": [5.0, 6, 7], "Market Fit Deals": [1.0, 2, 3], "Ready Deals": [0.0, 1, 1]})
+    pnl = pd.DataFrame({"Revenue": [100.0, 200, 400]})
+    inputs = dict(platform_churn_pct=12, platform_expansion_pct=24)
+    captured = []
+    monkeypatch.setattr(ui_components, "bowtie_html", lambda *args: captured.append(args) or "")
+    bowtie_html_by_timeframe(funnel, pnl, inputs)
+    for timeframe, args in zip(BOWTIE_TIMEFRAMES, captured):
+        np.testing.assert_allclose(np.asarray(args, dtype=float), np.asarray(reference_bowtie(funnel, pnl, inputs, timeframe), dtype=float))
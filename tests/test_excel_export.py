@@ -0,0 +1,37 @@
+"""Sheet naming and the comparison sheet of multi-scenario workbooks."""
+import io
+
+import pytest
+
+from excel_export import SHEET_NAME_MAX, _comparison_row, _sheet_name, workbook_bytes
+from financial_engine import DEFAULT_SCENARIO, run_financial_model
+
+openpyxl = pytest.importorskip("openpyxl")
+pytest.importorskip("xlsxwriter")
+
+
+def test_sheet_names_are_valid_and_unique():
+    used = set()
+    names = [_sheet_name(name, "CFS", used) for name in ["Q1/Q2 [draft]: *best*?", "a\\b", "x" * 40, "x" * 40, "X" * 40, "'quoted'", ""]]
+    assert len({name.lower() for name in names}) == len(names)
+    for name in names:
+        assert len(name) <= SHEET_NAME_MAX
+        assert not set(name) & set("[]:*?/\\")
+        assert not name.startswith("'") and not name.endswith("'")
+    assert names[0] == "Q1_Q2 _draft__ _best__ CFS"
+
+
+def test_workbook_with_awkward_scenario_names_opens():
+    results = run_financial_model(DEFAULT_SCENARIO)
+    scenarios = {"Base/Case": results, "Base:Case": results, "Comparison": results}
+    workbook = openpyxl.load_workbook(io.BytesIO(workbook_bytes(scenarios)), read_only=True)
+    assert workbook.sheetnames[0] == "Comparison"
+    assert len(workbook.sheetnames) == 1 + 4 * len(scenarios)
+
+
+def test_comparison_final_year_follows_horizon():
+    results = run_financial_model(DEFAULT_SCENARIO)
+    short = {statement: frame.iloc[:30] for statement, frame in results.items()}
+    row = _comparison_row("Short", short)
+    assert row[2] == pytest.approx(short["pnl"]["Revenue"].iloc[18:30].sum())
+    assert row[3] == pytest.approx(short["pnl"]["EBITDA"].iloc[18:30].sum())
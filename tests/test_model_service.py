@@ -0,0 +1,115 @@
+"""The HTTP model service end to end: coalescing, /batch summaries, /metrics and request validation."""
+import http.client
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from financial_engine import DEFAULT_SCENARIO, run_financial_model, run_financial_model_batch, summarize_batch
+from model_service import LatencyHistogram, make_server
+from narrative_engine import generate_narrative
+
+START = "2026-01"
+
+
+@pytest.fixture(scope="module")
+def service():
+    server, service = make_server(port=0, workers=1)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server.server_address[1], service
+    server.shutdown()
+    server.server_close()
+    service.close()
+
+
+def _request(port, method, path, body=None, connection=None):
+    conn = connection or http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    conn.request(method, path, json.dumps(body) if body is not None else None, {"Content-Type": "application/json"})
+    response = conn.getresponse()
+    payload = json.loads(response.read())
+    if connection is None:
+        conn.close()
+    return response.status, payload
+
+
+def test_identical_requests_coalesce(service):
+    port, model = service
+    inputs = dict(DEFAULT_SCENARIO, leads_per_sdr=31)
+    before = model.metrics()
+    blocker = model.pool.submit(time.sleep, 0.5) # the only worker is busy, so the first request stays in flight
+    with ThreadPoolExecutor(8) as pool:
+        responses = list(pool.map(lambda _: _request(port, "POST", "/run", {"inputs": inputs, "start_month": START}), range(8)))
+    blocker.result()
+    after = model.metrics()
+    assert all(status == 200 for status, _ in responses)
+    assert after["coalesced"] - before["coalesced"] == 7
+    assert after["computations"] - before["computations"] == 1
+    assert after["queue_depth"] == 0 and after["in_flight_keys"] == 0
+
+    status, payload = responses[0]
+    expected = run_financial_model(inputs, START)
+    assert payload["pnl"]["lines"]["EBITDA"] == expected["pnl"]["EBITDA"].tolist()
+    assert payload["narrative"] == generate_narrative(expected)
+
+
+def test_batch_summaries_equal_summarize_batch(service):
+    port, _ = service
+    scenarios = {f"s{i}": dict(DEFAULT_SCENARIO, cs_per_ae=1 + i % 4, starting_cash=10_000 * (i + 1)) for i in range(6)}
+    status, payload = _request(port, "POST", "/batch", {"scenarios": scenarios, "start_month": START, "statements": False, "narrative": False})
+    assert status == 200
+    summary = summarize_batch(run_financial_model_batch(list(scenarios.values()), start_month=START))
+    assert [row["scenario"] for row in payload["scenarios"]] == list(scenarios)
+    for i, row in enumerate(payload["scenarios"]):
+        assert set(row) == {"scenario", "key", "summary"}
+        expected = {col: (None if value != value else value) for col, value in summary.iloc[i].astype(float).items()}
+        assert row["summary"].keys() == expected.keys()
+        for col, value in expected.items():
+            assert (row["summary"][col] is None) if value is None else row["summary"][col] == pytest.approx(value)
+
+
+def test_metrics_histograms(service):
+    port, _ = service
+    status, before = _request(port, "GET", "/metrics")
+    for _ in range(3):
+        _request(port, "GET", "/health")
+    status, after = _request(port, "GET", "/metrics")
+    assert status == 200 and after["workers"] == 1
+    run_latency = after["latency"]["/run"]
+    assert run_latency["count"] == sum(run_latency["buckets"].values()) >= 8
+    assert 0 < run_latency["p50_ms"] <= run_latency["p99_ms"]
+
+
+def test_latency_histogram_quantiles():
+    histogram = LatencyHistogram()
+    for ms in [0.5] * 50 + [20] * 45 + [7000] * 5:
+        histogram.observe(ms)
+    assert (histogram.quantile(0.5), histogram.quantile(0.95), histogram.quantile(0.99)) == (1, 25, 7000)
+    assert histogram.snapshot()["buckets"]["+Inf"] == 5
+
+
+@pytest.mark.parametrize("path, body", [
+    ("/run", {"inputs": [1, 2]}),
+    ("/run", [1, 2]),
+    ("/batch", {"scenarios": [{"leads_per_sdr": 5}, 3]}),
+    ("/batch", {"scenarios": {"a": "b"}}),
+    ("/batch", {"scenarios": 5}),
+    ("/batch", {}),
+])
+def test_bad_requests_get_400(service, path, body):
+    port, _ = service
+    status, payload = _request(port, "POST", path, body)
+    assert status == 400 and payload["error"].startswith("Bad request")
+
+
+def test_unknown_post_keeps_connection_usable(service):
+    port, _ = service
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    try:
+        assert _request(port, "POST", "/nope", {"inputs": {"leads_per_sdr": 5}}, connection=conn)[0] == 404
+        status, payload = _request(port, "GET", "/health", connection=conn)
+        assert status == 200 and payload["status"] == "ok"
+    finally:
+        conn.close()
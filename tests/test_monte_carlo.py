@@ -0,0 +1,68 @@
+"""The streaming Monte Carlo: argument checks, reproducibility, sketch accuracy and memory, cash-out odds."""
+import numpy as np
+import pytest
+
+from financial_engine import DEFAULT_SCENARIO, run_financial_model_batch
+from monte_carlo import QuantileSketch, run_monte_carlo, sample_inputs
+
+DISTRIBUTIONS = {"platform_churn_pct": {"dist": "triangular", "low": 5, "mode": 10, "high": 20}}
+
+
+@pytest.mark.parametrize("n_draws, chunk_size", [(0, 100), (-5, 100), (100, 0), (100, -1)])
+def test_rejects_non_positive_sizes(n_draws, chunk_size):
+    with pytest.raises(ValueError, match="at least 1"):
+        run_monte_carlo(DEFAULT_SCENARIO, DISTRIBUTIONS, n_draws=n_draws, chunk_size=chunk_size)
+
+
+def test_same_seed_and_chunks_reproduce():
+    first = run_monte_carlo(DEFAULT_SCENARIO, DISTRIBUTIONS, n_draws=300, chunk_size=128, seed=7)
+    second = run_monte_carlo(DEFAULT_SCENARIO, DISTRIBUTIONS, n_draws=300, chunk_size=128, seed=7)
+    assert first["draws"] == 300
+    for metric, band in first["bands"].items():
+        assert band.equals(second["bands"][metric])
+    assert first["prob_cash_out"].equals(second["prob_cash_out"])
+
+
+def test_sketch_quantiles_are_within_rank_tolerance():
+    rng = np.random.default_rng(0)
+    data = rng.lognormal(size=(200_000, 3))
+    sketch = QuantileSketch(3, k=2048, seed=1)
+    for start in range(0, len(data), 10_000):
+        sketch.update(data[start:start + 10_000])
+    qs = (0.01, 0.1, 0.5, 0.9, 0.99)
+    estimates = sketch.quantiles(qs)
+    exact = np.quantile(data, qs, axis=0)
+    for i, q in enumerate(qs):
+        ranks = (data < estimates[i]).mean(axis=0)
+        assert np.all(np.abs(ranks - q) < 0.005), (q, ranks)
+    np.testing.assert_allclose(estimates[2], exact[2], rtol=0.02)
+
+
+def test_sketch_memory_stays_flat():
+    rng = np.random.default_rng(0)
+    k, width = 512, 4
+    sketch = QuantileSketch(width, k=k, seed=1)
+    sizes = {}
+    for rows in range(10_000, 1_000_001, 10_000):
+        sketch.update(rng.normal(size=(10_000, width)))
+        assert sketch.nbytes <= 3 * k * width * 8
+        sizes[rows] = sketch.nbytes
+    assert sketch.count == 1_000_000
+    assert sizes[1_000_000] <= 1.5 * sizes[100_000]
+
+
+def test_prob_cash_out_matches_the_draws():
+    distributions = {"starting_cash": {"dist": "discrete", "values": [10_000, 5_000_000]},
+                     "leads_per_sdr": {"dist": "triangular", "low": 5, "mode": 20, "high": 60, "min": 1}}
+    base = dict(DEFAULT_SCENARIO, seed_amount=0, series_a_amount=0)
+    result = run_monte_carlo(base, distributions, n_draws=500, chunk_size=200, seed=3)
+
+    rng, cash = np.random.default_rng(3), []
+    for start in range(0, 500, 200):
+        batch = run_financial_model_batch(sample_inputs(base, distributions, min(200, 500 - start), rng))
+        cash.append(batch["bs"]["Cash"])
+    cash = np.concatenate(cash)
+    expected = (np.minimum.accumulate(cash, axis=1) < 0).mean(axis=0)
+    np.testing.assert_array_equal(result["prob_cash_out"].to_numpy(), expected)
+    assert 0 < expected[-1] < 1
+    assert np.all(np.diff(result["prob_cash_out"].to_numpy()) >= 0)
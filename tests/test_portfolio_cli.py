@@ -0,0 +1,65 @@
+"""Headless portfolio runs against per-company run_financial_model."""
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from financial_engine import DEFAULT_SCENARIO, run_financial_model
+from narrative_engine import generate_narrative
+from portfolio_cli import CONSOLIDATED_STATEMENTS, main, run_portfolio
+
+START = "2026-01"
+
+
+@pytest.fixture
+def companies(tmp_path):
+    rng = np.random.default_rng(0)
+    rows = [dict(DEFAULT_SCENARIO, company=f"co{i}", leads_per_sdr=int(rng.integers(5, 60)), cs_per_ae=int(rng.integers(1, 5)),
+                 starting_cash=float(rng.uniform(10_000, 2_000_000))) for i in range(7)]
+    path = tmp_path / "companies.csv"
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return path, {row.pop("company"): row for row in rows}
+
+
+def test_csv_run_matches_single_runs(companies, tmp_path):
+    path, inputs = companies
+    progress = []
+    summary = run_portfolio(str(path), str(tmp_path / "out.csv"), fmt="csv", chunk_size=3, start_month=START,
+                            narratives_path=str(tmp_path / "narratives.jsonl"), consolidated_path=str(tmp_path / "rollup.csv"),
+                            progress=lambda companies, rows, elapsed: progress.append((companies, rows)))
+    results = {company: run_financial_model(row, START) for company, row in inputs.items()}
+    rows_per_company = sum(frame.size for _, frame in results["co0"].items())
+
+    assert summary["companies"] == 7 and summary["rows"] == 7 * rows_per_company
+    assert progress == [(3, 3 * rows_per_company), (6, 6 * rows_per_company), (7, 7 * rows_per_company)]
+
+    out = pd.read_csv(tmp_path / "out.csv")
+    assert len(out) == summary["rows"]
+    for company, result in results.items():
+        rows = out[out["company"] == company]
+        for statement, frame in result.items():
+            wide = rows[rows["statement"] == statement].pivot(index="month", columns="line_item", values="value")
+            wide = wide.loc[frame.index, frame.columns]
+            np.testing.assert_allclose(wide.to_numpy(), frame.to_numpy(), rtol=1e-12, atol=1e-9, err_msg=f"{company} {statement}")
+
+    for statement in CONSOLIDATED_STATEMENTS:
+        expected = sum(result[statement] for result in results.values())
+        pd.testing.assert_frame_equal(summary["consolidated"][statement], expected, check_names=False, check_freq=False)
+    rollup = pd.read_csv(tmp_path / "rollup.csv", header=[0, 1], index_col=0)
+    np.testing.assert_allclose(rollup["pnl"]["EBITDA"].to_numpy(), summary["consolidated"]["pnl"]["EBITDA"].to_numpy())
+
+    narratives = [json.loads(line) for line in open(tmp_path / "narratives.jsonl")]
+    assert [n["company"] for n in narratives] == list(results)
+    for narrative in narratives:
+        assert {key: narrative[key] for key in ("flywheel", "brutal_facts", "crossroads")} == generate_narrative(results[narrative["company"]])
+
+
+def test_cli_writes_arrow(companies, tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    path, inputs = companies
+    out = tmp_path / "out.arrow"
+    main([str(path), "--out", str(out), "--chunk-size", "4", "--start-month", START])
+    table = pa.ipc.open_file(str(out)).read_all()
+    assert table.column_names == ["company", "month", "statement", "line_item", "value"]
+    assert set(table.column("company").to_pylist()) == set(inputs)
@@ -0,0 +1,93 @@
+"""Re-forecast: incremental closes, changed inputs in a portfolio, and validation of actuals."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from financial_engine import DEFAULT_SCENARIO, run_financial_model
+from reforecast import read_actuals, reforecast, reforecast_portfolio
+
+START = "2026-01"
+INPUTS = dict(DEFAULT_SCENARIO, cs_per_ae=1)
+
+
+def _actuals(inputs=INPUTS, months=7, seed=0):
+    plan = run_financial_model(inputs, START)
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "month": [f"2026-{m:02d}" for m in range(1, months + 1)],
+        "revenue": plan["pnl"]["Revenue"].to_numpy()[:months] * rng.uniform(0.8, 1.1, months),
+        "cash": plan["bs"]["Cash"].to_numpy()[:months] * 0.9,
+        "accounts_receivable": plan["bs"]["Accounts Receivable"].to_numpy()[:months] * 1.1,
+        "accounts_payable": plan["bs"]["Accounts Payable"].to_numpy()[:months],
+        "headcount": rng.integers(3, 8, months),
+    })
+
+
+def test_no_actuals_is_the_plan():
+    forecast = reforecast(INPUTS, _actuals().iloc[:0], START)
+    np.testing.assert_array_equal(forecast["results"].values, run_financial_model(INPUTS, START).values)
+
+
+def test_one_month_at_a_time_equals_all_at_once():
+    actuals = _actuals()
+    full = reforecast(INPUTS, actuals, START)
+    forecast = None
+    for months in range(1, len(actuals) + 1):
+        forecast = reforecast(INPUTS, actuals.iloc[:months], START, previous=forecast)
+    np.testing.assert_array_equal(forecast["results"].values, full["results"].values)
+    assert forecast["checkpoint"] == full["checkpoint"]
+
+
+def test_statements_tie_out():
+    forecast = reforecast(INPUTS, _actuals(), START)
+    bs, cfs = forecast["results"]["bs"], forecast["results"]["cfs"]
+    np.testing.assert_allclose(bs["Total Assets"], bs["Total Liabilities & Equity"], atol=1)
+    np.testing.assert_allclose(bs["Cash"].diff()[1:], cfs["Net Change in Cash"][1:], atol=1)
+
+
+def test_portfolio_recloses_when_inputs_change():
+    actuals = _actuals().assign(company="acme")
+    companies = pd.DataFrame([dict(INPUTS, company="acme")])
+    first = reforecast_portfolio(companies, actuals.iloc[:4], START)
+    assert first["errors"] == {}
+
+    changed = companies.assign(cs_per_ae=2)
+    second = reforecast_portfolio(changed, actuals.iloc[4:], state=first["state"])
+    assert second["errors"] == {}
+    expected = reforecast(dict(INPUTS, cs_per_ae=2), actuals, START)
+    np.testing.assert_array_equal(second["state"]["acme"]["results"].values, expected["results"].values)
+    assert second["state"]["acme"]["checkpoint"]["closed_months"] == len(actuals)
+
+
+def test_portfolio_skips_company_with_bad_actuals():
+    good, bad = _actuals().assign(company="good"), _actuals(seed=1).assign(company="bad")
+    bad.loc[2, "revenue"] = np.nan
+    companies = pd.DataFrame([dict(INPUTS, company="good"), dict(INPUTS, company="bad")])
+    portfolio = reforecast_portfolio(companies, pd.concat([good, bad], ignore_index=True), START)
+    assert list(portfolio["state"]) == ["good"]
+    assert portfolio["errors"] == {"bad": "Actuals are missing revenue for 2026-03"}
+
+
+@pytest.mark.parametrize("column", ["revenue", "cash", "accounts_receivable", "accounts_payable"])
+def test_blank_actuals_are_rejected(column):
+    actuals = _actuals()
+    actuals.loc[4, column] = np.nan
+    with pytest.raises(ValueError, match=f"missing {column} for 2026-05"):
+        read_actuals(actuals, START)
+
+
+def test_non_numeric_actuals_are_rejected():
+    actuals = _actuals().astype({"cash": object, "headcount": object})
+    actuals.loc[3, "cash"] = "n/a"
+    with pytest.raises(ValueError, match="'cash' must be numeric: 'n/a' in 2026-04"):
+        read_actuals(actuals, START)
+    actuals.loc[3, "cash"] = 1000.0
+    actuals.loc[1, "headcount"] = "five"
+    with pytest.raises(ValueError, match="'headcount' must be numeric"):
+        read_actuals(actuals, START)
+
+
+def test_blank_headcount_is_allowed():
+    actuals = _actuals()
+    actuals.loc[0, "headcount"] = np.nan
+    assert read_actuals(actuals, START)["headcount"].isna().sum() == 1
@@ -0,0 +1,103 @@
+"""Scenario keys, the memory LRU's byte budget and the shared disk tier."""
+import os
+
+import numpy as np
+import pytest
+
+import financial_engine
+import scenario_cache
+from financial_engine import DEFAULT_SCENARIO, run_financial_model
+from scenario_cache import ScenarioCache, results_nbytes, scenario_key
+
+
+def test_key_canonicalises_inputs():
+    base = dict(DEFAULT_SCENARIO, starting_cash=50000)
+    assert scenario_key(base, "2026-01") == scenario_key(dict(base, starting_cash=50000.0), "2026-01")
+    assert scenario_key(base, "2026-01") == scenario_key(dict(base, starting_cash=np.float64(50000)), "2026-01")
+    assert scenario_key(base, "2026-01") == scenario_key(dict(base, scenario_name="Base", notes=[1, 2]), "2026-01")
+    assert scenario_key({}, "2026-01") == scenario_key(dict(financial_engine.INPUT_DEFAULTS), "2026-01")
+    assert scenario_key(base, "2026-01") != scenario_key(dict(base, starting_cash=50000.5), "2026-01")
+
+
+def test_key_includes_start_month_and_model_version(monkeypatch):
+    key = scenario_key(DEFAULT_SCENARIO, "2026-01")
+    assert key != scenario_key(DEFAULT_SCENARIO, "2026-02")
+    monkeypatch.setattr(scenario_cache, "MODEL_VERSION", "0.0-test")
+    assert key != scenario_key(DEFAULT_SCENARIO, "2026-01")
+
+
+def _results(n):
+    return [run_financial_model(dict(DEFAULT_SCENARIO, leads_per_sdr=10 + i), "2026-01") for i in range(n)]
+
+
+def test_memory_lru_evicts_by_bytes():
+    first, second, third = _results(3)
+    size = results_nbytes(first)
+    cache = ScenarioCache(max_bytes=int(2.5 * size), disk_dir=None)
+    cache.put("a", first)
+    cache.put("b", second)
+    assert cache.get("a") is first # a is now the most recently used
+    cache.put("c", third)
+    assert cache.get("b") is None
+    assert cache.get("a") is first and cache.get("c") is third
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["entries"]) == (3, 1, 1, 2)
+    assert stats["bytes"] == 2 * size <= stats["max_bytes"]
+    assert stats["hit_rate"] == pytest.approx(0.75)
+
+
+def test_oversized_result_is_not_kept_in_memory():
+    cache = ScenarioCache(max_bytes=10, disk_dir=None)
+    cache.put("a", _results(1)[0])
+    assert cache.stats()["entries"] == 0
+
+
+def test_run_computes_once():
+    calls = []
+
+    def compute(inputs, start_month=None):
+        calls.append(start_month)
+        return run_financial_model(inputs, start_month)
+
+    cache = ScenarioCache(disk_dir=None)
+    first = cache.run(dict(DEFAULT_SCENARIO, starting_cash=50000), "2026-01", compute=compute)
+    again = cache.run(dict(DEFAULT_SCENARIO, starting_cash=50000.0, label="x"), "2026-01", compute=compute)
+    assert first is again and calls == ["2026-01"]
+
+
+def test_disk_tier_round_trip(tmp_path):
+    pytest.importorskip("pyarrow")
+    results = _results(1)[0]
+    key = scenario_key(DEFAULT_SCENARIO, "2026-01")
+    ScenarioCache(disk_dir=str(tmp_path)).put(key, results)
+    assert os.listdir(tmp_path) == [f"{key}.arrow"]
+
+    other_process = ScenarioCache(disk_dir=str(tmp_path))
+    loaded = other_process.get(key)
+    assert other_process.stats()["disk_hits"] == 1
+    np.testing.assert_array_equal(loaded.values, results.values)
+    assert list(loaded.index) == list(results.index) and loaded.layout == results.layout
+    assert other_process.get(key) is loaded # promoted to the memory tier
+    assert other_process.stats()["hits"] == 1
+
+
+def test_disk_tier_prunes_oldest_and_lists_rarely(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    results = _results(1)[0]
+    probe = ScenarioCache(disk_dir=str(tmp_path / "probe"))
+    probe.put("probe", results)
+    size = os.path.getsize(tmp_path / "probe" / "probe.arrow")
+
+    listings = []
+    real_listdir = os.listdir
+    monkeypatch.setattr(scenario_cache.os, "listdir", lambda path: listings.append(path) or real_listdir(path))
+    cache = ScenarioCache(disk_dir=str(tmp_path / "tier"), disk_max_bytes=int(10.5 * size))
+    for i in range(30):
+        cache.put(f"k{i:02d}", results)
+        os.utime(tmp_path / "tier" / f"k{i:02d}.arrow", (i, i)) # deterministic LRU order
+        assert sum(os.path.getsize(tmp_path / "tier" / name) for name in real_listdir(tmp_path / "tier")) <= 10.5 * size
+    # one listing on the first put, then one per prune (down to 90% of the budget: every ~2 puts)
+    assert len(listings) <= 1 + 30 // 2
+    remaining = sorted(real_listdir(tmp_path / "tier"))
+    assert remaining[-1] == "k29.arrow" and "k00.arrow" not in remaining
+    assert cache.stats()["disk_evictions"] == 30 - len(remaining)
@@ -0,0 +1,48 @@
+"""ScenarioResult views are read-only and independent of each other."""
+import io
+import pickle
+
+import numpy as np
+import pytest
+
+from financial_engine import DEFAULT_SCENARIO, run_financial_model
+from scenario_result import ScenarioResult
+
+
+@pytest.fixture
+def results():
+    return run_financial_model(DEFAULT_SCENARIO)
+
+
+@pytest.mark.parametrize("edit", [
+    lambda frame: frame.iloc.__setitem__((0, 0), 1.0),
+    lambda frame: frame.loc.__setitem__((frame.index[0], "Revenue"), 1.0),
+    lambda frame: frame.to_numpy().__setitem__((0, 0), 1.0),
+])
+def test_values_cannot_be_written(results, edit):
+    before = results.values.copy()
+    try:
+        edit(results["pnl"])
+    except ValueError:
+        pass # read-only block
+    np.testing.assert_array_equal(results.values, before)
+    np.testing.assert_array_equal(results["pnl"].to_numpy(), results.statement_values("pnl"))
+
+
+def test_structural_edits_do_not_leak(results):
+    columns = list(results["pnl"].columns)
+    frame = results["pnl"]
+    frame["Extra"] = 1.0
+    frame.rename(columns={"Revenue": "Sales"}, inplace=True)
+    frame.drop(columns="COGS", inplace=True)
+    assert list(results["pnl"].columns) == columns
+
+
+def test_pickle_and_arrow_round_trip(results):
+    pytest.importorskip("pyarrow")
+    sink = io.BytesIO()
+    results.to_arrow_ipc(sink)
+    for copy in (pickle.loads(pickle.dumps(results)), ScenarioResult.from_arrow_ipc(io.BytesIO(sink.getvalue()))):
+        assert list(copy) == list(results)
+        for statement in results:
+            assert copy[statement].equals(results[statement])
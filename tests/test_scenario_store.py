@@ -0,0 +1,126 @@
+"""Scenario store: metric filters and sorts, batch vs single saves, and opening stored or recomputed series."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import scenario_store
+from financial_engine import DEFAULT_SCENARIO, run_financial_model, run_financial_model_batch, summarize_batch
+from scenario_store import METRIC_COLUMNS, ScenarioStore
+
+# Some of these never cash out and some never break even, so both columns hold NULLs
+SCENARIOS = [DEFAULT_SCENARIO] + [
+    dict(DEFAULT_SCENARIO, leads_per_sdr=leads, ga_overhead_pct=overhead, seed_amount=0, series_a_amount=0, starting_cash=10_000)
+    for leads in (1, 5, 40) for overhead in (15, 60, 150)
+]
+START = "2026-01"
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ScenarioStore(str(tmp_path / "scenarios.db"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def recomputes(monkeypatch):
+    calls = []
+
+    def counting(inputs, start_month=None):
+        calls.append(inputs)
+        return run_financial_model(inputs, start_month=start_month)
+
+    monkeypatch.setattr(scenario_store, "run_financial_model", counting)
+    return calls
+
+
+def test_query_filters_match_metrics(store):
+    ids = store.save_batch(SCENARIOS, names=[f"s{i}" for i in range(len(SCENARIOS))], start_month=START, with_series=False)
+    listing = store.query(limit=0)
+    assert sorted(listing.index) == sorted(ids)
+
+    filters = [("ending_cash", ">", 0), ("y5_ebitda", "<=", 3_000_000)]
+    expected = listing[(listing["ending_cash"] > 0) & (listing["y5_ebitda"] <= 3_000_000)]
+    assert 0 < len(expected) < len(listing)
+    assert set(store.query(filters, limit=0).index) == set(expected.index)
+
+    # NULL (never breaks even) fails every comparison, including !=
+    breakeven = pd.to_numeric(listing["breakeven_month"])
+    assert set(store.query([("breakeven_month", "!=", 1)], limit=0).index) == set(breakeven[breakeven.notna() & (breakeven != 1)].index)
+
+    assert list(store.query(name_like="s1", limit=0).index) == [ids[1]]
+    assert len(store.query(limit=3)) == 3
+    with pytest.raises(ValueError):
+        store.query([("inputs", ">", 0)])
+    with pytest.raises(ValueError):
+        store.query([("ending_cash", "LIKE", 0)])
+    with pytest.raises(ValueError):
+        store.query(order_by="inputs")
+
+
+@pytest.mark.parametrize("descending", [True, False])
+def test_query_sorts_nulls_last(store, descending):
+    store.save_batch(SCENARIOS, start_month=START, with_series=False)
+    for column in ("cash_out_month", "breakeven_month"):
+        values = pd.to_numeric(store.query(order_by=column, descending=descending, limit=0)[column])
+        present = values.notna().to_numpy()
+        assert present.any() and not present.all()
+        assert not present[present.argmin():].any() # every NULL comes after every value
+        ordered = values[present].to_numpy()
+        assert (np.diff(ordered) <= 0).all() if descending else (np.diff(ordered) >= 0).all()
+
+
+def test_save_batch_matches_save(store):
+    names = [f"s{i}" for i in range(len(SCENARIOS))]
+    batch_ids = store.save_batch(SCENARIOS, names=names, start_month=START, chunk_size=4)
+    single_ids = [store.save(name, inputs, start_month=START) for name, inputs in zip(names, SCENARIOS)]
+    listing = store.query(order_by="id", descending=False, limit=0)
+    batch_metrics = listing.loc[batch_ids, list(METRIC_COLUMNS)].to_numpy(dtype=float)
+    single_metrics = listing.loc[single_ids, list(METRIC_COLUMNS)].to_numpy(dtype=float)
+    np.testing.assert_allclose(batch_metrics, single_metrics, equal_nan=True)
+    assert list(listing.loc[batch_ids, "name"]) == list(listing.loc[single_ids, "name"]) == names
+
+    summary = summarize_batch(run_financial_model_batch(pd.DataFrame(SCENARIOS), start_month=START))
+    for column in ("ending_cash", "cash_out_month", "breakeven_month", "y5_ebitda"):
+        np.testing.assert_allclose(listing.loc[batch_ids, column].to_numpy(dtype=float), summary[column].to_numpy(dtype=float), equal_nan=True)
+
+
+def _assert_same_results(results, expected):
+    assert list(results) == list(expected)
+    for statement in expected:
+        pd.testing.assert_frame_equal(results[statement], expected[statement])
+
+
+def test_open_reads_the_stored_series(store, recomputes):
+    scenario_id = store.save_batch(SCENARIOS[:3], names=["a", "b", "c"], start_month=START)[1]
+    opened = store.open(scenario_id)
+    assert recomputes == []
+    assert opened["name"] == "b" and opened["start_month"] == START
+    assert opened["inputs"] == {key: float(value) for key, value in SCENARIOS[1].items()}
+    _assert_same_results(opened["results"], run_financial_model(SCENARIOS[1], start_month=START))
+
+
+def test_open_recomputes_without_series(store, recomputes):
+    scenario_id = store.save_batch(SCENARIOS[:3], start_month=START, with_series=False)[2]
+    opened = store.open(scenario_id)
+    assert len(recomputes) == 1
+    _assert_same_results(opened["results"], run_financial_model(SCENARIOS[2], start_month=START))
+
+
+def test_open_recomputes_stale_model_version(store, recomputes):
+    scenario_id = store.save("stale", SCENARIOS[4], start_month=START)
+    with store._conn:
+        store._conn.execute("UPDATE scenarios SET model_version = '0.0' WHERE id = ?", (scenario_id,))
+    recomputes.clear() # save() ran the model itself
+    opened = store.open(scenario_id)
+    assert len(recomputes) == 1
+    _assert_same_results(opened["results"], run_financial_model(SCENARIOS[4], start_month=START))
+
+
+def test_open_and_delete(store):
+    first, second = store.save_batch(SCENARIOS[:2], start_month=START)
+    store.delete([first])
+    assert store.count() == 1
+    with pytest.raises(KeyError):
+        store.open(first)
+    assert store.open(second)["id"] == second
@@ -0,0 +1,66 @@
+"""Goal-seek and optimisation results checked against direct model runs."""
+import itertools
+
+import pytest
+
+from financial_engine import DEFAULT_SCENARIO, run_financial_model
+from solver import goal_seek, optimize
+
+
+def _min_cash(inputs):
+    return run_financial_model(inputs)["bs"]["Cash"].min()
+
+
+def _breakeven_month(inputs):
+    profitable = (run_financial_model(inputs)["pnl"]["EBITDA"] > 0).to_numpy()
+    return profitable.argmax() + 1 if profitable.any() else float("inf")
+
+
+def test_goal_seek_finds_smallest_seed_that_keeps_cash_positive():
+    result = goal_seek(DEFAULT_SCENARIO, "seed_amount", 0, 5_000_000, constraint=("min_cash", ">=", 0), tol=1.0)
+    assert result["feasible"] and result["converged"]
+    seed = result["solution"]["seed_amount"]
+    assert _min_cash(dict(DEFAULT_SCENARIO, seed_amount=seed)) >= 0
+    assert _min_cash(dict(DEFAULT_SCENARIO, seed_amount=seed - 1.0)) < 0
+    assert result["value"] == pytest.approx(_min_cash(dict(DEFAULT_SCENARIO, seed_amount=seed)))
+
+
+def test_goal_seek_month_input_and_max():
+    result = goal_seek(DEFAULT_SCENARIO, "series_a_month", 1, 60, constraint=("min_cash", ">=", 0), find="max")
+    month = result["solution"]["series_a_month"]
+    assert month == int(month) and result["converged"]
+    assert _min_cash(dict(DEFAULT_SCENARIO, series_a_month=month)) >= 0
+    if month < 60:
+        assert _min_cash(dict(DEFAULT_SCENARIO, series_a_month=month + 1)) < 0
+
+
+def test_goal_seek_infeasible():
+    result = goal_seek(DEFAULT_SCENARIO, "seed_amount", 0, 1_000, constraint=("min_cash", ">=", 1e12))
+    assert not result["feasible"] and result["solution"] is None and result["iterations"] == 1
+
+
+def test_optimize_discrete_space_equals_brute_force():
+    space = {"series_a_month": range(1, 61, 4), "cs_per_ae": [1, 2, 3, 4]}
+    result = optimize(DEFAULT_SCENARIO, space, objective="min_cash", maximize=True, constraint=("breakeven_month", "<=", 30))
+    best = None
+    for month, cs in itertools.product(*space.values()):
+        inputs = dict(DEFAULT_SCENARIO, series_a_month=month, cs_per_ae=cs)
+        if _breakeven_month(inputs) <= 30:
+            value = _min_cash(inputs)
+            if best is None or value > best[0]:
+                best = (value, {"series_a_month": float(month), "cs_per_ae": float(cs)})
+    assert result["converged"] and result["evaluations"] == 15 * 4
+    assert result["value"] == pytest.approx(best[0])
+    assert _min_cash(dict(DEFAULT_SCENARIO, **result["solution"])) == pytest.approx(best[0])
+
+
+def test_budgets_stop_the_search():
+    kwargs = dict(constraint=("min_cash", ">=", 0), tol=1e-9)
+    assert goal_seek(DEFAULT_SCENARIO, "seed_amount", 0, 5_000_000, max_iter=2, **kwargs)["iterations"] == 2
+    timed = goal_seek(DEFAULT_SCENARIO, "seed_amount", 0, 5_000_000, max_seconds=0, **kwargs)
+    assert timed["iterations"] == 1 and not timed["converged"] and timed["feasible"]
+
+    space = {"seed_amount": (0.0, 5_000_000.0), "cs_per_ae": (1.0, 5.0)}
+    assert optimize(DEFAULT_SCENARIO, space, "min_cash", points_per_dim=5, tol=1e-12, max_iter=3)["iterations"] == 3
+    timed = optimize(DEFAULT_SCENARIO, space, "min_cash", points_per_dim=5, tol=1e-12, max_seconds=0)
+    assert timed["iterations"] == 1 and not timed["converged"]
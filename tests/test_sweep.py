@@ -0,0 +1,81 @@
+"""Sharded sweeps: resuming recomputes only missing shards, and the sensitivity tables match direct runs."""
+import os
+
+import numpy as np
+import pytest
+
+from financial_engine import DEFAULT_SCENARIO, run_financial_model
+from sweep import _shard_path, grid_size, heatmap_table, load_sweep, run_sweep, tornado_table
+
+GRID = {
+    "leads_per_sdr": [10, 20, 40],
+    "cs_per_ae": [1, 2, 3, 4],
+    "platform_churn_pct": [5, 15],
+}
+SHARD_SIZE = 5
+
+
+def _metric(inputs, metric):
+    results = run_financial_model(inputs)
+    if metric == "ending_cash":
+        return results["bs"]["Cash"].iloc[-1]
+    return results["pnl"]["EBITDA"].iloc[48:60].sum() # y5_ebitda
+
+
+@pytest.fixture
+def sweep_dir(tmp_path):
+    out = str(tmp_path / "sweep")
+    assert run_sweep(DEFAULT_SCENARIO, GRID, out, shard_size=SHARD_SIZE, workers=1) == 5
+    return out
+
+
+def test_all_points_are_written(sweep_dir):
+    results = load_sweep(sweep_dir)
+    assert len(results) == grid_size(GRID) == 24
+    assert list(results.index) == list(range(24))
+
+
+def test_resume_recomputes_only_missing_shard(sweep_dir):
+    before = load_sweep(sweep_dir)
+    stamps = {s: os.stat(_shard_path(sweep_dir, s)).st_mtime_ns for s in range(5)}
+    os.remove(_shard_path(sweep_dir, 2))
+    progress = []
+    assert run_sweep(DEFAULT_SCENARIO, GRID, sweep_dir, shard_size=SHARD_SIZE, workers=1,
+                     progress=lambda done, total, elapsed: progress.append((done, total))) == 1
+    assert progress == [(24, 24)]
+    for s in (0, 1, 3, 4):
+        assert os.stat(_shard_path(sweep_dir, s)).st_mtime_ns == stamps[s]
+    assert os.path.exists(_shard_path(sweep_dir, 2))
+    assert load_sweep(sweep_dir).equals(before)
+    assert run_sweep(DEFAULT_SCENARIO, GRID, sweep_dir, shard_size=SHARD_SIZE, workers=1) == 0
+
+
+def test_different_sweep_in_same_directory_raises(sweep_dir):
+    with pytest.raises(ValueError, match="different sweep"):
+        run_sweep(DEFAULT_SCENARIO, dict(GRID, cs_per_ae=[1, 2]), sweep_dir, shard_size=SHARD_SIZE, workers=1)
+    with pytest.raises(ValueError, match="different sweep"):
+        run_sweep(DEFAULT_SCENARIO, GRID, sweep_dir, shard_size=SHARD_SIZE + 1, workers=1)
+
+
+def test_tornado_matches_direct_runs(sweep_dir):
+    base = dict(DEFAULT_SCENARIO, leads_per_sdr=22, cs_per_ae=2, platform_churn_pct=6)
+    table = tornado_table(load_sweep(sweep_dir), GRID, base, "ending_cash").set_index("input")
+    anchors = {"leads_per_sdr": 20, "cs_per_ae": 2, "platform_churn_pct": 5}
+    for key, values in GRID.items():
+        row = table.loc[key]
+        low = _metric({**DEFAULT_SCENARIO, **anchors, key: values[0]}, "ending_cash")
+        high = _metric({**DEFAULT_SCENARIO, **anchors, key: values[-1]}, "ending_cash")
+        assert row["metric_at_low"] == pytest.approx(low)
+        assert row["metric_at_high"] == pytest.approx(high)
+        assert row["metric_at_base"] == pytest.approx(_metric(dict(DEFAULT_SCENARIO, **anchors), "ending_cash"))
+        assert row["swing"] == pytest.approx(abs(high - low))
+    assert list(table["swing"]) == sorted(table["swing"], reverse=True)
+
+
+def test_heatmap_matches_direct_runs(sweep_dir):
+    table = heatmap_table(load_sweep(sweep_dir), "cs_per_ae", "leads_per_sdr", "y5_ebitda", fixed={"platform_churn_pct": 15})
+    assert table.shape == (3, 4)
+    for leads in GRID["leads_per_sdr"]:
+        for cs in GRID["cs_per_ae"]:
+            expected = _metric(dict(DEFAULT_SCENARIO, leads_per_sdr=leads, cs_per_ae=cs, platform_churn_pct=15), "y5_ebitda")
+            assert table.loc[leads, cs] == pytest.approx(expected)
@@ -1,42 +1,21 @@
+import numpy as np
 import streamlit as st
 import streamlit.components.v1 as components # <-- NEW, MORE POWERFUL IMPORT
 
-def render_bowtie(funnel_data, pnl_data, inputs):
-    """
-    Renders the upgraded, interactive Strategic Bowtie Funnel.
-    Visualizes the full customer journey from acquisition to expansion.
-    """
-    if funnel_data is None or funnel_data.empty or pnl_data is None or pnl_data.empty:
-        st.info("The Bowtie Funnel will be visualized here once the model is run.")
-        return
+BOWTIE_TIMEFRAMES = ["Year 1", "Year 2", "Full Forecast"]
 
-    # (All the data calculation logic from before remains exactly the same)
-    timeframe = st.selectbox(
-        "Select Funnel Timeframe:",
-        ["Year 1", "Year 2", "Full Forecast"],
-        key="bowtie_timeframe",
-        label_visibility="collapsed"
-    )
 
-    if timeframe == "Year 1": start_idx, end_idx = 0, 12
-    elif timeframe == "Year 2": start_idx, end_idx = 12, 24
-    else: start_idx, end_idx = 0, len(funnel_data)
-    
-    period_funnel = funnel_data.iloc[start_idx:end_idx].sum()
-    leads = period_funnel.get("Leads Generated", 0)
-    market_fit = period_funnel.get("Market Fit Deals", 0)
-    ready = period_funnel.get("Ready Deals", 0)
-    rev_market_fit = market_fit * inputs.get('price_market_fit', 0)
-    rev_ready = ready * inputs.get('price_ready', 0)
-    platform_mrr_series = pnl_data['Revenue']
-    churn_rate_monthly = inputs.get('platform_churn_pct', 0) / 100 / 12
-    expansion_rate_monthly = inputs.get('platform_expansion_pct', 0) / 100 / 12
-    churned_mrr = (platform_mrr_series.shift(1) * churn_rate_monthly).iloc[start_idx:end_idx].sum()
-    expansion_mrr = (platform_mrr_series.shift(1) * expansion_rate_monthly).iloc[start_idx:end_idx].sum()
-    lead_to_mf_pct = inputs.get('lead_to_marketfit_pct', 0)
+def bowtie_window(timeframe, months):
+    """(start_idx, end_idx) month slice for a bowtie timeframe."""
+    if timeframe == "Year 1": return 0, 12
+    if timeframe == "Year 2": return 12, 24
+    return 0, months
+
 
+def bowtie_html(leads, market_fit, ready, rev_market_fit, rev_ready, expansion_mrr, churned_mrr, lead_to_mf_pct):
+    """The bowtie's self-contained HTML document; pure, so it can be built once per result and reused."""
     # --- Custom HTML & CSS for the Upgraded Bowtie ---
-    bowtie_html = f"""
+    return f"""
     <html>
     <head>
     <style>
@@ -100,7 +79,57 @@ def render_bowtie(funnel_data, pnl_data, inputs):
     </body>
     </html>
     """
-    
+
+
+def bowtie_html_by_timeframe(funnel_data, pnl_data, inputs):
+    """
+    {timeframe: bowtie HTML} for every option in BOWTIE_TIMEFRAMES. Window totals come from prefix
+    sums, so each timeframe is a pair of lookups rather than a re-slice of the monthly frames.
+    """
+    def prefix(values):
+        return np.concatenate([[0.0], np.nancumsum(np.asarray(values, dtype=float))])
+
+    funnel_sums = {col: prefix(funnel_data[col]) for col in ("Leads Generated", "Market Fit Deals", "Ready Deals") if col in funnel_data.columns}
+    revenue_sums = prefix(pnl_data['Revenue'])
+    churn_rate_monthly = inputs.get('platform_churn_pct', 0) / 100 / 12
+    expansion_rate_monthly = inputs.get('platform_expansion_pct', 0) / 100 / 12
+
+    months = min(len(funnel_data), len(pnl_data))
+    pages = {}
+    for timeframe in BOWTIE_TIMEFRAMES:
+        start_idx, end_idx = (min(idx, months) for idx in bowtie_window(timeframe, months))
+        period = {col: sums[end_idx] - sums[start_idx] for col, sums in funnel_sums.items()}
+        market_fit, ready = period.get("Market Fit Deals", 0), period.get("Ready Deals", 0)
+        # Churn and expansion act on the prior month's revenue: the window's revenue shifted back one month
+        lagged_revenue = revenue_sums[max(end_idx - 1, 0)] - revenue_sums[max(start_idx - 1, 0)]
+        pages[timeframe] = bowtie_html(
+            period.get("Leads Generated", 0), market_fit, ready,
+            market_fit * inputs.get('price_market_fit', 0), ready * inputs.get('price_ready', 0),
+            lagged_revenue * expansion_rate_monthly, lagged_revenue * churn_rate_monthly,
+            inputs.get('lead_to_marketfit_pct', 0),
+        )
+    return pages
+
+
+def render_bowtie(funnel_data, pnl_data, inputs, html_by_timeframe=None):
+    """
+    Renders the upgraded, interactive Strategic Bowtie Funnel.
+    Visualizes the full customer journey from acquisition to expansion.
+    Pass html_by_timeframe (from bowtie_html_by_timeframe) to reuse pages built once per result.
+    """
+    if funnel_data is None or funnel_data.empty or pnl_data is None or pnl_data.empty:
+        st.info("The Bowtie Funnel will be visualized here once the model is run.")
+        return
+
+    timeframe = st.selectbox(
+        "Select Funnel Timeframe:",
+        BOWTIE_TIMEFRAMES,
+        key="bowtie_timeframe",
+        label_visibility="collapsed"
+    )
+    if html_by_timeframe is None:
+        html_by_timeframe = bowtie_html_by_timeframe(funnel_data, pnl_data, inputs)
+
     # --- THIS IS THE CRITICAL CHANGE ---
     # We are using components.html to force rendering in a dedicated iframe.
-    components.html(bowtie_html, height=250)
+    components.html(html_by_timeframe[timeframe], height=250)
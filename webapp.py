@@ -1,20 +1,35 @@
 import streamlit as st
 import pandas as pd
-import io
+from functools import partial
 
 # Import our other modules
-from financial_engine import run_financial_model
+from financial_engine import DEFAULT_SCENARIO, enable_stage_profiling, reset_stage_profile, resolve_start_month, stage_profile, stage_profiling_enabled
+from scenario_cache import default_cache, scenario_key
+from scenario_store import METRIC_COLUMNS, ScenarioStore
+from excel_export import cached_workbook_bytes
+from incremental_engine import IncrementalModel
 from ui_components import render_bowtie
-from narrative_engine import generate_narrative
-from ai_analyst import query_analyst
+from dashboard_view import build_dashboard_view, projection_metrics
+from monte_carlo import run_monte_carlo
 
 # --- Page & State Config ---
 st.set_page_config(layout="wide", page_title="ExitPath | Pro Forma Builder")
 
 # --- State Management Initialization ---
 if 'inputs' not in st.session_state: st.session_state['inputs'] = {}
-if 'run_scenario' not in st.session_state: st.session_state['run_scenario'] = False
 if 'results' not in st.session_state: st.session_state['results'] = None
+if 'start_month' not in st.session_state: st.session_state['start_month'] = resolve_start_month()
+if 'model' not in st.session_state: st.session_state['model'] = IncrementalModel()
+
+@st.cache_resource(show_spinner=False)
+def default_dashboard(start_month):
+    """The default scenario's results and view model, computed once per server process and shared by every session."""
+    results = default_cache().run(DEFAULT_SCENARIO, start_month=start_month)
+    return scenario_key(DEFAULT_SCENARIO, start_month), results, build_dashboard_view(results, DEFAULT_SCENARIO)
+
+@st.cache_resource
+def scenario_store():
+    return ScenarioStore()
 
 # --- Custom CSS ---
 st.markdown("""<style> .stButton>button { width: 100%; } .sidebar-divider { margin-top: 1rem; margin-bottom: 1rem; border-top: 1px solid #337CA0; } .dashboard-container { padding: 1.5rem; background-color: #161B22; border: 1px solid #337CA0; border-radius: 0.5rem; height: 100%; } </style>""", unsafe_allow_html=True)
@@ -34,128 +49,233 @@ st.sidebar.title("Control Panel")
 
 st.sidebar.header("Model Inputs")
 with st.sidebar.expander("📈 Go-To-Market & Funnel", expanded=True):
-    st.session_state['inputs']['sdr_per_ae'] = st.slider("SDRs per AE", 1, 5, 2, help="The number of SDRs supporting each AE.")
-    st.session_state['inputs']['leads_per_sdr'] = st.slider("Leads Generated per SDR per Month", 0, 100, 40, help="Number of qualified leads a fully-ramped SDR generates each month.")
-    st.session_state['inputs']['lead_to_marketfit_pct'] = st.slider("Lead to MarketFit (%)", 0, 100, 50)
-    st.session_state['inputs']['marketfit_to_companyfit_pct'] = st.slider("MarketFit to CompanyFit (%)", 0, 100, 30)
-    st.session_state['inputs']['companyfit_to_ready_pct'] = st.slider("CompanyFit to Ready (%)", 0, 100, 20)
-    st.session_state['inputs']['ready_to_go_pct'] = st.slider("Ready to Go (%)", 0, 100, 10)
+    st.session_state['inputs']['sdr_per_ae'] = st.slider("SDRs per AE", 1, 5, DEFAULT_SCENARIO['sdr_per_ae'], help="The number of SDRs supporting each AE.")
+    st.session_state['inputs']['leads_per_sdr'] = st.slider("Leads Generated per SDR per Month", 0, 100, DEFAULT_SCENARIO['leads_per_sdr'], help="Number of qualified leads a fully-ramped SDR generates each month.")
+    st.session_state['inputs']['lead_to_marketfit_pct'] = st.slider("Lead to MarketFit (%)", 0, 100, DEFAULT_SCENARIO['lead_to_marketfit_pct'])
+    st.session_state['inputs']['marketfit_to_companyfit_pct'] = st.slider("MarketFit to CompanyFit (%)", 0, 100, DEFAULT_SCENARIO['marketfit_to_companyfit_pct'])
+    st.session_state['inputs']['companyfit_to_ready_pct'] = st.slider("CompanyFit to Ready (%)", 0, 100, DEFAULT_SCENARIO['companyfit_to_ready_pct'])
+    st.session_state['inputs']['ready_to_go_pct'] = st.slider("Ready to Go (%)", 0, 100, DEFAULT_SCENARIO['ready_to_go_pct'])
 
 with st.sidebar.expander("🤖 Product, Pricing & AI", expanded=True):
-    st.session_state['inputs']['price_market_fit'] = st.number_input("Price Market Fit ($)", value=500)
-    st.session_state['inputs']['price_company_fit'] = st.number_input("Price Company Fit ($)", value=15000)
-    st.session_state['inputs']['price_ready'] = st.number_input("Price Ready ($)", value=50000)
-    st.session_state['inputs']['fee_pct_go'] = st.number_input("Fee Pct Go (%)", value=1.5)
-    st.session_state['inputs']['avg_deal_size_go'] = st.number_input("Avg Deal Size Go ($)", value=75000000)
-    st.session_state['inputs']['analyst_hours_start'] = st.slider("Analyst Hours per Report (Start)", 5, 40, 20, help="Initial manual human hours required.")
-    st.session_state['inputs']['analyst_efficiency_gain_pct'] = st.slider("Quarterly Efficiency Gain (%)", 0, 25, 10, help="AI-driven reduction in analyst hours.")
-    st.session_state['inputs']['additional_hours_go'] = st.slider("Additional Hours for Go Product", 0, 20, 10)
-    st.session_state['inputs']['analyst_hourly_cost'] = st.number_input("Analyst Hourly Cost ($)", value=75)
+    st.session_state['inputs']['price_market_fit'] = st.number_input("Price Market Fit ($)", value=DEFAULT_SCENARIO['price_market_fit'])
+    st.session_state['inputs']['price_company_fit'] = st.number_input("Price Company Fit ($)", value=DEFAULT_SCENARIO['price_company_fit'])
+    st.session_state['inputs']['price_ready'] = st.number_input("Price Ready ($)", value=DEFAULT_SCENARIO['price_ready'])
+    st.session_state['inputs']['fee_pct_go'] = st.number_input("Fee Pct Go (%)", value=DEFAULT_SCENARIO['fee_pct_go'])
+    st.session_state['inputs']['avg_deal_size_go'] = st.number_input("Avg Deal Size Go ($)", value=DEFAULT_SCENARIO['avg_deal_size_go'])
+    st.session_state['inputs']['analyst_hours_start'] = st.slider("Analyst Hours per Report (Start)", 5, 40, DEFAULT_SCENARIO['analyst_hours_start'], help="Initial manual human hours required.")
+    st.session_state['inputs']['analyst_efficiency_gain_pct'] = st.slider("Quarterly Efficiency Gain (%)", 0, 25, DEFAULT_SCENARIO['analyst_efficiency_gain_pct'], help="AI-driven reduction in analyst hours.")
+    st.session_state['inputs']['additional_hours_go'] = st.slider("Additional Hours for Go Product", 0, 20, DEFAULT_SCENARIO['additional_hours_go'])
+    st.session_state['inputs']['analyst_hourly_cost'] = st.number_input("Analyst Hourly Cost ($)", value=DEFAULT_SCENARIO['analyst_hourly_cost'])
 
 with st.sidebar.expander("💸 Investor Platform & Team", expanded=True):
-    st.session_state['inputs']['investor_license_start_mrr'] = st.number_input("Platform Starting MRR ($)", value=1000)
-    st.session_state['inputs']['new_investor_licenses_q'] = st.slider("New Investor Licenses per Q", 0, 20, 5)
-    st.session_state['inputs']['investor_license_price'] = st.number_input("Investor License Price per Month ($)", value=2500)
-    st.session_state['inputs']['platform_churn_pct'] = st.slider("Platform Annual Churn (%)", 0.0, 30.0, 10.0)
-    st.session_state['inputs']['platform_expansion_pct'] = st.slider("Platform Annual Expansion (%)", 0.0, 50.0, 15.0)
-    st.session_state['inputs']['ae_ote'] = st.number_input("AE OTE ($)", value=150000)
-    st.session_state['inputs']['cs_salary'] = st.number_input("CS Rep Annual Salary ($)", value=80000)
-    st.session_state['inputs']['benefits_tax_pct'] = st.slider("Benefits & Tax Burden (%)", 15, 40, 25)
-    st.session_state['inputs']['sales_commission_pct'] = st.slider("Sales Commission (%)", 5, 20, 10)
-    st.session_state['inputs']['ga_overhead_pct'] = st.slider("G&A Overhead (% of Rev)", 5, 25, 15)
-    st.session_state['inputs']['capex_per_new_hire'] = st.number_input("CapEx per New Hire ($)", value=3000)
-    st.session_state['inputs']['ar_days'] = st.number_input("Accounts Receivable Days", value=45)
-    st.session_state['inputs']['ap_days'] = st.number_input("Accounts Payable Days", value=30)
-    st.session_state['inputs']['tax_rate_pct'] = st.slider("Effective Tax Rate (%)", 0, 50, 21)
+    st.session_state['inputs']['investor_license_start_mrr'] = st.number_input("Platform Starting MRR ($)", value=DEFAULT_SCENARIO['investor_license_start_mrr'])
+    st.session_state['inputs']['new_investor_licenses_q'] = st.slider("New Investor Licenses per Q", 0, 20, DEFAULT_SCENARIO['new_investor_licenses_q'])
+    st.session_state['inputs']['investor_license_price'] = st.number_input("Investor License Price per Month ($)", value=DEFAULT_SCENARIO['investor_license_price'])
+    st.session_state['inputs']['platform_churn_pct'] = st.slider("Platform Annual Churn (%)", 0.0, 30.0, DEFAULT_SCENARIO['platform_churn_pct'])
+    st.session_state['inputs']['platform_expansion_pct'] = st.slider("Platform Annual Expansion (%)", 0.0, 50.0, DEFAULT_SCENARIO['platform_expansion_pct'])
+    st.session_state['inputs']['ae_ote'] = st.number_input("AE OTE ($)", value=DEFAULT_SCENARIO['ae_ote'])
+    st.session_state['inputs']['cs_salary'] = st.number_input("CS Rep Annual Salary ($)", value=DEFAULT_SCENARIO['cs_salary'])
+    st.session_state['inputs']['benefits_tax_pct'] = st.slider("Benefits & Tax Burden (%)", 15, 40, DEFAULT_SCENARIO['benefits_tax_pct'])
+    st.session_state['inputs']['sales_commission_pct'] = st.slider("Sales Commission (%)", 5, 20, DEFAULT_SCENARIO['sales_commission_pct'])
+    st.session_state['inputs']['ga_overhead_pct'] = st.slider("G&A Overhead (% of Rev)", 5, 25, DEFAULT_SCENARIO['ga_overhead_pct'])
+    st.session_state['inputs']['capex_per_new_hire'] = st.number_input("CapEx per New Hire ($)", value=DEFAULT_SCENARIO['capex_per_new_hire'])
+    st.session_state['inputs']['ar_days'] = st.number_input("Accounts Receivable Days", value=DEFAULT_SCENARIO['ar_days'])
+    st.session_state['inputs']['ap_days'] = st.number_input("Accounts Payable Days", value=DEFAULT_SCENARIO['ap_days'])
+    st.session_state['inputs']['tax_rate_pct'] = st.slider("Effective Tax Rate (%)", 0, 50, DEFAULT_SCENARIO['tax_rate_pct'])
 
 with st.sidebar.expander("💵 Capital Strategy (Fundraise)", expanded=True):
-    st.session_state['inputs']['starting_cash'] = st.number_input("Starting Cash Balance ($)", value=50000)
-    st.session_state['inputs']['seed_amount'] = st.number_input("Seed Round Amount ($)", value=750000)
-    st.session_state['inputs']['seed_month'] = st.slider("Seed Round Closing Month", 1, 60, 1)
-    st.session_state['inputs']['series_a_amount'] = st.number_input("Series A Amount ($)", value=1250000)
-    st.session_state['inputs']['series_a_month'] = st.slider("Series A Closing Month", 1, 60, 18)
+    st.session_state['inputs']['starting_cash'] = st.number_input("Starting Cash Balance ($)", value=DEFAULT_SCENARIO['starting_cash'])
+    st.session_state['inputs']['seed_amount'] = st.number_input("Seed Round Amount ($)", value=DEFAULT_SCENARIO['seed_amount'])
+    st.session_state['inputs']['seed_month'] = st.slider("Seed Round Closing Month", 1, 60, DEFAULT_SCENARIO['seed_month'])
+    st.session_state['inputs']['series_a_amount'] = st.number_input("Series A Amount ($)", value=DEFAULT_SCENARIO['series_a_amount'])
+    st.session_state['inputs']['series_a_month'] = st.slider("Series A Closing Month", 1, 60, DEFAULT_SCENARIO['series_a_month'])
 
 # --- ACTION BUTTONS ---
 st.sidebar.markdown('<div class="sidebar-divider"></div>', unsafe_allow_html=True)
-if st.sidebar.button("🚀 Run Scenario", type="primary"):
-    st.session_state['results'] = run_financial_model(st.session_state['inputs'])
-    st.session_state['run_scenario'] = True
-    st.rerun()
+result_key = scenario_key(st.session_state['inputs'], st.session_state['start_month'])
+def run_scenario():
+    default_key, default_results, _ = default_dashboard(st.session_state['start_month'])
+    if result_key == default_key:
+        return default_results
+    # Cache hits skip the model entirely; misses recompute only the stages the changed inputs touch
+    return default_cache().run(st.session_state['inputs'], start_month=st.session_state['start_month'], compute=st.session_state['model'].run)
+
+# The dashboard follows the sliders: new sessions open on the prewarmed default scenario and every
+# change reruns only the stages it touches, so there is no separate run step
+st.session_state['results'] = run_scenario()
 if st.sidebar.button("🔄 Reset Inputs"):
     st.session_state.clear()
     st.rerun()
+with st.sidebar.expander("🧮 Model Engine"):
+    # Process-wide, so it can be left on in production (or started with EXITPATH_PROFILE_STAGES=1)
+    profiling = st.checkbox("Profile engine stages", value=stage_profiling_enabled(), help="Time every model stage across all sessions.")
+    if profiling != stage_profiling_enabled():
+        enable_stage_profiling(profiling)
+    if profiling:
+        profile = stage_profile()
+        if profile:
+            st.dataframe(pd.DataFrame(profile).T[['calls', 'mean_ms', 'last_ms', 'max_ms']].round(3))
+        if st.button("Reset stage profile"):
+            reset_stage_profile()
+    last_run = st.session_state['model'].last_run
+    if last_run['stages']:
+        st.caption(f"Last recompute ({', '.join(last_run['changed_inputs'])} changed): " +
+                   ", ".join(f"{stage} {last_run['timings'][stage] * 1000:.2f} ms" for stage in last_run['stages']))
+    cache_stats = default_cache().stats()
+    st.caption(f"Hit rate {cache_stats['hit_rate']:.0%} · {cache_stats['hits']} memory / {cache_stats['disk_hits']} disk hits · "
+               f"{cache_stats['misses']} misses · {cache_stats['evictions']} evictions · "
+               f"{cache_stats['entries']} entries, {cache_stats['bytes'] / 1024 ** 2:.1f} of {cache_stats['max_bytes'] / 1024 ** 2:.0f} MB")
 if st.session_state.get('results'):
-    excel_buffer = io.BytesIO()
-    with pd.ExcelWriter(excel_buffer, engine='xlsxwriter') as writer:
-        st.session_state['results']['pnl'].to_excel(writer, sheet_name='Income Statement')
-        st.session_state['results']['bs'].to_excel(writer, sheet_name='Balance Sheet')
-        st.session_state['results']['cfs'].to_excel(writer, sheet_name='Cash Flow Statement')
-        st.session_state['results']['kpis'].to_excel(writer, sheet_name='KPIs')
+    excel_formulas = st.sidebar.checkbox("Live Excel formulas for totals", value=False)
+    # The workbook is only built when the button is clicked, once per result
     st.sidebar.download_button(
-        label="📥 Download Pro Forma (.xlsx)", data=excel_buffer.getvalue(),
+        label="📥 Download Pro Forma (.xlsx)",
+        data=partial(cached_workbook_bytes, result_key, st.session_state['results'], excel_formulas),
         file_name="ExitPath_Pro_Forma.xlsx", mime="application/vnd.ms-excel"
     )
+    # Saved scenarios outlive the session (and Reset Inputs) in the local scenario library
+    save_name = st.sidebar.text_input("Scenario name", value="Scenario", key="save_name")
+    if st.sidebar.button("💾 Save to Library"):
+        scenario_store().save(save_name, st.session_state['inputs'], st.session_state['results'], start_month=st.session_state['start_month'])
+        st.sidebar.success(f"Saved '{save_name}'.")
 
 # --- MAIN DASHBOARD AREA ---
-if st.session_state.get('run_scenario') and st.session_state.get('results'):
-    results = st.session_state['results']
-    pnl, bs, kpis = results['pnl'], results['bs'], results['kpis']
-    
-    col1, col2 = st.columns([4, 1])
-    with col1:
-        st.header(f"CEO Dashboard")
-    with col2:
-        with st.popover("🤖 Ask AI Co-Pilot"):
-            st.markdown("Ask a follow-up question about this scenario:")
-            user_query = st.text_input("e.g., 'Why is my cash runway so short?'", key="ai_popover_query")
-            if user_query:
-                with st.spinner("Analyzing..."):
-                    response = query_analyst(user_query, results)
-                    st.markdown(response)
-
-    st.subheader("Strategic Command Dashboard")
+# Each section below is a fragment: its own widgets rerun only that section, reading the view model
+# that was derived once for the current result.
+@st.fragment
+def ai_copilot_section(results, scenario_hash):
+    with st.popover("🤖 Ask AI Co-Pilot"):
+        st.markdown("Ask a follow-up question about this scenario:")
+        user_query = st.text_input("e.g., 'Why is my cash runway so short?'", key="ai_popover_query")
+        if user_query:
+            from ai_analyst import iter_analyst # the OpenAI client and .env are only loaded once someone asks
+            # Tokens render as they arrive; repeat questions about the same scenario come from the cache
+            st.write_stream(iter_analyst(user_query, results, scenario_hash=scenario_hash))
+
+@st.fragment
+def projections_section(view):
     projection_year = st.selectbox("Select Year for Projections:", [1, 2, 3, 4, 5], index=4)
-    start_idx, end_idx = (projection_year - 1) * 12, projection_year * 12
-    year_revenue = pnl['Revenue'].iloc[start_idx:end_idx].sum()
-    year_ebitda = pnl['EBITDA'].iloc[start_idx:end_idx].sum()
-    ending_cash = bs['Cash'].iloc[end_idx - 1] if end_idx <= len(bs) else bs['Cash'].iloc[-1]
-    final_ltv_cac, final_payback, final_ndr = (kpis.iloc[-1] if not kpis.empty else [0,0,0])[['LTV/CAC', 'Payback Period (Months)', 'Net Dollar Retention']]
-    grade = "B"
-    if final_ltv_cac >= 3 and 0 < final_payback <= 18 and final_ndr >= 1.0: grade = "A"
-    elif final_ltv_cac < 2 or final_payback > 24 or final_ndr < 0.9: grade = "F"
-    grade_rationale = f"""- **LTV/CAC:** {final_ltv_cac:.1f}x\n- **Payback Period:** {final_payback:.1f} months\n- **Net Dollar Retention:** {final_ndr:.1%}"""
+    year = projection_metrics(view, projection_year)
     col1, col2, col3, col4 = st.columns(4)
-    with col1: st.metric(f"Revenue (Y{projection_year})", f"${year_revenue:,.0f}")
-    with col2: st.metric(f"EBITDA (Y{projection_year})", f"${year_ebitda:,.0f}")
-    with col3: st.metric(f"Ending Cash (Y{projection_year})", f"${ending_cash:,.0f}")
-    with col4: st.metric("Scenario Grade", grade, help=grade_rationale)
-    
-    st.write("---")
-    with st.expander("✨ Supercharge with Your ExitPath EEP Report"):
-        # (EEP uploader/manual entry section is unchanged)
-        st.info("This is a placeholder for the EEP Report integration.")
-
-    st.write("---")
-    narrative = generate_narrative(results)
-    col1, col2 = st.columns([1.5, 1])
-    with col1:
-        st.subheader("The 'Brutal Facts' Narrative")
-        with st.container(border=True):
-            st.markdown("##### The Flywheel (Core Strengths)"); st.success(narrative['flywheel'])
-            st.markdown("##### The Brutal Facts (Core Weaknesses)"); st.warning(narrative['brutal_facts'])
-            st.markdown("##### The Strategic Crossroads"); st.info(narrative['crossroads'])
-    with col2:
-        st.subheader("Strategic Bowtie Funnel")
-        with st.container(border=True):
-            # --- CORRECTED BOWTIE CALL ---
-            render_bowtie(funnel_data=results['funnel'], pnl_data=pnl, inputs=st.session_state['inputs'])
-            
-    st.write("---")
-    st.subheader("Financial Statements")
-    tab1, tab2, tab3, tab4 = st.tabs(["Income Statement", "Balance Sheet", "Cash Flow", "KPIs"])
-    with tab1: st.dataframe(results['pnl'].transpose().style.format(lambda x: f"${x:,.0f}"))
-    with tab2: st.dataframe(results['bs'].transpose().style.format(lambda x: f"${x:,.0f}"))
-    with tab3: st.dataframe(results['cfs'].transpose().style.format(lambda x: f"${x:,.0f}"))
-    with tab4: st.dataframe(results['kpis'].transpose().style.format("{:,.2f}"))
-else:
-    st.info("Configure inputs and click 'Run Scenario' to generate your forecast.")
+    with col1: st.metric(f"Revenue (Y{projection_year})", f"${year['revenue']:,.0f}")
+    with col2: st.metric(f"EBITDA (Y{projection_year})", f"${year['ebitda']:,.0f}")
+    with col3: st.metric(f"Ending Cash (Y{projection_year})", f"${year['ending_cash']:,.0f}")
+    with col4: st.metric("Scenario Grade", view['grade'], help=view['grade_rationale'])
+
+@st.fragment
+def monte_carlo_section():
+    with st.expander("🎲 Monte Carlo Downside Analysis"):
+        mc_keys = st.multiselect("Inputs to vary:", list(st.session_state['inputs']), default=['lead_to_marketfit_pct', 'platform_churn_pct', 'series_a_month'])
+        mc_col1, mc_col2, mc_col3 = st.columns(3)
+        with mc_col1: mc_spread = st.slider("Spread (± % of current value)", 5, 75, 25)
+        with mc_col2: mc_draws = st.select_slider("Draws", [10_000, 50_000, 100_000, 250_000], value=100_000)
+        with mc_col3: mc_seed = st.number_input("Random Seed", value=42, step=1)
+        if st.button("Run Monte Carlo"):
+            # Triangular around the current slider value; inputs currently at zero have no spread to vary
+            distributions = {}
+            for key in mc_keys:
+                value = st.session_state['inputs'][key]
+                if value:
+                    spread = abs(value) * mc_spread / 100
+                    distributions[key] = {"dist": "triangular", "low": value - spread, "mode": value, "high": value + spread, "min": 0}
+            with st.spinner(f"Simulating {mc_draws:,} scenarios..."):
+                st.session_state['monte_carlo'] = run_monte_carlo(st.session_state['inputs'], distributions, n_draws=mc_draws, seed=int(mc_seed), start_month=st.session_state['start_month'])
+        mc = st.session_state.get('monte_carlo')
+        if mc:
+            month_axis = pd.RangeIndex(1, len(mc['months']) + 1, name="Month")
+            st.markdown(f"**Cash P10 / P50 / P90** ({mc['draws']:,} draws)")
+            st.line_chart(mc['bands']['Cash'].set_axis(month_axis))
+            st.markdown("**Probability of Running Out of Cash by Month**")
+            st.area_chart(mc['prob_cash_out'].set_axis(month_axis))
+
+@st.fragment
+def scenario_library_section():
+    with st.expander(f"📚 Scenario Library ({scenario_store().count():,} saved)"):
+        lib_col1, lib_col2, lib_col3 = st.columns(3)
+        with lib_col1: min_runway = st.number_input("Min cash runway (months)", value=0, step=1)
+        with lib_col2: min_ltv_cac = st.number_input("Min final LTV/CAC", value=0.0, step=0.5)
+        with lib_col3: order_by = st.selectbox("Sort by", METRIC_COLUMNS, index=METRIC_COLUMNS.index('y5_ebitda'))
+        filters = [(metric, ">=", value) for metric, value in (('runway_months', min_runway), ('final_ltv_cac', min_ltv_cac)) if value]
+        matches = scenario_store().query(filters, order_by=order_by, limit=200)
+        st.dataframe(matches.drop(columns=['created']))
+        if len(matches):
+            # Only the opened scenario's monthly statements are read from the library
+            opened_id = st.selectbox("Open scenario", matches.index, format_func=lambda i: f"#{i} {matches.at[i, 'name']}")
+            opened = scenario_store().open(opened_id)
+            st.dataframe(opened['results']['pnl'].T)
+
+@st.fragment
+def actuals_section(results):
+    with st.expander("📒 Actuals & Re-forecast"):
+        st.caption("Monthly CSV with month (YYYY-MM), revenue, cash, accounts_receivable, accounts_payable and optionally headcount.")
+        uploaded = st.file_uploader("Upload actuals", type="csv", key="actuals_csv")
+        if uploaded is not None:
+            from reforecast import outlook_variance, reforecast, variance_report
+            try:
+                forecast = reforecast(st.session_state['inputs'], pd.read_csv(uploaded), start_month=st.session_state['start_month'])
+            except ValueError as e:
+                st.error(str(e))
+                return
+            st.markdown(f"**{forecast['checkpoint']['closed_months']} closed months: actual vs plan**")
+            st.dataframe(variance_report(forecast))
+            st.markdown("**Cash: plan vs re-forecast**")
+            st.line_chart(pd.DataFrame({"Plan": results['bs']['Cash'], "Re-forecast": forecast['results']['bs']['Cash']}))
+            st.dataframe(outlook_variance(forecast))
+
+@st.fragment
+def bowtie_section(view, results, inputs):
+    render_bowtie(funnel_data=results['funnel'], pnl_data=results['pnl'], inputs=inputs, html_by_timeframe=view['bowtie_html'])
+
+results = st.session_state['results']
+if st.session_state.get('view_key') != result_key:
+    default_key, _, default_view = default_dashboard(st.session_state['start_month'])
+    st.session_state['view'] = default_view if result_key == default_key else build_dashboard_view(results, st.session_state['inputs'])
+    st.session_state['view_key'] = result_key
+view = st.session_state['view']
+
+col1, col2 = st.columns([4, 1])
+with col1:
+    st.header(f"CEO Dashboard")
+with col2:
+    ai_copilot_section(results, result_key)
+
+st.subheader("Strategic Command Dashboard")
+projections_section(view)
+
+st.write("---")
+with st.expander("✨ Supercharge with Your ExitPath EEP Report"):
+    # (EEP uploader/manual entry section is unchanged)
+    st.info("This is a placeholder for the EEP Report integration.")
+
+monte_carlo_section()
+scenario_library_section()
+actuals_section(results)
+
+st.write("---")
+narrative = view['narrative']
+col1, col2 = st.columns([1.5, 1])
+with col1:
+    st.subheader("The 'Brutal Facts' Narrative")
+    with st.container(border=True):
+        st.markdown("##### The Flywheel (Core Strengths)"); st.success(narrative['flywheel'])
+        st.markdown("##### The Brutal Facts (Core Weaknesses)"); st.warning(narrative['brutal_facts'])
+        st.markdown("##### The Strategic Crossroads"); st.info(narrative['crossroads'])
+with col2:
+    st.subheader("Strategic Bowtie Funnel")
+    with st.container(border=True):
+        bowtie_section(view, results, st.session_state['inputs'])
+
+st.write("---")
+st.subheader("Financial Statements")
+tab1, tab2, tab3, tab4, tab5 = st.tabs(["Income Statement", "Balance Sheet", "Cash Flow", "KPIs", "Platform Cohorts"])
+with tab1: st.dataframe(view['tables']['pnl'])
+with tab2: st.dataframe(view['tables']['bs'])
+with tab3: st.dataframe(view['tables']['cfs'])
+with tab4: st.dataframe(view['tables']['kpis'])
+with tab5:
+    st.markdown("**Investor-platform MRR by quarterly license cohort**")
+    st.dataframe(view['cohorts']['mrr'])
+    st.markdown("**Logo retention by cohort**")
+    st.dataframe(view['cohorts']['logo_retention'])
+    st.markdown("**Trailing 12-month net dollar retention**")
+    st.line_chart(view['cohorts']['ndr'].dropna())